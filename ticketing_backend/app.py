@@ -1,5 +1,6 @@
 # Main Flask application instance
 import os
+import threading
 import requests
 from flask import Flask, jsonify, g, request
 from flask_login import LoginManager, current_user
@@ -8,11 +9,18 @@ from datetime import datetime, date, time
 from flask_cors import CORS
 
 from config import Config
-from database import db
+from database import db, upgrade_schema, attach_archive_database
 from models import User, Ticket, Comment, Attachment, EquipmentRequest, UserRequest, StudentRequest, Task, Log
 from services.auth_service import create_initial_super_admin
+from services.ticket_service import purge_deleted_tickets, reconcile_ticket_counters
+from services.request_service import backfill_equipment_reservations
+from services.assignment_service import reconcile_open_assigned_counts
+from services.dashboard_service import reconcile_dashboard_counters
+from services.analytics_service import backfill_analytics
+from services.ticket_archive_service import archive_closed_tickets
 from services.user_service import get_user_by_id
 from utils.helpers import get_days_until_set_date
+from utils.background import start_background_jobs
 
 # Import Blueprints
 from routes.auth_routes import auth_bp
@@ -22,6 +30,13 @@ from routes.request_routes import request_bp
 from routes.task_manager_routes import task_manager_bp
 from routes.general_routes import general_bp
 from routes.gemini_routes import gemini_bp
+from routes.calendar_routes import calendar_bp
+from routes.sla_routes import sla_bp
+from routes.assignment_routes import assignment_bp
+from routes.audit_routes import audit_bp
+from routes.analytics_routes import analytics_bp
+from routes.batch_routes import batch_bp
+from routes.report_routes import report_bp
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -34,13 +49,15 @@ app.config['SESSION_COOKIE_HTTPONLY'] = True
 CORS(app, resources={
     r"/api/*": {
         "origins": ["http://localhost:5000", "http://10.2.0.6:5000"], # Be explicit if client might use either
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"], # Explicitly list allowed methods
+        "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"], # Explicitly list allowed methods
         "supports_credentials": True,
-        "allow_headers": ["Content-Type", "Authorization"] 
+        "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"] 
     }
 })
 # Initialize extensions
 db.init_app(app)
+with app.app_context():
+    attach_archive_database(db.engine, Config.TICKET_ARCHIVE_DATABASE) # Cold storage for old closed tickets
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'auth.login' # Not strictly needed for API, but good practice
@@ -58,6 +75,20 @@ app.register_blueprint(request_bp)
 app.register_blueprint(task_manager_bp)
 app.register_blueprint(general_bp)
 app.register_blueprint(gemini_bp)
+app.register_blueprint(calendar_bp)
+app.register_blueprint(sla_bp)
+app.register_blueprint(assignment_bp)
+app.register_blueprint(audit_bp)
+app.register_blueprint(analytics_bp)
+app.register_blueprint(batch_bp)
+app.register_blueprint(report_bp)
+
+# Background jobs (ticket purge, etc.) start with the first request this process serves, so CLI
+# commands and the debug reloader's watcher process never run them. `flask run-jobs` runs them on their own.
+@app.before_request
+def start_jobs_in_serving_process():
+    if Config.BACKGROUND_JOBS_ENABLED:
+        start_background_jobs(app)
 
 # Error Handlers
 @app.errorhandler(400)
@@ -88,9 +119,11 @@ def init_db_command():
     """Initializes the database and creates a super admin user."""
     with app.app_context():
         db.create_all()
-        # Create static folders for attachments if they don't exist
-        os.makedirs(os.path.join(Config.UPLOAD_FOLDER, 'ticket_attachments'), exist_ok=True)
-        os.makedirs(os.path.join(Config.UPLOAD_FOLDER, 'comment_attachments'), exist_ok=True)
+        upgrade_schema()
+        # Create static folders for attachments if they don't exist (local storage only)
+        if Config.STORAGE_BACKEND == 'local':
+            os.makedirs(os.path.join(Config.UPLOAD_FOLDER, 'ticket_attachments'), exist_ok=True)
+            os.makedirs(os.path.join(Config.UPLOAD_FOLDER, 'comment_attachments'), exist_ok=True)
         os.makedirs(os.path.join(Config.UPLOAD_FOLDER, 'logs'), exist_ok=True)
         
         # Create initial super admin
@@ -101,6 +134,55 @@ def init_db_command():
         else:
             print("Database already initialized or super admin already exists.")
 
+@app.cli.command('run-jobs')
+def run_jobs_command():
+    """Runs the background jobs in this process until interrupted, e.g. as a worker beside web processes started with BACKGROUND_JOBS_ENABLED=false."""
+    start_background_jobs(app)
+    print("Background jobs running. Press Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+@app.cli.command('purge-deleted-tickets')
+def purge_deleted_tickets_command():
+    """Runs pending ticket purge jobs now instead of waiting for the background job."""
+    with app.app_context():
+        finished = purge_deleted_tickets(max_jobs=1000)
+        print(f"Purged {finished} deleted ticket(s).")
+
+@app.cli.command('archive-tickets')
+def archive_tickets_command():
+    """Moves tickets closed longer than TICKET_ARCHIVE_AFTER_DAYS into the archive database now."""
+    with app.app_context():
+        archived = archive_closed_tickets()
+        print(f"Archived {archived} closed ticket(s).")
+
+@app.cli.command('reconcile-ticket-counters')
+def reconcile_ticket_counters_command():
+    """Recomputes comment/attachment counters and last activity on every ticket, admins' open-ticket loads and the dashboard counters."""
+    with app.app_context():
+        updated = reconcile_ticket_counters()
+        print(f"Reconciled counters on {updated} ticket(s).")
+        updated = reconcile_open_assigned_counts()
+        print(f"Reconciled open-ticket load on {updated} user(s).")
+        corrected = reconcile_dashboard_counters()
+        print(f"Corrected {corrected} dashboard counter(s).")
+
+@app.cli.command('backfill-equipment-reservations')
+def backfill_equipment_reservations_command():
+    """Books inventory items for approved, open equipment requests made before reservations existed."""
+    with app.app_context():
+        created, conflicting = backfill_equipment_reservations()
+        print(f"Booked {created} request(s); {conflicting} left unbooked because of conflicts.")
+
+@app.cli.command('backfill-analytics')
+def backfill_analytics_command():
+    """Rebuilds the hourly and daily analytics rollups from ticket and request history."""
+    with app.app_context():
+        events = backfill_analytics()
+        print(f"Rolled up {events} ticket and request event(s).")
+
 # Route for downloading attachments (securely handled in ticket_routes.py)
 # @app.route('/static/attachments/<path:filename>')
 # def download_static_attachment(filename):
@@ -152,6 +234,7 @@ if __name__ == '__main__':
 
     with app.app_context():
         db.create_all()
+        upgrade_schema()
         create_initial_super_admin()
 
     app.run(host=host, port=port, debug=True)
\ No newline at end of file
@@ -5,7 +5,7 @@ load_dotenv() # Load environment variables from .env file
 
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///instance/tickets.db' # SQLite database path
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///instance/tickets.db') # SQLite database path
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
     # Email settings
@@ -22,6 +22,80 @@ class Config:
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
     ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'xls', 'xlsx'}
 
+    # Attachment storage: 'local' (UPLOAD_FOLDER) or 's3' (any S3-compatible service)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'local').lower()
+    S3_BUCKET = os.getenv('S3_BUCKET')
+    S3_PREFIX = os.getenv('S3_PREFIX', '')
+    S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL') # e.g. http://localhost:9000 for MinIO
+    S3_REGION = os.getenv('S3_REGION')
+    S3_ACCESS_KEY_ID = os.getenv('S3_ACCESS_KEY_ID')
+    S3_SECRET_ACCESS_KEY = os.getenv('S3_SECRET_ACCESS_KEY')
+    S3_MULTIPART_THRESHOLD = int(os.getenv('S3_MULTIPART_THRESHOLD', 8 * 1024 * 1024))
+    S3_MAX_CONCURRENCY = int(os.getenv('S3_MAX_CONCURRENCY', 4))
+
+    # Background jobs (ticket purge, etc.) run on daemon threads inside the app process
+    BACKGROUND_JOBS_ENABLED = os.getenv('BACKGROUND_JOBS_ENABLED', 'true').lower() == 'true'
+    TICKET_PURGE_INTERVAL_SECONDS = int(os.getenv('TICKET_PURGE_INTERVAL_SECONDS', 60))
+
+    AUTOCOMPLETE_REBUILD_INTERVAL_SECONDS = int(os.getenv('AUTOCOMPLETE_REBUILD_INTERVAL_SECONDS', 600))
+    DUPLICATE_INDEX_REBUILD_INTERVAL_SECONDS = int(os.getenv('DUPLICATE_INDEX_REBUILD_INTERVAL_SECONDS', 600))
+    DUPLICATE_MIN_SCORE = float(os.getenv('DUPLICATE_MIN_SCORE', 0.35)) # Cosine similarity needed to suggest a duplicate
+
+    # SLA: default hours an item may stay open; admins can override per department via /api/sla/targets
+    SLA_SWEEP_INTERVAL_SECONDS = int(os.getenv('SLA_SWEEP_INTERVAL_SECONDS', 300))
+    SLA_TICKET_HOURS_IT = int(os.getenv('SLA_TICKET_HOURS_IT', 72))
+    SLA_TICKET_HOURS_MAINTENANCE = int(os.getenv('SLA_TICKET_HOURS_MAINTENANCE', 120))
+    SLA_TICKET_HOURS_MANAGEMENT = int(os.getenv('SLA_TICKET_HOURS_MANAGEMENT', 168))
+    SLA_REQUEST_HOURS = int(os.getenv('SLA_REQUEST_HOURS', 72))
+
+    # Audit log: entries are written in the same transaction as the change they describe.
+    # AUDIT_BUFFERED instead queues them after commit and group-commits them in batches (a crash can lose up to one interval).
+    AUDIT_BUFFERED = os.getenv('AUDIT_BUFFERED', 'false').lower() == 'true'
+    AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', 500))
+    AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv('AUDIT_FLUSH_INTERVAL_SECONDS', 2))
+
+    # Log retention: entries older than LOG_RETENTION_DAYS move into gzipped archive segments (0 keeps everything live)
+    LOG_RETENTION_DAYS = int(os.getenv('LOG_RETENTION_DAYS', 90))
+    LOG_ROTATION_INTERVAL_SECONDS = int(os.getenv('LOG_ROTATION_INTERVAL_SECONDS', 3600))
+    LOG_ARCHIVE_SEGMENT_ROWS = int(os.getenv('LOG_ARCHIVE_SEGMENT_ROWS', 10000))
+
+    # Dashboard statistics come from maintained counters; the reconcile job corrects any drift
+    DASHBOARD_STATS_CACHE_SECONDS = float(os.getenv('DASHBOARD_STATS_CACHE_SECONDS', 10))
+    DASHBOARD_COUNTERS_RECONCILE_INTERVAL_SECONDS = int(os.getenv('DASHBOARD_COUNTERS_RECONCILE_INTERVAL_SECONDS', 3600))
+
+    # Auto-assignment balances on each admin's maintained open-ticket count; this job corrects any drift
+    ASSIGNMENT_RECONCILE_INTERVAL_SECONDS = int(os.getenv('ASSIGNMENT_RECONCILE_INTERVAL_SECONDS', 3600))
+
+    # Analytics rollups: hourly buckets are pruned after this many days; daily buckets are kept
+    ANALYTICS_HOURLY_RETENTION_DAYS = int(os.getenv('ANALYTICS_HOURLY_RETENTION_DAYS', 90))
+    ANALYTICS_PRUNE_INTERVAL_SECONDS = int(os.getenv('ANALYTICS_PRUNE_INTERVAL_SECONDS', 86400))
+
+    # How often due task schedules (e.g. a daily checklist reset) are checked
+    TASK_SCHEDULE_INTERVAL_SECONDS = int(os.getenv('TASK_SCHEDULE_INTERVAL_SECONDS', 60))
+
+    # POST /api/batch: several GET routes in one round-trip, optionally run on a thread pool
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 20))
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 4))
+
+    # Department reports: the last finished week/month is generated during the off-peak local hours [START, END)
+    REPORTS_CHECK_INTERVAL_SECONDS = int(os.getenv('REPORTS_CHECK_INTERVAL_SECONDS', 1800))
+    REPORTS_OFFPEAK_START_HOUR = int(os.getenv('REPORTS_OFFPEAK_START_HOUR', 1))
+    REPORTS_OFFPEAK_END_HOUR = int(os.getenv('REPORTS_OFFPEAK_END_HOUR', 5))
+    REPORTS_EMAIL_ENABLED = os.getenv('REPORTS_EMAIL_ENABLED', 'false').lower() == 'true' # Emails each report to the department's admins
+    REPORTS_CLAIM_TIMEOUT_SECONDS = int(os.getenv('REPORTS_CLAIM_TIMEOUT_SECONDS', 1800)) # A report still generating after this is taken over
+
+    # Cold ticket archive: tickets closed and idle for TICKET_ARCHIVE_AFTER_DAYS move, with their comments and
+    # attachment rows, into a second SQLite file attached as 'archive' (0 disables). Files stay in storage.
+    TICKET_ARCHIVE_DATABASE = os.getenv('TICKET_ARCHIVE_DATABASE', 'tickets_archive.db') # Relative to the main database's folder
+    TICKET_ARCHIVE_AFTER_DAYS = int(os.getenv('TICKET_ARCHIVE_AFTER_DAYS', 365))
+    TICKET_ARCHIVE_BATCH_SIZE = int(os.getenv('TICKET_ARCHIVE_BATCH_SIZE', 100))
+    TICKET_ARCHIVE_BATCH_PAUSE_SECONDS = float(os.getenv('TICKET_ARCHIVE_BATCH_PAUSE_SECONDS', 0.2)) # Lets other writers in between batches
+    TICKET_ARCHIVE_INTERVAL_SECONDS = int(os.getenv('TICKET_ARCHIVE_INTERVAL_SECONDS', 3600))
+
+    # Idempotency-Key support on create endpoints
+    IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+    IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS = int(os.getenv('IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS', 3600))
+
     # Google Gemini AI (optional)
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 
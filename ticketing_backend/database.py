@@ -1,4 +1,94 @@
 # SQLAlchemy setup and DB initialization
+import os
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
+from sqlalchemy.schema import CreateTable
 
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy()
+
+ARCHIVE_SCHEMA = 'archive' # Schema name of the attached cold-archive database (see models.ArchivedTicket)
+
+
+def attach_archive_database(engine, filename):
+    """
+    Attaches the cold ticket archive, a second SQLite file, to every new connection as ARCHIVE_SCHEMA.
+    A relative filename is placed beside the main database file.
+    """
+    main_database = engine.url.database
+    if not main_database or main_database == ':memory:':
+        path = ':memory:'
+    elif os.path.isabs(filename):
+        path = filename
+    else:
+        path = os.path.join(os.path.dirname(main_database), filename)
+
+    @event.listens_for(engine, 'connect')
+    def _attach_archive(dbapi_connection, connection_record):
+        dbapi_connection.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (path,))
+
+
+def _lacks_autoincrement(conn, table):
+    if not table.dialect_options['sqlite']['autoincrement']:
+        return False
+    prefix = f'"{table.schema}".' if table.schema else ''
+    sql = conn.execute(
+        text(f"SELECT sql FROM {prefix}sqlite_master WHERE type = 'table' AND name = :name"), {'name': table.name}
+    ).scalar()
+    return 'AUTOINCREMENT' not in sql.upper()
+
+
+def _rebuild_with_autoincrement(conn, table, existing_columns, same_name_tables):
+    """
+    Recreates an existing table as declared, so it becomes AUTOINCREMENT, which SQLite can only do by
+    copying the rows into a new table. Its sequence then starts after the highest id in any table of
+    that name (e.g. its cold-archive copy), so an id that was moved away is never handed out again.
+    """
+    prefix = f'"{table.schema}".' if table.schema else ''
+    if not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql('BEGIN') # pysqlite runs DDL outside a transaction, and the copy must not half-happen
+    # Legacy mode keeps other tables' foreign keys pointing at the original name while it is moved aside
+    conn.execute(text('PRAGMA legacy_alter_table = ON'))
+    conn.execute(text(f'ALTER TABLE {prefix}"{table.name}" RENAME TO "{table.name}_rebuild"'))
+    conn.execute(text('PRAGMA legacy_alter_table = OFF'))
+    conn.execute(CreateTable(table))
+    columns = ', '.join(f'"{column.name}"' for column in table.columns if column.name in existing_columns)
+    conn.execute(text(f'INSERT INTO {prefix}"{table.name}" ({columns}) SELECT {columns} FROM {prefix}"{table.name}_rebuild"'))
+    conn.execute(text(f'DROP TABLE {prefix}"{table.name}_rebuild"')) # Its indexes go with it and are recreated below
+
+    highest_id = max(conn.execute(db.select(db.func.coalesce(db.func.max(other.c.id), 0))).scalar() for other in same_name_tables)
+    conn.execute(text(f'DELETE FROM {prefix}sqlite_sequence WHERE name = :name'), {'name': table.name})
+    conn.execute(
+        text(f'INSERT INTO {prefix}sqlite_sequence (name, seq) VALUES (:name, :seq)'), {'name': table.name, 'seq': highest_id}
+    )
+
+
+def upgrade_schema():
+    """
+    Adds columns and indexes declared on the models but missing from an existing
+    database, and rebuilds tables that have since been declared AUTOINCREMENT.
+    db.create_all() only creates missing tables, so this runs right after it.
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name, schema=table.schema):
+                continue
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name, schema=table.schema)}
+            table_name = f'"{table.schema}"."{table.name}"' if table.schema else f'"{table.name}"'
+            if _lacks_autoincrement(conn, table):
+                same_name_tables = [
+                    other for other in db.metadata.sorted_tables
+                    if other.name == table.name and inspector.has_table(other.name, schema=other.schema)
+                ]
+                _rebuild_with_autoincrement(conn, table, existing_columns, same_name_tables)
+                existing_columns = {column.name for column in table.columns}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                ddl = f'ALTER TABLE {table_name} ADD COLUMN "{column.name}" {column.type.compile(dialect=engine.dialect)}'
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                conn.execute(text(ddl))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
@@ -1,8 +1,9 @@
 # Database models (User, Ticket, Comment, etc.)
 from datetime import datetime
-from database import db
+from database import db, ARCHIVE_SCHEMA
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
+from utils.audit_messages import render_audit_message
 
 # --- User Management Models ---
 
@@ -12,6 +13,9 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(256), nullable=False)
     role = db.Column(db.String(20), default='user') # 'user', 'admin'
     associations = db.Column(db.String(50), default='alpha') # e.g., 'IT', 'Maintenance', 'Management', or 'alpha' for general user
+    calendar_token = db.Column(db.String(64), unique=True, index=True, nullable=True) # Secret for .ics feed URLs
+    open_assigned_count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0')) # Open tickets assigned to this admin, kept up to date by ticket_service
+    last_assigned_at = db.Column(db.DateTime, nullable=True) # Breaks ties between equally loaded admins
 
     # Relationships
     tickets_created = db.relationship('Ticket', backref='creator', lazy=True, foreign_keys='Ticket.user_id')
@@ -43,6 +47,11 @@ class User(UserMixin, db.Model):
 # --- Ticketing System Models ---
 
 class Ticket(db.Model):
+    __table_args__ = (
+        db.Index('ix_ticket_status_timestamp', 'status', 'timestamp'), # SLA sweep over open tickets by age
+        db.Index('ix_ticket_status_sla_breached', 'status', 'sla_breached_at'), # Overdue filter and counts
+    )
+
     id = db.Column(db.String(50), primary_key=True) # Unique ID from original script (timestamp-based)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -53,6 +62,16 @@ class Ticket(db.Model):
     assignee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True) # Assigned technician/admin
     shimmer = db.Column(db.Boolean, default=False) # Special "Shimmer" ticket type
     department = db.Column(db.String(50), nullable=False) # 'IT', 'Maintenance', 'Management'
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True) # Soft delete; rows/files purged in the background
+    # Denormalized counters maintained by ticket_service writers (see reconcile_ticket_counters)
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0'))
+    attachment_count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0')) # Ticket + comment attachments
+    last_activity_at = db.Column(db.DateTime, nullable=True, index=True)
+    sla_breached_at = db.Column(db.DateTime, nullable=True) # Set by the SLA sweeper once open past its target
+    merged_into_id = db.Column(db.String(50), nullable=True) # Set when an admin merges this ticket into another
+    closed_at = db.Column(db.DateTime, nullable=True) # UTC; status keeps the local-time 'Closed: ...' text for display
+
+    archived = False # True on ArchivedTicket
 
     comments = db.relationship('Comment', backref='ticket', lazy=True, cascade='all, delete-orphan')
     attachments = db.relationship('Attachment', backref='ticket', lazy=True, cascade='all, delete-orphan', foreign_keys='Attachment.ticket_id')
@@ -69,6 +88,13 @@ class Ticket(db.Model):
             'assignee_email': self.assignee_user.email if self.assignee_user else None,
             'shimmer': self.shimmer,
             'department': self.department,
+            'sla_breached_at': self.sla_breached_at.isoformat() if self.sla_breached_at else None,
+            'merged_into_id': self.merged_into_id,
+            'closed_at': self.closed_at.isoformat() if self.closed_at else None,
+            'comment_count': self.comment_count or 0,
+            'attachment_count': self.attachment_count or 0,
+            'last_activity_at': (self.last_activity_at or self.timestamp).isoformat(),
+            'archived': self.archived,
             'attachments': [att.to_dict() for att in self.attachments]
         }
         if include_comments:
@@ -76,6 +102,11 @@ class Ticket(db.Model):
         return data
 
 class Comment(db.Model):
+    __table_args__ = (
+        db.Index('ix_comment_ticket_timestamp', 'ticket_id', 'timestamp'), # Serves keyset pagination of a ticket's comment thread
+        {'sqlite_autoincrement': True}, # Ids of archived or purged rows are never handed out again
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     ticket_id = db.Column(db.String(50), db.ForeignKey('ticket.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -95,9 +126,11 @@ class Comment(db.Model):
         }
 
 class Attachment(db.Model):
+    __table_args__ = {'sqlite_autoincrement': True} # Ids of archived or purged rows are never handed out again
+
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
-    filepath = db.Column(db.String(512), nullable=False) # Full path on server
+    filepath = db.Column(db.String(512), nullable=False) # Storage key (older rows: full path on server)
     ticket_id = db.Column(db.String(50), db.ForeignKey('ticket.id'), nullable=True)
     comment_id = db.Column(db.Integer, db.ForeignKey('comment.id'), nullable=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
@@ -115,9 +148,88 @@ class Attachment(db.Model):
             'url': f'/tickets/attachments/{self.id}' # Corrected endpoint
         }
 
+class TicketPurgeJob(db.Model):
+    """Background removal of a soft-deleted ticket's comments, attachments and files."""
+    id = db.Column(db.Integer, primary_key=True)
+    ticket_id = db.Column(db.String(50), nullable=False, index=True) # No FK: the ticket row is purged first
+    status = db.Column(db.String(20), default='pending', index=True) # 'pending', 'running', 'done', 'failed'
+    attempts = db.Column(db.Integer, default=0)
+    comments_total = db.Column(db.Integer, default=0)
+    comments_purged = db.Column(db.Integer, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'ticket_id': self.ticket_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'comments_total': self.comments_total,
+            'comments_purged': self.comments_purged,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+# --- Ticket Archive ---
+# Closed tickets that have been idle for Config.TICKET_ARCHIVE_AFTER_DAYS are moved, with their comments
+# and attachment rows, into these tables in the attached archive database (services/ticket_archive_service.py).
+# They are copies of the hot tables' definitions, so new columns reach both through upgrade_schema().
+
+_ARCHIVED_TABLES = {'ticket', 'comment'}
+
+
+def _archive_referred_schema(table, to_schema, constraint, referred_schema):
+    # Ticket/comment references stay inside the archive; user references point at the main database
+    # (SQLite cannot enforce a foreign key across databases, so those are left out of the DDL)
+    if constraint.elements[0].target_fullname.split('.')[0] in _ARCHIVED_TABLES:
+        return to_schema
+    return referred_schema
+
+
+def _archive_table(model):
+    return model.__table__.to_metadata(db.metadata, schema=ARCHIVE_SCHEMA, referred_schema_fn=_archive_referred_schema)
+
+
+class ArchivedTicket(db.Model):
+    """A cold-archived ticket. Read-only: writers move it back to Ticket first (restore_tickets)."""
+    __table__ = _archive_table(Ticket)
+
+    archived = True
+
+    creator = db.relationship('User', foreign_keys='ArchivedTicket.user_id')
+    assignee_user = db.relationship('User', foreign_keys='ArchivedTicket.assignee_id')
+    comments = db.relationship('ArchivedComment', backref='ticket', lazy=True)
+    attachments = db.relationship('ArchivedAttachment', backref='ticket', lazy=True, foreign_keys='ArchivedAttachment.ticket_id')
+
+    to_dict = Ticket.to_dict
+
+class ArchivedComment(db.Model):
+    __table__ = _archive_table(Comment)
+
+    commenter = db.relationship('User')
+    attachments = db.relationship('ArchivedAttachment', backref='comment', lazy=True, foreign_keys='ArchivedAttachment.comment_id')
+
+    to_dict = Comment.to_dict
+
+class ArchivedAttachment(db.Model):
+    __table__ = _archive_table(Attachment)
+
+    __repr__ = Attachment.__repr__
+    to_dict = Attachment.to_dict
+
 # --- Request System Models ---
 
 class EquipmentRequest(db.Model):
+    # Open-first, newest-first listing (also the request inbox UNION branches)
+    __table_args__ = (
+        db.Index('ix_equipment_request_status_timestamp', 'status', 'timestamp'),
+        db.Index('ix_equipment_request_status_sla_breached', 'status', 'sla_breached_at'),
+    )
+
     id = db.Column(db.String(50), primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     event = db.Column(db.String(255), nullable=False)
@@ -132,6 +244,9 @@ class EquipmentRequest(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(50), default='open') # 'open', 'closed'
     approval_status = db.Column(db.String(50), default='pending') # 'pending', 'approved', 'denied'
+    sla_breached_at = db.Column(db.DateTime, nullable=True) # Set by the SLA sweeper once open past its target
+
+    reservations = db.relationship('EquipmentReservation', backref='equipment_request', lazy=True, cascade='all, delete-orphan')
 
     def to_dict(self):
         return {
@@ -148,10 +263,57 @@ class EquipmentRequest(db.Model):
             'user_email': self.request_user.email if self.request_user else None,
             'timestamp': self.timestamp.isoformat(),
             'status': self.status,
-            'approval_status': self.approval_status
+            'approval_status': self.approval_status,
+            'sla_breached_at': self.sla_breached_at.isoformat() if self.sla_breached_at else None
+        }
+
+class EquipmentItem(db.Model):
+    """A lendable piece of equipment in the IT inventory (e.g. 'Projector 2')."""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), unique=True, nullable=False)
+    category = db.Column(db.String(100), nullable=True) # e.g. 'Projector', 'Speaker'
+    active = db.Column(db.Boolean, default=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'category': self.category,
+            'active': self.active
+        }
+
+class EquipmentReservation(db.Model):
+    """Normalized booking interval of one equipment item for an approved equipment request."""
+    # Overlap checks bound the scan with end_at > start, which skips past bookings
+    __table_args__ = (db.Index('ix_equipment_reservation_item_end', 'equipment_item_id', 'end_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    equipment_request_id = db.Column(db.String(50), db.ForeignKey('equipment_request.id'), nullable=False, index=True)
+    equipment_item_id = db.Column(db.Integer, db.ForeignKey('equipment_item.id'), nullable=False)
+    start_at = db.Column(db.DateTime, nullable=False)
+    end_at = db.Column(db.DateTime, nullable=False)
+    released_at = db.Column(db.DateTime, nullable=True) # Set when the request is closed (equipment returned)
+
+    equipment_item = db.relationship('EquipmentItem', lazy='joined')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'equipment_request_id': self.equipment_request_id,
+            'equipment_item_id': self.equipment_item_id,
+            'equipment_item_name': self.equipment_item.name if self.equipment_item else None,
+            'start_at': self.start_at.isoformat(),
+            'end_at': self.end_at.isoformat(),
+            'released_at': self.released_at.isoformat() if self.released_at else None
         }
 
 class UserRequest(db.Model): # New Employee Request
+    # Open-first, newest-first listing (also the request inbox UNION branches)
+    __table_args__ = (
+        db.Index('ix_user_request_status_timestamp', 'status', 'timestamp'),
+        db.Index('ix_user_request_status_sla_breached', 'status', 'sla_breached_at'),
+    )
+
     id = db.Column(db.String(50), primary_key=True)
     fname = db.Column(db.String(100), nullable=False)
     lname = db.Column(db.String(100), nullable=False)
@@ -162,6 +324,7 @@ class UserRequest(db.Model): # New Employee Request
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(50), default='open') # 'open', 'closed'
+    sla_breached_at = db.Column(db.DateTime, nullable=True) # Set by the SLA sweeper once open past its target
 
     def to_dict(self):
         return {
@@ -174,10 +337,17 @@ class UserRequest(db.Model): # New Employee Request
             'description': self.description,
             'user_email': self.request_user.email if self.request_user else None,
             'timestamp': self.timestamp.isoformat(),
-            'status': self.status
+            'status': self.status,
+            'sla_breached_at': self.sla_breached_at.isoformat() if self.sla_breached_at else None
         }
 
 class StudentRequest(db.Model):
+    # Open-first, newest-first listing (also the request inbox UNION branches)
+    __table_args__ = (
+        db.Index('ix_student_request_status_timestamp', 'status', 'timestamp'),
+        db.Index('ix_student_request_status_sla_breached', 'status', 'sla_breached_at'),
+    )
+
     id = db.Column(db.String(50), primary_key=True)
     fname = db.Column(db.String(100), nullable=False)
     lname = db.Column(db.String(100), nullable=False)
@@ -187,11 +357,13 @@ class StudentRequest(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(50), default='open') # 'open', 'closed'
+    sla_breached_at = db.Column(db.DateTime, nullable=True) # Set by the SLA sweeper once open past its target
     email_created = db.Column(db.Boolean, default=False)
     computer_created = db.Column(db.Boolean, default=False)
     bag_created = db.Column(db.Boolean, default=False)
     id_card_created = db.Column(db.Boolean, default=False)
     azure_created = db.Column(db.Boolean, default=False)
+    version = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0')) # Bumped on every checklist change
 
     def to_dict(self):
         return {
@@ -204,11 +376,131 @@ class StudentRequest(db.Model):
             'user_email': self.request_user.email if self.request_user else None,
             'timestamp': self.timestamp.isoformat(),
             'status': self.status,
+            'sla_breached_at': self.sla_breached_at.isoformat() if self.sla_breached_at else None,
             'email_created': self.email_created,
             'computer_created': self.computer_created,
             'bag_created': self.bag_created,
             'id_card_created': self.id_card_created,
-            'azure_created': self.azure_created
+            'azure_created': self.azure_created,
+            'version': self.version or 0
+        }
+
+# --- Idempotency ---
+
+class IdempotencyKey(db.Model):
+    """Stored response for a create request sent with an Idempotency-Key header."""
+    __table_args__ = (db.UniqueConstraint('user_id', 'key'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    endpoint = db.Column(db.String(100), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False) # Retries must send the same request
+    status = db.Column(db.String(20), default='pending') # 'pending' while the first attempt runs, then 'done'
+    response_status = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    response_mimetype = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+# --- Assignment ---
+
+class AssignmentPolicy(db.Model):
+    """Per-department opt-in for assigning new tickets to the least-loaded department admin."""
+    id = db.Column(db.Integer, primary_key=True)
+    department = db.Column(db.String(50), unique=True, nullable=False) # 'IT', 'Maintenance', 'Management'
+    enabled = db.Column(db.Boolean, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'department': self.department,
+            'enabled': self.enabled,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+# --- Dashboard ---
+
+class DashboardCounter(db.Model):
+    """A named dashboard total, moved by the write paths in the same transaction as their change."""
+    name = db.Column(db.String(100), primary_key=True) # e.g. 'tickets.open', 'tickets.department.IT'
+    value = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0'))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# --- Analytics ---
+
+class AnalyticsHourlyRollup(db.Model):
+    """Event counts per UTC hour, maintained by the write paths and rebuilt by the backfill-analytics command."""
+    __table_args__ = (db.UniqueConstraint('metric', 'bucket_start', 'dimension', 'bin', name='uq_analytics_hourly_bucket'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    metric = db.Column(db.String(50), nullable=False) # 'tickets.opened', 'tickets.closed', 'tickets.time_to_close', 'requests.created'
+    bucket_start = db.Column(db.DateTime, nullable=False) # Start of the UTC hour
+    dimension = db.Column(db.String(50), nullable=False) # Ticket department or request type
+    bin = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0')) # Time-to-close histogram bin; 0 for plain counts
+    count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0'))
+    total_seconds = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0')) # Sum of times to close
+
+class AnalyticsDailyRollup(db.Model):
+    """Event counts per local calendar day; same metrics as AnalyticsHourlyRollup."""
+    __table_args__ = (db.UniqueConstraint('metric', 'bucket_start', 'dimension', 'bin', name='uq_analytics_daily_bucket'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    metric = db.Column(db.String(50), nullable=False)
+    bucket_start = db.Column(db.Date, nullable=False) # Day in the display time zone
+    dimension = db.Column(db.String(50), nullable=False)
+    bin = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0'))
+    count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0'))
+    total_seconds = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0'))
+
+# --- Reports ---
+
+class DepartmentReport(db.Model):
+    """A generated weekly or monthly department summary; the JSON and email text live in storage."""
+    __table_args__ = (db.UniqueConstraint('department', 'period', 'period_start', name='uq_department_report_period'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    department = db.Column(db.String(50), nullable=False) # 'IT', 'Maintenance', 'Management'
+    period = db.Column(db.String(20), nullable=False) # 'weekly', 'monthly'
+    period_start = db.Column(db.Date, nullable=False) # First local day covered
+    period_end = db.Column(db.Date, nullable=False) # Day after the last one covered
+    status = db.Column(db.String(20), nullable=False, default='generating') # 'generating', 'ready'
+    claimed_at = db.Column(db.DateTime, nullable=True) # When generation last started
+    storage_key = db.Column(db.String(255), nullable=True) # JSON snapshot; the email text sits beside it as .txt
+    size_bytes = db.Column(db.Integer, nullable=True)
+    generated_at = db.Column(db.DateTime, nullable=True)
+    emailed_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'department': self.department,
+            'period': self.period,
+            'period_start': self.period_start.isoformat(),
+            'period_end': self.period_end.isoformat(),
+            'status': self.status,
+            'size_bytes': self.size_bytes,
+            'generated_at': self.generated_at.isoformat() if self.generated_at else None,
+            'emailed_at': self.emailed_at.isoformat() if self.emailed_at else None
+        }
+
+# --- SLA Models ---
+
+class SlaTarget(db.Model):
+    """How long an item may stay open before the SLA sweeper marks it overdue."""
+    __table_args__ = (db.UniqueConstraint('item_type', 'department'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    item_type = db.Column(db.String(50), nullable=False) # 'ticket', 'equipment_request', 'user_request', 'student_request'
+    department = db.Column(db.String(50), nullable=False) # Ticket department; requests are handled by 'IT'
+    target_hours = db.Column(db.Integer, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'item_type': self.item_type,
+            'department': self.department,
+            'target_hours': self.target_hours
         }
 
 # --- Task Manager Models ---
@@ -227,26 +519,101 @@ class Task(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
-            'filename': self.filename,
-            # 'filepath': self.filepath,
-            'ticket_id': self.ticket_id,
-            'comment_id': self.comment_id,
-            'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None,
-            'url': f'/tickets/attachments/{self.id}' # Changed from /api/attachments/
+            'title': self.title,
+            'description': self.description,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'completed': self.completed,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'last_completed_at': self.last_completed_at.isoformat() if self.last_completed_at else None,
+            'category': self.category,
+            'created_by_email': self.task_owner.email if self.task_owner else None
+        }
+
+class TaskSchedule(db.Model):
+    """A recurring server-side batch action on a category's tasks, e.g. reset the tech checklist daily at 6am."""
+    __table_args__ = (db.Index('ix_task_schedule_enabled_next_run', 'enabled', 'next_run_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(50), nullable=False) # 'tech', 'maintenance', 'administration'
+    action = db.Column(db.String(20), nullable=False, default='reset') # 'reset'
+    time_of_day = db.Column(db.String(5), nullable=False) # 'HH:MM' in the display time zone
+    weekdays = db.Column(db.String(7), nullable=False, default='0123456') # Days it runs, Monday = 0
+    enabled = db.Column(db.Boolean, default=True)
+    next_run_at = db.Column(db.DateTime, nullable=True) # UTC
+    last_run_at = db.Column(db.DateTime, nullable=True) # UTC
+    created_by_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'category': self.category,
+            'action': self.action,
+            'time_of_day': self.time_of_day,
+            'weekdays': [int(day) for day in self.weekdays],
+            'enabled': self.enabled,
+            'next_run_at': self.next_run_at.isoformat() if self.next_run_at else None,
+            'last_run_at': self.last_run_at.isoformat() if self.last_run_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
 class Log(db.Model):
+    """
+    One audit event. Events are stored as structured columns and their text is rendered
+    when read (utils/audit_messages.render_audit_message); 'message' only holds the
+    preformatted text of entries written before that.
+    """
+    __table_args__ = (
+        db.Index('ix_log_category_timestamp', 'category', 'timestamp'),
+        db.Index('ix_log_entity', 'entity_type', 'entity_id', 'timestamp'),
+        db.Index('ix_log_user_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_log_action_timestamp', 'action', 'timestamp'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    message = db.Column(db.Text, nullable=False)
+    message = db.Column(db.Text, nullable=False, default='') # Legacy preformatted text; '' for structured events
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     category = db.Column(db.String(50), nullable=False) # 'tech', 'maintenance', 'administration'
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True) # User who performed the action
+    action = db.Column(db.String(50), nullable=True) # e.g. 'task.completed', 'ticket.assigned'; NULL on legacy rows
+    entity_type = db.Column(db.String(50), nullable=True) # 'task', 'ticket', 'equipment_request', ...
+    entity_id = db.Column(db.String(50), nullable=True)
+    details = db.Column(db.Text, nullable=True) # JSON with the values the message is rendered from
 
     def to_dict(self):
         return {
             'id': self.id,
-            'message': self.message,
+            'message': render_audit_message(self),
             'timestamp': self.timestamp.isoformat(),
             'category': self.category,
-            'user_email': self.log_user.email if self.log_user else None
-        }
\ No newline at end of file
+            'user_email': self.log_user.email if self.log_user else None,
+            'action': self.action,
+            'entity_type': self.entity_type,
+            'entity_id': self.entity_id
+        }
+
+class LogArchiveSegment(db.Model):
+    """An immutable, gzipped NDJSON file of audit events moved out of the live Log table."""
+    __table_args__ = (db.Index('ix_log_archive_category_range', 'category', 'start_at', 'end_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(50), nullable=False)
+    start_at = db.Column(db.DateTime, nullable=False) # Timestamp of the oldest event in the segment
+    end_at = db.Column(db.DateTime, nullable=False) # Timestamp of the newest event in the segment
+    row_count = db.Column(db.Integer, nullable=False)
+    storage_key = db.Column(db.String(512), unique=True, nullable=False) # Key in the attachment storage backend
+    size_bytes = db.Column(db.Integer, nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False) # Of the compressed file, to verify downloads
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'category': self.category,
+            'start_at': self.start_at.isoformat(),
+            'end_at': self.end_at.isoformat(),
+            'row_count': self.row_count,
+            'size_bytes': self.size_bytes,
+            'sha256': self.sha256,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -5,4 +5,11 @@ from .ticket_routes import ticket_bp
 from .request_routes import request_bp
 from .task_manager_routes import task_manager_bp
 from .general_routes import general_bp
-from .gemini_routes import gemini_bp
\ No newline at end of file
+from .gemini_routes import gemini_bp
+from .calendar_routes import calendar_bp
+from .sla_routes import sla_bp
+from .assignment_routes import assignment_bp
+from .audit_routes import audit_bp
+from .analytics_routes import analytics_bp
+from .batch_routes import batch_bp
+from .report_routes import report_bp
@@ -0,0 +1,41 @@
+from datetime import date, datetime, timedelta
+from flask import Blueprint, request, jsonify
+from services.analytics_service import get_analytics
+from utils.audit_messages import DISPLAY_TZ
+from utils.auth_decorators import admin_required_api
+from utils.helpers import to_naive_utc
+
+analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
+
+
+@analytics_bp.route('/', methods=['GET'])
+@admin_required_api
+def analytics_report():
+    """
+    Tickets opened/closed per department, time to close and request volumes by type.
+    Params: granularity ('day', the default, or 'hour'), since/until (YYYY-MM-DD local days for 'day',
+    ISO datetimes for 'hour', UTC unless they carry an offset; until is exclusive, default is the last 30 days or 24 hours), department.
+    """
+    granularity = request.args.get('granularity', 'day')
+    if granularity == 'hour':
+        def parse(value):
+            return to_naive_utc(datetime.fromisoformat(value)) # Offsets such as 'Z' compare with the naive UTC buckets
+    else:
+        parse = date.fromisoformat
+    try:
+        until = parse(request.args['until']) if request.args.get('until') else None
+        since = parse(request.args['since']) if request.args.get('since') else None
+    except ValueError:
+        return jsonify({'message': 'since/until must be ISO dates (or datetimes for hourly data).'}), 400
+
+    if granularity == 'hour':
+        until = until or datetime.utcnow() + timedelta(hours=1)
+        since = since or until - timedelta(hours=24)
+    else:
+        until = until or datetime.now(DISPLAY_TZ).date() + timedelta(days=1)
+        since = since or until - timedelta(days=30)
+
+    report, error = get_analytics(since, until, granularity, request.args.get('department'))
+    if error:
+        return jsonify({'message': error}), 400
+    return jsonify(report), 200
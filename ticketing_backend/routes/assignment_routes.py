@@ -0,0 +1,34 @@
+from flask import Blueprint, request, jsonify
+from services.assignment_service import (
+    get_assignment_policies, set_assignment_policy, get_workload_summary, DEPARTMENT_ADMIN_DIRECTORY
+)
+from utils.auth_decorators import admin_required_api, super_admin_required_api
+
+assignment_bp = Blueprint('assignment', __name__, url_prefix='/api/assignment')
+
+
+@assignment_bp.route('/policies', methods=['GET'])
+@admin_required_api
+def list_assignment_policies():
+    return jsonify(get_assignment_policies()), 200
+
+
+@assignment_bp.route('/policies/<string:department>', methods=['PUT'])
+@super_admin_required_api
+def update_assignment_policy(department):
+    data = request.get_json() or {}
+    if not isinstance(data.get('enabled'), bool):
+        return jsonify({'message': "'enabled' must be true or false."}), 400
+    policy, error = set_assignment_policy(department, data['enabled'])
+    if error:
+        return jsonify({'message': error}), 400
+    return jsonify(policy.to_dict()), 200
+
+
+@assignment_bp.route('/workload', methods=['GET'])
+@admin_required_api
+def workload_summary():
+    department = request.args.get('department')
+    if department and department not in DEPARTMENT_ADMIN_DIRECTORY:
+        return jsonify({'message': f"Unknown department '{department}'."}), 400
+    return jsonify(get_workload_summary(department)), 200
@@ -0,0 +1,41 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from services.audit_service import get_audit_events
+from services.user_service import get_user_by_email
+from utils.auth_decorators import admin_required_api
+
+audit_bp = Blueprint('audit', __name__, url_prefix='/api/audit')
+
+
+@audit_bp.route('/', methods=['GET'])
+@admin_required_api
+def list_audit_events():
+    """
+    Filters: category, actor (email), entity_type, entity_id, action, since/until (ISO datetimes, UTC), limit.
+    e.g. /api/audit/?entity_type=ticket&entity_id=123 for one ticket's history.
+    """
+    actor_id = None
+    actor = request.args.get('actor')
+    if actor:
+        user = get_user_by_email(actor)
+        if not user:
+            return jsonify([]), 200
+        actor_id = user.id
+
+    try:
+        since = datetime.fromisoformat(request.args['since']) if request.args.get('since') else None
+        until = datetime.fromisoformat(request.args['until']) if request.args.get('until') else None
+    except ValueError:
+        return jsonify({'message': 'since/until must be ISO datetimes.'}), 400
+
+    events = get_audit_events(
+        category=request.args.get('category'),
+        actor_id=actor_id,
+        entity_type=request.args.get('entity_type'),
+        entity_id=request.args.get('entity_id'),
+        action=request.args.get('action'),
+        since=since,
+        until=until,
+        limit=min(max(request.args.get('limit', 100, type=int), 1), 500)
+    )
+    return jsonify([event.to_dict() for event in events]), 200
@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from flask import Blueprint, request, jsonify, current_app, g
+from flask_login import current_user
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+from models import db
+from config import Config
+
+batch_bp = Blueprint('batch', __name__, url_prefix='/api/batch')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=Config.BATCH_MAX_WORKERS, thread_name_prefix='batch')
+    return _executor
+
+
+def _normalize_path(app, path):
+    """Accepts '/api/...' paths or ones relative to the API root ('/tasks/statistics'), and follows trailing-slash redirects."""
+    if not path.startswith('/api/'):
+        path = '/api' + (path if path.startswith('/') else '/' + path)
+    parts = urlsplit(path)
+    try:
+        app.url_map.bind('localhost').match(parts.path, method='GET')
+    except RequestRedirect as redirect:
+        return urlsplit(redirect.new_url).path + (f"?{parts.query}" if parts.query else '')
+    except HTTPException:
+        pass # Dispatch reports the 404/405 for this sub-request
+    return path
+
+
+def _dispatch(app, path, headers, user):
+    """
+    Runs one GET route in a request context of its own, without the before_request hooks the
+    batch request already ran. The identity loaded for the batch is handed to Flask-Login
+    instead of being loaded again.
+    """
+    with app.test_request_context(path, method='GET', headers=headers):
+        g._login_user = user
+        try:
+            response = app.make_response(app.dispatch_request())
+        except HTTPException as e:
+            response = app.make_response(app.handle_user_exception(e))
+        except Exception:
+            db.session.rollback()
+            app.logger.exception(f"Batched request to {path} failed.")
+            return 500, {'message': 'Internal Server Error', 'error': 'An unexpected error occurred.'}
+
+        if response.is_streamed:
+            response.close()
+            return 400, {'message': 'Streaming responses (downloads) are not supported in a batch.'}
+        body = response.get_json(silent=True) if response.is_json else response.get_data(as_text=True)
+        return response.status_code, body
+
+
+def _dispatch_in_thread(app, path, headers, user):
+    with app.app_context():
+        if getattr(user, 'is_authenticated', False):
+            user = db.session.merge(user, load=False) # A copy attached to this thread's session
+        return _dispatch(app, path, headers, user)
+
+
+@batch_bp.route('', methods=['POST'])
+def batch_api():
+    """
+    Runs several GET requests in one round-trip, e.g. for a dashboard page load.
+    Body: {"requests": [{"id": "stats", "path": "/tasks/statistics"}, ...], "parallel": false}.
+    Each sub-request gets the same identity and license check as this request and keeps its own
+    status and authorization rules. Returns {"responses": [{"id", "status", "body"}, ...]} in order.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('requests')
+    if not isinstance(items, list) or not items:
+        return jsonify({'message': 'requests must be a non-empty list.'}), 400
+    if len(items) > Config.BATCH_MAX_REQUESTS:
+        return jsonify({'message': f'At most {Config.BATCH_MAX_REQUESTS} requests per batch.'}), 400
+
+    app = current_app._get_current_object()
+    paths = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str) or not item['path']:
+            return jsonify({'message': f'Request {index} needs a path.'}), 400
+        if item.get('method', 'GET').upper() != 'GET':
+            return jsonify({'message': f'Request {index}: only GET requests can be batched.'}), 400
+        path = _normalize_path(app, item['path'])
+        if urlsplit(path).path.rstrip('/') == '/api/batch':
+            return jsonify({'message': f'Request {index}: batches cannot be nested.'}), 400
+        paths.append(path)
+
+    headers = [(key, value) for key, value in request.headers if key.lower() not in ('content-type', 'content-length')]
+    user = current_user._get_current_object() # Loaded once for every sub-request
+
+    if data.get('parallel') and len(paths) > 1:
+        futures = [_get_executor().submit(_dispatch_in_thread, app, path, headers, user) for path in paths]
+        results = [future.result() for future in futures]
+    else:
+        results = [_dispatch(app, path, headers, user) for path in paths]
+
+    return jsonify({
+        'responses': [
+            {'id': item.get('id', index), 'status': status, 'body': body}
+            for index, (item, (status, body)) in enumerate(zip(items, results))
+        ]
+    }), 200
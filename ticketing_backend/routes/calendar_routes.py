@@ -0,0 +1,64 @@
+from flask import Blueprint, Response, request, jsonify, g
+from services.calendar_service import (
+    get_feed, get_calendar_token, rotate_calendar_token, resolve_calendar_token,
+    CALENDAR_DEPARTMENTS, FEED_MAX_AGE
+)
+from services.user_service import get_tech_admins
+from utils.auth_decorators import login_required_api
+
+calendar_bp = Blueprint('calendar', __name__, url_prefix='/api/calendar')
+
+
+def _feed_urls(token, user):
+    urls = {'user': f'/api/calendar/{token}/user.ics', 'departments': {}}
+    if user.role == 'admin' and user.email in get_tech_admins():
+        for department in CALENDAR_DEPARTMENTS:
+            urls['departments'][department] = f'/api/calendar/{token}/departments/{department}.ics'
+    return urls
+
+
+@calendar_bp.route('/feeds', methods=['GET'])
+@login_required_api
+def get_feed_urls():
+    return jsonify(_feed_urls(get_calendar_token(g.user), g.user)), 200
+
+
+@calendar_bp.route('/feeds/rotate', methods=['POST'])
+@login_required_api
+def rotate_feed_token():
+    """Invalidates previously shared feed URLs."""
+    return jsonify(_feed_urls(rotate_calendar_token(g.user), g.user)), 200
+
+
+def _feed_response(feed_key):
+    feed = get_feed(feed_key)
+    response = Response(feed.body, mimetype='text/calendar')
+    response.set_etag(feed.etag)
+    response.last_modified = feed.last_modified
+    response.cache_control.private = True
+    response.cache_control.max_age = int(FEED_MAX_AGE.total_seconds())
+    # Answers If-None-Match / If-Modified-Since with 304 and no body
+    return response.make_conditional(request)
+
+
+# Calendar apps can't log in, so feeds are authorized by the secret token in the URL
+@calendar_bp.route('/<string:token>/user.ics', methods=['GET'])
+def user_feed(token):
+    identity = resolve_calendar_token(token)
+    if not identity:
+        return jsonify({'message': 'Unknown calendar feed.'}), 404
+    user_id, _ = identity
+    return _feed_response(f'user:{user_id}')
+
+
+@calendar_bp.route('/<string:token>/departments/<string:department>.ics', methods=['GET'])
+def department_feed(token, department):
+    identity = resolve_calendar_token(token)
+    if not identity:
+        return jsonify({'message': 'Unknown calendar feed.'}), 404
+    if department not in CALENDAR_DEPARTMENTS:
+        return jsonify({'message': 'No calendar feed for this department.'}), 404
+    _, is_it_admin = identity
+    if not is_it_admin:
+        return jsonify({'message': f'Authorization denied. Admin access for {department} required.'}), 403
+    return _feed_response(f'dept:{department}')
@@ -1,6 +1,7 @@
 from flask import Blueprint, g, request, jsonify
 from utils.email_sender import send_report_email
 from utils.auth_decorators import login_required_api
+from services.autocomplete_service import autocomplete, AUTOCOMPLETE_SOURCES
 
 general_bp = Blueprint('general', __name__, url_prefix='/api')
 
@@ -25,6 +26,18 @@ def report_bug_api():
     send_report_email(subject, message)
     return jsonify({'message': 'Report sent successfully!'}), 200
 
+@general_bp.route('/autocomplete/<string:field>', methods=['GET'])
+@login_required_api
+def autocomplete_api(field):
+    if field not in AUTOCOMPLETE_SOURCES:
+        return jsonify({'message': f"Invalid field. Use: {', '.join(AUTOCOMPLETE_SOURCES)}."}), 400
+    if field == 'user' and g.user.role != 'admin':
+        return jsonify({'message': 'Authorization denied. Admin access required.'}), 403
+
+    prefix = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    return jsonify({'field': field, 'suggestions': autocomplete(field, prefix, limit)}), 200
+
 # You can add a route for EULA or FAQ if you store them as static files
 # or if the frontend is expected to fetch content from the backend.
 # @general_bp.route('/eula', methods=['GET'])
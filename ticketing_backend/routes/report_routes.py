@@ -0,0 +1,70 @@
+from datetime import date
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from services.report_service import (
+    get_reports, get_report, generate_report, report_email_key, REPORT_DEPARTMENTS, REPORT_PERIODS
+)
+from utils.storage import get_storage
+from utils.auth_decorators import admin_required_api
+
+report_bp = Blueprint('reports', __name__, url_prefix='/api/reports')
+
+
+@report_bp.route('/', methods=['GET'])
+@admin_required_api
+def list_reports():
+    """Generated reports, newest first. Filters: department, period ('weekly' or 'monthly'), limit."""
+    department = request.args.get('department')
+    period = request.args.get('period')
+    if department and department not in REPORT_DEPARTMENTS:
+        return jsonify({'message': f"department must be one of: {', '.join(REPORT_DEPARTMENTS)}."}), 400
+    if period and period not in REPORT_PERIODS:
+        return jsonify({'message': f"period must be one of: {', '.join(REPORT_PERIODS)}."}), 400
+    limit = min(max(request.args.get('limit', 52, type=int), 1), 200)
+    return jsonify([report.to_dict() for report in get_reports(department, period, limit)]), 200
+
+
+def _stored_report_response(key, mimetype):
+    return Response(stream_with_context(get_storage().iter_chunks(key)), mimetype=mimetype)
+
+
+@report_bp.route('/<int:report_id>', methods=['GET'])
+@admin_required_api
+def get_report_snapshot(report_id):
+    """The stored JSON snapshot, served as-is without touching the live tables."""
+    report = get_report(report_id)
+    if not report:
+        return jsonify({'message': 'Report not found.'}), 404
+    return _stored_report_response(report.storage_key, 'application/json')
+
+
+@report_bp.route('/<int:report_id>/email', methods=['GET'])
+@admin_required_api
+def get_report_email(report_id):
+    report = get_report(report_id)
+    if not report:
+        return jsonify({'message': 'Report not found.'}), 404
+    return _stored_report_response(report_email_key(report), 'text/plain')
+
+
+@report_bp.route('/generate', methods=['POST'])
+@admin_required_api
+def generate_report_now():
+    """
+    Body: department, period, optional period_start (any YYYY-MM-DD inside the wanted week/month;
+    default is the last finished one), regenerate (replace an existing report) and email.
+    """
+    data = request.get_json() or {}
+    try:
+        period_start = date.fromisoformat(data['period_start']) if data.get('period_start') else None
+    except (TypeError, ValueError):
+        return jsonify({'message': 'period_start must be YYYY-MM-DD.'}), 400
+    report, error = generate_report(
+        data.get('department'),
+        data.get('period'),
+        period_start=period_start,
+        regenerate=bool(data.get('regenerate')),
+        email=bool(data.get('email'))
+    )
+    if error:
+        return jsonify({'message': error}), 409 if 'already exists' in error else 400
+    return jsonify(report.to_dict()), 201
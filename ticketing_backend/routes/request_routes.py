@@ -4,15 +4,47 @@ from services.request_service import (
     approve_equipment_request, deny_equipment_request, close_equipment_request,
     create_user_request, get_user_requests, get_user_request_by_id, close_user_request,
     create_student_request, get_student_requests, get_student_request_by_id,
-    close_student_request, toggle_student_status
+    close_student_request, toggle_student_status,
+    get_request_inbox, INBOX_PAGE_SIZE, INBOX_TYPES,
+    get_equipment_items, create_equipment_item, update_equipment_item, get_equipment_availability,
+    import_student_requests, update_student_checklists, get_student_onboarding_progress,
+    STUDENT_CHECKLIST_FIELDS
 )
+from datetime import datetime
+import csv
+import io
 from utils.auth_decorators import login_required_api, admin_required_api, department_admin_required_api
+from utils.idempotency import idempotent
 
 request_bp = Blueprint('requests', __name__, url_prefix='/api/requests')
 
+# --- Unified Inbox ---
+@request_bp.route('/inbox', methods=['GET'])
+@login_required_api
+def request_inbox():
+    types_param = request.args.get('types')
+    types = [t.strip() for t in types_param.split(',')] if types_param else None
+    if types and any(t not in INBOX_TYPES for t in types):
+        return jsonify({'message': f"Invalid request type. Use: {', '.join(INBOX_TYPES)}."}), 400
+    limit = min(max(request.args.get('limit', INBOX_PAGE_SIZE, type=int), 1), 100)
+
+    try:
+        items, next_cursor = get_request_inbox(
+            current_user_id=g.user.id,
+            is_admin=(g.user.role == 'admin'),
+            types=types,
+            status=request.args.get('status'),
+            cursor=request.args.get('cursor'),
+            limit=limit
+        )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return jsonify({'items': items, 'next_cursor': next_cursor})
+
 # --- Equipment Requests ---
 @request_bp.route('/equipment', methods=['POST'])
 @login_required_api
+@idempotent
 def create_equipment_ticket_api():
     data = request.get_json()
     required_fields = ['name', 'event', 'date', 'time', 'location', 'equipment', 'description', 'return_date', 'return_time']
@@ -41,7 +73,8 @@ def list_equipment_requests():
     requests = get_equipment_requests(
         search_keyword=search_keyword,
         current_user_id=g.user.id,
-        is_admin=(g.user.role == 'admin')
+        is_admin=(g.user.role == 'admin'),
+        overdue=request.args.get('overdue', 'false').lower() == 'true'
     )
     return jsonify([req.to_dict() for req in requests])
 
@@ -59,28 +92,81 @@ def get_equipment_request_details(request_id):
 @request_bp.route('/equipment/<string:request_id>/approve', methods=['PUT'])
 @department_admin_required_api('IT') # IT admin to approve
 def approve_equipment_request_route(request_id):
-    req, error = approve_equipment_request(request_id)
-    if error: return jsonify({'message': error}), 404
-    return jsonify({'message': f'Request {request_id} approved. Notification sent.', 'request': req.to_dict()})
+    data = request.get_json(silent=True) or {}
+    equipment_item_ids = data.get('equipment_item_ids')
+    if equipment_item_ids is not None and not isinstance(equipment_item_ids, list):
+        return jsonify({'message': 'equipment_item_ids must be a list.'}), 400
+
+    req, error = approve_equipment_request(request_id, equipment_item_ids, g.user.id)
+    if error:
+        if 'not found' in error:
+            return jsonify({'message': error}), 404
+        if error.startswith('Equipment conflict'):
+            return jsonify({'message': error}), 409
+        return jsonify({'message': error}), 400
+    return jsonify({
+        'message': f'Request {request_id} approved. Notification sent.',
+        'request': req.to_dict(),
+        'reservations': [r.to_dict() for r in req.reservations]
+    })
 
 @request_bp.route('/equipment/<string:request_id>/deny', methods=['PUT'])
 @department_admin_required_api('IT') # IT admin to deny
 def deny_equipment_request_route(request_id):
-    req, error = deny_equipment_request(request_id)
+    req, error = deny_equipment_request(request_id, g.user.id)
     if error: return jsonify({'message': error}), 404
     return jsonify({'message': f'Request {request_id} denied. Notification sent.', 'request': req.to_dict()})
 
 @request_bp.route('/equipment/<string:request_id>/close', methods=['PUT'])
 @department_admin_required_api('IT') # IT admin to close
 def close_equipment_request_route(request_id):
-    req = close_equipment_request(request_id)
+    req = close_equipment_request(request_id, g.user.id)
     if not req:
         return jsonify({'message': 'Equipment request not found.'}), 404
     return jsonify({'message': f'Request {request_id} has been closed.', 'request': req.to_dict()})
 
+# --- Equipment Inventory and Availability ---
+@request_bp.route('/equipment/items', methods=['GET'])
+@login_required_api
+def list_equipment_items():
+    include_inactive = request.args.get('include_inactive', 'false').lower() == 'true'
+    return jsonify([item.to_dict() for item in get_equipment_items(include_inactive)])
+
+@request_bp.route('/equipment/items', methods=['POST'])
+@department_admin_required_api('IT') # IT admin manages the inventory
+def create_equipment_item_api():
+    data = request.get_json()
+    if not data.get('name'):
+        return jsonify({'message': 'Item name is required.'}), 400
+    item, error = create_equipment_item(data['name'], data.get('category'))
+    if error: return jsonify({'message': error}), 400
+    return jsonify(item.to_dict()), 201
+
+@request_bp.route('/equipment/items/<int:item_id>', methods=['PUT'])
+@department_admin_required_api('IT')
+def update_equipment_item_api(item_id):
+    data = request.get_json()
+    item = update_equipment_item(item_id, name=data.get('name'), category=data.get('category'), active=data.get('active'))
+    if not item:
+        return jsonify({'message': 'Equipment item not found.'}), 404
+    return jsonify(item.to_dict())
+
+@request_bp.route('/equipment/availability', methods=['GET'])
+@login_required_api
+def equipment_availability():
+    try:
+        start_at = datetime.fromisoformat(request.args.get('start', ''))
+        end_at = datetime.fromisoformat(request.args.get('end', ''))
+    except ValueError:
+        return jsonify({'message': 'start and end must be ISO date-times, e.g. 2025-05-02T14:00.'}), 400
+    if end_at <= start_at:
+        return jsonify({'message': 'end must be after start.'}), 400
+    return jsonify(get_equipment_availability(start_at, end_at, category=request.args.get('category')))
+
 # --- User Requests (New Employee) ---
 @request_bp.route('/users', methods=['POST'])
 @login_required_api
+@idempotent
 def create_new_user_request_api():
     data = request.get_json()
     required_fields = ['fname', 'lname', 'job_title', 'department', 'start_date', 'description']
@@ -106,7 +192,8 @@ def list_user_requests():
     requests = get_user_requests(
         search_keyword=search_keyword,
         current_user_id=g.user.id,
-        is_admin=(g.user.role == 'admin')
+        is_admin=(g.user.role == 'admin'),
+        overdue=request.args.get('overdue', 'false').lower() == 'true'
     )
     return jsonify([req.to_dict() for req in requests])
 
@@ -123,7 +210,7 @@ def get_user_request_details(request_id):
 @request_bp.route('/users/<string:request_id>/close', methods=['PUT'])
 @department_admin_required_api('IT') # IT admin to close
 def close_user_request_route(request_id):
-    req = close_user_request(request_id)
+    req = close_user_request(request_id, g.user.id)
     if not req:
         return jsonify({'message': 'User request not found.'}), 404
     return jsonify({'message': f'Request {request_id} has been closed.', 'request': req.to_dict()})
@@ -131,6 +218,7 @@ def close_user_request_route(request_id):
 # --- Student Requests ---
 @request_bp.route('/students', methods=['POST'])
 @login_required_api
+@idempotent
 def create_new_student_request_api():
     data = request.get_json()
     required_fields = ['fname', 'lname', 'grade', 'teacher', 'description']
@@ -147,6 +235,31 @@ def create_new_student_request_api():
     )
     return jsonify(req.to_dict()), 201
 
+@request_bp.route('/students/import', methods=['POST'])
+@department_admin_required_api('IT') # IT admin bulk-imports students
+@idempotent
+def import_student_requests_api():
+    """Accepts a CSV upload ('file') or a JSON list of students (or {'students': [...]})."""
+    partial = request.args.get('partial', 'false').lower() == 'true'
+    file = request.files.get('file')
+    if file:
+        try:
+            rows = list(csv.DictReader(io.TextIOWrapper(file.stream, encoding='utf-8-sig')))
+        except (UnicodeDecodeError, csv.Error) as e:
+            return jsonify({'message': f'Could not read CSV file: {str(e)}'}), 400
+    else:
+        data = request.get_json(silent=True)
+        rows = data.get('students') if isinstance(data, dict) else data
+        if not isinstance(rows, list):
+            return jsonify({'message': 'Provide a CSV file or a JSON list of students.'}), 400
+    if not rows:
+        return jsonify({'message': 'No rows to import.'}), 400
+
+    report = import_student_requests(rows, g.user.id, partial=partial)
+    if report['created'] == 0:
+        return jsonify({'message': 'No student requests were imported.', **report}), 400
+    return jsonify({'message': f"Imported {report['created']} student request(s).", **report}), 201
+
 @request_bp.route('/students', methods=['GET'])
 @login_required_api
 def list_student_requests():
@@ -154,7 +267,8 @@ def list_student_requests():
     requests = get_student_requests(
         search_keyword=search_keyword,
         current_user_id=g.user.id,
-        is_admin=(g.user.role == 'admin')
+        is_admin=(g.user.role == 'admin'),
+        overdue=request.args.get('overdue', 'false').lower() == 'true'
     )
     return jsonify([req.to_dict() for req in requests])
 
@@ -171,7 +285,7 @@ def get_student_request_details(request_id):
 @request_bp.route('/students/<string:request_id>/close', methods=['PUT'])
 @department_admin_required_api('IT') # IT admin to close
 def close_student_request_route(request_id):
-    req = close_student_request(request_id)
+    req = close_student_request(request_id, g.user.id)
     if not req:
         return jsonify({'message': 'Student request not found.'}), 404
     return jsonify({'message': f'Request {request_id} has been closed.', 'request': req.to_dict()})
@@ -179,11 +293,38 @@ def close_student_request_route(request_id):
 @request_bp.route('/students/<string:request_id>/toggle/<string:status_field>', methods=['PUT'])
 @department_admin_required_api('IT') # IT admin to toggle student statuses
 def toggle_student_status_route(request_id, status_field):
-    allowed_fields = ['email_created', 'computer_created', 'bag_created', 'id_card_created', 'azure_created']
-    if status_field not in allowed_fields:
+    if status_field not in STUDENT_CHECKLIST_FIELDS:
         return jsonify({'message': 'Invalid status field.'}), 400
 
     req = toggle_student_status(request_id, status_field)
     if not req:
         return jsonify({'message': 'Student request not found or invalid field.'}), 404
-    return jsonify({'message': f'{status_field} toggled for request {request_id}.', 'request': req.to_dict()})
\ No newline at end of file
+    return jsonify({'message': f'{status_field} toggled for request {request_id}.', 'request': req.to_dict()})
+
+@request_bp.route('/students/checklist', methods=['PATCH'])
+@department_admin_required_api('IT')
+def update_student_checklists_route():
+    """Body: {"students": [{"id": "...", "version": 3}, ...], "fields": {"email_created": true, ...}}"""
+    data = request.get_json(silent=True) or {}
+    students = data.get('students')
+    fields = data.get('fields')
+    if not isinstance(students, list) or not all(isinstance(s, dict) and s.get('id') for s in students):
+        return jsonify({'message': 'students must be a list of {"id", "version"} objects.'}), 400
+    versions = [s.get('version') for s in students]
+    if any(v is not None and (isinstance(v, bool) or not isinstance(v, int)) for v in versions):
+        return jsonify({'message': 'Each student version must be an integer or null.'}), 400
+    if not isinstance(fields, dict):
+        return jsonify({'message': 'fields must be an object of checklist field -> true/false.'}), 400
+
+    updated, error, stale_ids = update_student_checklists(students, fields)
+    if error:
+        if stale_ids:
+            return jsonify({'message': error, 'stale_ids': stale_ids}), 409
+        return jsonify({'message': error}), 400
+    return jsonify({'message': f'Updated {len(updated)} student request(s).', 'requests': [req.to_dict() for req in updated]})
+
+@request_bp.route('/students/progress', methods=['GET'])
+@login_required_api
+def student_onboarding_progress():
+    status = request.args.get('status', 'open')
+    return jsonify(get_student_onboarding_progress(status=None if status == 'all' else status))
@@ -0,0 +1,38 @@
+from flask import Blueprint, request, jsonify
+from services.sla_service import get_sla_targets, set_sla_target, get_overdue_counts, sweep_sla_breaches
+from utils.auth_decorators import admin_required_api
+
+sla_bp = Blueprint('sla', __name__, url_prefix='/api/sla')
+
+
+@sla_bp.route('/targets', methods=['GET'])
+@admin_required_api
+def list_sla_targets():
+    targets = [
+        {'item_type': item_type, 'department': department, 'target_hours': hours}
+        for (item_type, department), hours in sorted(get_sla_targets().items())
+    ]
+    return jsonify(targets), 200
+
+
+@sla_bp.route('/targets', methods=['PUT'])
+@admin_required_api
+def update_sla_target():
+    data = request.get_json() or {}
+    target, error = set_sla_target(data.get('item_type'), data.get('department'), data.get('target_hours'))
+    if error:
+        return jsonify({'message': error}), 400
+    return jsonify(target.to_dict()), 200
+
+
+@sla_bp.route('/overdue', methods=['GET'])
+@admin_required_api
+def overdue_counts():
+    return jsonify(get_overdue_counts()), 200
+
+
+@sla_bp.route('/sweep', methods=['POST'])
+@admin_required_api
+def run_sla_sweep():
+    """Runs a sweep now, e.g. right after tightening a target."""
+    return jsonify({'breached': sweep_sla_breaches()}), 200
@@ -1,12 +1,18 @@
-from flask import Blueprint, request, jsonify, g, send_file
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, g, stream_with_context
 from services.task_manager_service import (
     add_task, complete_task, reset_task, delete_task,
-    get_tasks_by_category, get_logs_by_category,
-    clear_logs_by_category, download_logs_by_category_to_file,
-    get_dashboard_statistics
+    complete_tasks, reset_tasks, delete_tasks, TASK_BATCH_MAX,
+    get_task_schedules, create_task_schedule, update_task_schedule, delete_task_schedule,
+    get_tasks_by_category, get_logs_page, LOGS_PAGE_SIZE,
+    clear_logs_by_category, iter_log_export_lines, LOG_EXPORT_FORMATS
 )
+from services.dashboard_service import get_dashboard_statistics
+from services.log_archive_service import get_log_archive_segments, get_log_archive_segment, search_log_archives
+from utils.storage import get_storage
+from utils.text_stream import stream_text
 from utils.auth_decorators import admin_required_api, login_required_api
-import os
+from utils.helpers import to_naive_utc
 
 task_manager_bp = Blueprint('tasks', __name__, url_prefix='/api/tasks')
 
@@ -77,6 +83,93 @@ def delete_task_api(task_id):
         return jsonify({'message': f'Task {task_id} deleted successfully.'})
     return jsonify({'message': 'Task not found.'}), 404
 
+def _parse_task_batch(require_ids=False):
+    """Returns (category, task_ids or None for every task in the category, error)."""
+    data = request.get_json() or {}
+    category = data.get('category')
+    if not category or category not in ['tech', 'maintenance', 'administration']:
+        return None, None, 'Valid category is required.'
+    task_ids = data.get('task_ids')
+    if task_ids is None:
+        if require_ids:
+            return None, None, 'task_ids is required.'
+        return category, None, None
+    if not isinstance(task_ids, list) or not all(isinstance(task_id, int) for task_id in task_ids):
+        return None, None, 'task_ids must be a list of task ids.'
+    if len(task_ids) > TASK_BATCH_MAX:
+        return None, None, f'At most {TASK_BATCH_MAX} tasks per batch.'
+    return category, task_ids, None
+
+@task_manager_bp.route('/batch/complete', methods=['PUT'])
+@admin_required_api
+def complete_tasks_api():
+    """Completes the listed tasks, or every uncompleted task in the category when task_ids is omitted."""
+    category, task_ids, error = _parse_task_batch()
+    if error:
+        return jsonify({'message': error}), 400
+    changed_ids = complete_tasks(category, g.user.id, task_ids)
+    return jsonify({'updated': len(changed_ids), 'task_ids': changed_ids})
+
+@task_manager_bp.route('/batch/reset', methods=['PUT'])
+@admin_required_api
+def reset_tasks_api():
+    """Resets the listed tasks, or every completed task in the category when task_ids is omitted."""
+    category, task_ids, error = _parse_task_batch()
+    if error:
+        return jsonify({'message': error}), 400
+    changed_ids = reset_tasks(category, g.user.id, task_ids)
+    return jsonify({'updated': len(changed_ids), 'task_ids': changed_ids})
+
+@task_manager_bp.route('/batch', methods=['DELETE'])
+@admin_required_api
+def delete_tasks_api():
+    category, task_ids, error = _parse_task_batch(require_ids=True)
+    if error:
+        return jsonify({'message': error}), 400
+    deleted_ids = delete_tasks(category, g.user.id, task_ids)
+    return jsonify({'deleted': len(deleted_ids), 'task_ids': deleted_ids})
+
+@task_manager_bp.route('/schedules', methods=['GET'])
+@admin_required_api
+def get_task_schedules_api():
+    category = request.args.get('category')
+    if category and category not in ['tech', 'maintenance', 'administration']:
+        return jsonify({'message': 'Invalid category.'}), 400
+    return jsonify([schedule.to_dict() for schedule in get_task_schedules(category)])
+
+@task_manager_bp.route('/schedules', methods=['POST'])
+@admin_required_api
+def create_task_schedule_api():
+    """Body: category, time_of_day ('06:00', local time), optional weekdays (Monday = 0; default every day)."""
+    data = request.get_json() or {}
+    category = data.get('category')
+    if not category or category not in ['tech', 'maintenance', 'administration']:
+        return jsonify({'message': 'Valid category is required.'}), 400
+    schedule, error = create_task_schedule(
+        category, data.get('time_of_day'), g.user.id, weekdays=data.get('weekdays'), action=data.get('action', 'reset')
+    )
+    if error:
+        return jsonify({'message': error}), 400
+    return jsonify(schedule.to_dict()), 201
+
+@task_manager_bp.route('/schedules/<int:schedule_id>', methods=['PUT'])
+@admin_required_api
+def update_task_schedule_api(schedule_id):
+    data = request.get_json() or {}
+    schedule, error = update_task_schedule(
+        schedule_id, time_of_day=data.get('time_of_day'), weekdays=data.get('weekdays'), enabled=data.get('enabled')
+    )
+    if error:
+        return jsonify({'message': error}), 404 if error == "Schedule not found." else 400
+    return jsonify(schedule.to_dict())
+
+@task_manager_bp.route('/schedules/<int:schedule_id>', methods=['DELETE'])
+@admin_required_api
+def delete_task_schedule_api(schedule_id):
+    if delete_task_schedule(schedule_id):
+        return jsonify({'message': f'Schedule {schedule_id} deleted successfully.'})
+    return jsonify({'message': 'Schedule not found.'}), 404
+
 @task_manager_bp.route('/logs', methods=['GET'])
 @admin_required_api
 def get_logs_api():
@@ -84,8 +177,12 @@ def get_logs_api():
     if not category or category not in ['tech', 'maintenance', 'administration']:
         return jsonify({'message': 'Valid category is required.'}), 400
     
-    logs = get_logs_by_category(category)
-    return jsonify([log.to_dict() for log in logs])
+    limit = min(max(request.args.get('limit', LOGS_PAGE_SIZE, type=int), 1), 200)
+    try:
+        logs, next_cursor = get_logs_page(category, cursor=request.args.get('cursor'), limit=limit)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return jsonify({'logs': [log.to_dict() for log in logs], 'next_cursor': next_cursor})
 
 @task_manager_bp.route('/logs/clear', methods=['DELETE'])
 @admin_required_api
@@ -95,24 +192,89 @@ def clear_logs_api():
     if not category or category not in ['tech', 'maintenance', 'administration']:
         return jsonify({'message': 'Valid category is required.'}), 400
     
-    filepath = download_logs_by_category_to_file(category) # Download before clearing
-    if clear_logs_by_category(category):
-        return jsonify({'message': f'Logs for {category} cleared successfully. Backup created at {filepath}'})
-    return jsonify({'message': 'Failed to clear logs.'}), 500
+    segments, archived = clear_logs_by_category(category)
+    return jsonify({
+        'message': f'Logs for {category} cleared successfully. {archived} entries were moved into {segments} archive segment(s).',
+        'archived': archived,
+        'segments': segments
+    })
+
+def _parse_time_range():
+    # Log and segment timestamps are naive UTC, so a bound with an offset ('...Z') is converted to match
+    since = to_naive_utc(datetime.fromisoformat(request.args['since'])) if request.args.get('since') else None
+    until = to_naive_utc(datetime.fromisoformat(request.args['until'])) if request.args.get('until') else None
+    return since, until
+
+@task_manager_bp.route('/logs/archives', methods=['GET'])
+@admin_required_api
+def list_log_archives_api():
+    category = request.args.get('category')
+    if not category or category not in ['tech', 'maintenance', 'administration']:
+        return jsonify({'message': 'Valid category is required.'}), 400
+    try:
+        since, until = _parse_time_range()
+    except ValueError:
+        return jsonify({'message': 'since/until must be ISO datetimes.'}), 400
+    return jsonify([segment.to_dict() for segment in get_log_archive_segments(category, since, until)])
+
+@task_manager_bp.route('/logs/archives/search', methods=['GET'])
+@admin_required_api
+def search_log_archives_api():
+    """Filters: q (text in the message), since/until, action, entity_type, entity_id, actor (email), limit."""
+    category = request.args.get('category')
+    if not category or category not in ['tech', 'maintenance', 'administration']:
+        return jsonify({'message': 'Valid category is required.'}), 400
+    try:
+        since, until = _parse_time_range()
+    except ValueError:
+        return jsonify({'message': 'since/until must be ISO datetimes.'}), 400
+
+    results = search_log_archives(
+        category,
+        text=request.args.get('q'),
+        since=since,
+        until=until,
+        action=request.args.get('action'),
+        entity_type=request.args.get('entity_type'),
+        entity_id=request.args.get('entity_id'),
+        actor=request.args.get('actor'),
+        limit=min(max(request.args.get('limit', 100, type=int), 1), 500)
+    )
+    return jsonify(results)
+
+@task_manager_bp.route('/logs/archives/<int:segment_id>/download', methods=['GET'])
+@admin_required_api
+def download_log_archive_api(segment_id):
+    segment = get_log_archive_segment(segment_id)
+    if not segment:
+        return jsonify({'message': 'Archive segment not found.'}), 404
+    storage = get_storage()
+    response = Response(stream_with_context(storage.iter_chunks(segment.storage_key)), mimetype='application/gzip')
+    response.headers['Content-Disposition'] = f'attachment; filename="{segment.storage_key.rsplit("/", 1)[-1]}"'
+    response.headers['Content-Length'] = str(segment.size_bytes)
+    response.headers['X-Content-SHA256'] = segment.sha256
+    return response
 
 @task_manager_bp.route('/logs/download', methods=['GET'])
 @admin_required_api
 def download_logs_api():
+    """Streams the category's task log. Options: format (txt, csv or ndjson; default txt) and gzip=true."""
     category = request.args.get('category')
     if not category or category not in ['tech', 'maintenance', 'administration']:
         return jsonify({'message': 'Valid category is required.'}), 400
-    
-    filepath = download_logs_by_category_to_file(category)
-    if filepath and os.path.exists(filepath):
-        directory = os.path.dirname(filepath)
-        filename = os.path.basename(filepath)
-        return send_file(filepath, as_attachment=True, download_name=filename)
-    return jsonify({'message': 'No logs to download or failed to create file.'}), 404
+    fmt = request.args.get('format', 'txt').lower()
+    if fmt not in LOG_EXPORT_FORMATS:
+        return jsonify({'message': f"format must be one of: {', '.join(LOG_EXPORT_FORMATS)}."}), 400
+    compress = request.args.get('gzip', 'false').lower() == 'true'
+
+    filename = f"{datetime.now():%Y-%m-%d_%H-%M-%S}_{category}_logs.{fmt}"
+    if compress:
+        filename += '.gz'
+    return Response(
+        stream_with_context(stream_text(iter_log_export_lines(category, fmt), compress=compress)),
+        mimetype='application/gzip' if compress else LOG_EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
 
 @task_manager_bp.route('/statistics', methods=['GET'])
 @login_required_api
@@ -1,29 +1,38 @@
-from flask import Blueprint, request, jsonify, g, send_from_directory
+from flask import Blueprint, Response, request, jsonify, g, send_file, stream_with_context
 from services.ticket_service import (
     create_ticket,
     get_tickets,
     add_comment_to_ticket,
     close_ticket,
     delete_ticket,
+    get_ticket_purge_job,
     assign_ticket,
     get_ticket_by_id,
     get_total_comments_for_ticket,
+    get_ticket_comments_page,
+    COMMENTS_PAGE_SIZE,
     get_attachment_by_id,
+    iter_ticket_attachments,
+    merge_tickets,
 )
+from services.duplicate_service import find_similar_tickets
 from utils.auth_decorators import (
     login_required_api,
     admin_required_api,
     department_admin_required_api,
 )
+from utils.idempotency import idempotent
+from utils.storage import get_storage
+from utils.zip_stream import stream_zip
 from config import Config
 import os
-from models import Comment
 
 ticket_bp = Blueprint("tickets", __name__, url_prefix="/api/tickets")
 
 
 @ticket_bp.route("/", methods=["POST"])
 @login_required_api
+@idempotent
 def create_new_ticket():
     file = request.files.get("file", None)
 
@@ -54,7 +63,13 @@ def create_new_ticket():
             department=department,
             file=file,
         )
-        return jsonify(ticket.to_dict()), 201
+        data = ticket.to_dict()
+        # Lets the form point the user at an existing ticket for the same problem
+        data["possible_duplicates"] = find_similar_tickets(
+            title, description, location, department=department,
+            user_id=g.user.id, is_admin=(g.user.role == "admin"), exclude_id=ticket.id
+        )
+        return jsonify(data), 201
     except Exception as e:
         return jsonify({"message": f"Error creating ticket: {str(e)}"}), 500
 
@@ -79,10 +94,32 @@ def list_tickets():
         include_shimmer=include_shimmer,
         status=status_filter,  # Pass this parameter
         sort_by=sort_by,
+        overdue=request.args.get("overdue", "false").lower() == "true",
+        include_archived=request.args.get("include_archived", "false").lower() == "true",
     )
     return jsonify([t.to_dict(include_comments=False) for t in tickets])
 
 
+@ticket_bp.route("/similar", methods=["GET"])
+@login_required_api
+def similar_tickets():
+    """Likely duplicates of a ticket being typed, from the in-memory index of open tickets."""
+    title = request.args.get("title", "")
+    description = request.args.get("description", "")
+    location = request.args.get("location", "")
+    if not (title or description).strip():
+        return jsonify([])
+    limit = min(max(request.args.get("limit", 5, type=int), 1), 20)
+    return jsonify(find_similar_tickets(
+        title, description, location,
+        department=request.args.get("department"),
+        user_id=g.user.id,
+        is_admin=(g.user.role == "admin"),
+        exclude_id=request.args.get("exclude"),
+        limit=limit,
+    ))
+
+
 @ticket_bp.route("/<string:ticket_id>", methods=["GET"])
 @login_required_api
 def get_ticket(ticket_id):
@@ -90,15 +127,55 @@ def get_ticket(ticket_id):
     if not ticket:
         return jsonify({"message": "Ticket not found."}), 404
 
+    if not _can_view_ticket(ticket):
+        return jsonify({"message": "Unauthorized to view this ticket."}), 403
+
+    # Only the latest page of comments is embedded (oldest first, for display);
+    # older ones are fetched from /comments with comments_cursor.
+    comments, next_cursor = get_ticket_comments_page(ticket_id, order="desc", archived=ticket.archived)
+    data = ticket.to_dict(include_comments=False)
+    data["comments"] = [comment.to_dict() for comment in reversed(comments)]
+    data["comments_cursor"] = next_cursor
+    return jsonify(data)
+
+
+def _can_view_ticket(ticket):
     # Basic authorization: user can see their own ticket, or if they are admin
     if ticket.user_id != g.user.id and g.user.role != "admin":
-        return jsonify({"message": "Unauthorized to view this ticket."}), 403
+        return False
 
     # If it's a shimmer ticket, only show to admins
     if ticket.shimmer and g.user.role != "admin":
+        return False
+    return True
+
+
+@ticket_bp.route("/<string:ticket_id>/comments", methods=["GET"])
+@login_required_api
+def list_ticket_comments(ticket_id):
+    ticket = get_ticket_by_id(ticket_id)
+    if not ticket:
+        return jsonify({"message": "Ticket not found."}), 404
+    if not _can_view_ticket(ticket):
         return jsonify({"message": "Unauthorized to view this ticket."}), 403
 
-    return jsonify(ticket.to_dict())
+    order = request.args.get("order", "desc").lower()
+    if order not in ["asc", "desc"]:
+        return jsonify({"message": "Order must be 'asc' or 'desc'."}), 400
+    limit = min(max(request.args.get("limit", COMMENTS_PAGE_SIZE, type=int), 1), 100)
+
+    try:
+        comments, next_cursor = get_ticket_comments_page(
+            ticket_id, cursor=request.args.get("cursor"), limit=limit, order=order, archived=ticket.archived
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return jsonify(
+        {
+            "comments": [comment.to_dict() for comment in comments],
+            "next_cursor": next_cursor,
+        }
+    )
 
 
 @ticket_bp.route("/<string:ticket_id>/comments", methods=["POST"])
@@ -129,7 +206,7 @@ def get_comments_count(ticket_id):
 @ticket_bp.route("/<string:ticket_id>/close", methods=["PUT"])
 @department_admin_required_api("AnyAdmin")  # Any admin can close a ticket
 def close_ticket_route(ticket_id):
-    ticket = close_ticket(ticket_id)
+    ticket = close_ticket(ticket_id, g.user.id)
     if ticket:
         return jsonify(
             {
@@ -143,15 +220,46 @@ def close_ticket_route(ticket_id):
 @ticket_bp.route("/<string:ticket_id>", methods=["DELETE"])
 @admin_required_api  # Admin permission to delete tickets
 def delete_ticket_route(ticket_id):
-    if delete_ticket(ticket_id):
+    purge_job = delete_ticket(ticket_id, g.user.id)
+    if purge_job:
         return jsonify(
             {
-                "message": f"Ticket {ticket_id} and its comments/attachments deleted successfully."
+                "message": f"Ticket {ticket_id} deleted. Its comments/attachments are being removed in the background.",
+                "purge": purge_job.to_dict(),
             }
         )
     return jsonify({"message": "Ticket not found."}), 404
 
 
+@ticket_bp.route("/<string:ticket_id>/purge", methods=["GET"])
+@admin_required_api
+def get_ticket_purge_status(ticket_id):
+    purge_job = get_ticket_purge_job(ticket_id)
+    if not purge_job:
+        return jsonify({"message": "No deletion found for this ticket."}), 404
+    return jsonify(purge_job.to_dict())
+
+
+@ticket_bp.route("/<string:ticket_id>/merge", methods=["POST"])
+@department_admin_required_api("AnyAdmin")
+def merge_tickets_route(ticket_id):
+    """Merges the tickets in 'duplicate_ids' into this one."""
+    data = request.get_json() or {}
+    duplicate_ids = data.get("duplicate_ids")
+    if not isinstance(duplicate_ids, list) or not duplicate_ids:
+        return jsonify({"message": "duplicate_ids must be a non-empty list."}), 400
+
+    ticket, error = merge_tickets(ticket_id, [str(i) for i in duplicate_ids], g.user.id)
+    if error:
+        return jsonify({"message": error}), 404 if "not found" in error else 400
+    return jsonify(
+        {
+            "message": f"Merged {len(duplicate_ids)} ticket(s) into {ticket_id}.",
+            "ticket": ticket.to_dict(include_comments=False),
+        }
+    )
+
+
 @ticket_bp.route("/<string:ticket_id>/assign", methods=["PUT"])
 @department_admin_required_api("AnyAdmin")  # Any admin can assign tickets
 def assign_ticket_route(ticket_id):
@@ -160,7 +268,7 @@ def assign_ticket_route(ticket_id):
     if not assignee_email:
         return jsonify({"message": "Assignee email is required."}), 400
 
-    ticket, error = assign_ticket(ticket_id, assignee_email)
+    ticket, error = assign_ticket(ticket_id, assignee_email, g.user.id)
     if error:
         return jsonify({"message": error}), 404
     return jsonify(
@@ -171,6 +279,75 @@ def assign_ticket_route(ticket_id):
     )
 
 
+def _attachment_access_error(ticket):
+    """Returns an error message if g.user may not download the ticket's attachments."""
+    # Check if user has access to the associated ticket
+    if ticket.user_id != g.user.id and g.user.role != "admin":
+        return "Unauthorized to download this attachment."
+
+    # If it's a shimmer ticket, only admins can download its attachments
+    if ticket.shimmer and g.user.role != "admin":
+        return "Unauthorized to download this attachment (shimmer ticket)."
+    return None
+
+
+def _attachments_archive_response(tickets, download_name):
+    storage = get_storage()
+
+    def entries():
+        for ticket in tickets:
+            for archive_name, attachment in iter_ticket_attachments(ticket.id, archived=ticket.archived):
+                yield archive_name, storage.iter_chunks(attachment.filepath), attachment.timestamp
+
+    return Response(
+        stream_with_context(stream_zip(entries())),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{download_name}"'},
+    )
+
+
+@ticket_bp.route("/<string:ticket_id>/attachments/archive", methods=["GET"])
+@login_required_api
+def download_ticket_attachments_archive(ticket_id):
+    ticket = get_ticket_by_id(ticket_id)
+    if not ticket:
+        return jsonify({"message": "Ticket not found."}), 404
+
+    error = _attachment_access_error(ticket)
+    if error:
+        return jsonify({"message": error}), 403
+
+    return _attachments_archive_response([ticket], f"ticket_{ticket.id}_attachments.zip")
+
+
+@ticket_bp.route("/attachments/archive", methods=["GET"])
+@login_required_api
+def download_filtered_attachments_archive():
+    # Either an explicit comma-separated list of ticket IDs or the same filters as list_tickets
+    ticket_ids_param = request.args.get("ticket_ids")
+    if ticket_ids_param:
+        tickets = [get_ticket_by_id(tid.strip()) for tid in ticket_ids_param.split(",") if tid.strip()]
+        tickets = [t for t in tickets if t]
+    else:
+        tickets = get_tickets(
+            search_keyword=request.args.get("search"),
+            is_admin=(g.user.role == "admin"),
+            user_id=g.user.id,
+            department=request.args.get("department"),
+            include_shimmer=request.args.get("include_shimmer", "true").lower() == "true",
+            status=request.args.get("status"),
+            sort_by=request.args.get("sort_by"),
+            include_archived=request.args.get("include_archived", "false").lower() == "true",
+        )
+
+    # Tickets the user cannot download from are silently left out of the archive
+    tickets = [t for t in tickets if _attachment_access_error(t) is None]
+    if not tickets:
+        return jsonify({"message": "No accessible tickets matched the request."}), 404
+
+    return _attachments_archive_response(tickets, "ticket_attachments.zip")
+
+
 @ticket_bp.route("/attachments/<int:attachment_id>", methods=["GET"])
 @login_required_api
 def download_attachment_route(attachment_id):
@@ -186,33 +363,25 @@ def download_attachment_route(attachment_id):
     if attachment.ticket_id:
         associated_ticket = get_ticket_by_id(attachment.ticket_id)
     elif attachment.comment_id:
-        comment = Comment.query.get(attachment.comment_id)
+        comment = attachment.comment # A Comment, or an ArchivedComment for an archived attachment
         if comment:
             associated_ticket = get_ticket_by_id(comment.ticket_id)
 
     if not associated_ticket:
         return jsonify({"message": "Associated ticket for attachment not found."}), 404
 
-    # Check if user has access to the associated ticket
-    if associated_ticket.user_id != g.user.id and g.user.role != "admin":
-        return jsonify({"message": "Unauthorized to download this attachment."}), 403
-
-    # If it's a shimmer ticket, only admins can download its attachments
-    if associated_ticket.shimmer and g.user.role != "admin":
-        return (
-            jsonify(
-                {
-                    "message": "Unauthorized to download this attachment (shimmer ticket)."
-                }
-            ),
-            403,
-        )
+    error = _attachment_access_error(associated_ticket)
+    if error:
+        return jsonify({"message": error}), 403
     # --- END IMPROVED AUTHORIZATION LOGIC ---
 
-    directory = os.path.dirname(attachment.filepath)
-    filename = os.path.basename(attachment.filepath)
-
-    if not os.path.exists(directory) or not os.path.isfile(attachment.filepath):
+    storage = get_storage()
+    if not storage.exists(attachment.filepath):
         return jsonify({"message": "Attachment file not found on server."}), 500
 
-    return send_from_directory(directory, filename, as_attachment=True)
+    # Streamed from the backend in chunks rather than read into memory
+    return send_file(
+        storage.open(attachment.filepath),
+        as_attachment=True,
+        download_name=attachment.filename,
+    )
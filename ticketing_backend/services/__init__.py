@@ -4,4 +4,15 @@ from .user_service import *
 from .ticket_service import *
 from .request_service import *
 from .task_manager_service import *
-from .gemini_service import *
\ No newline at end of file
+from .gemini_service import *
+from .autocomplete_service import *
+from .calendar_service import *
+from .sla_service import *
+from .duplicate_service import *
+from .assignment_service import *
+from .audit_service import *
+from .log_archive_service import *
+from .dashboard_service import *
+from .analytics_service import *
+from .report_service import *
+from .ticket_archive_service import *
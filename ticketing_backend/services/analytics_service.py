@@ -0,0 +1,244 @@
+import bisect
+import itertools
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.dialects.sqlite import insert
+from models import db, AnalyticsHourlyRollup, AnalyticsDailyRollup, Ticket, ArchivedTicket, EquipmentRequest, UserRequest, StudentRequest
+from config import Config
+from utils.audit_messages import DISPLAY_TZ
+from utils.background import register_job
+
+TICKETS_OPENED = 'tickets.opened'
+TICKETS_CLOSED = 'tickets.closed'
+TIME_TO_CLOSE = 'tickets.time_to_close'
+REQUESTS_CREATED = 'requests.created'
+
+# Upper edges, in hours, of the time-to-close histogram bins. Bin i (from 1) holds times up to
+# CLOSE_TIME_BIN_HOURS[i - 1]; the last bin holds everything longer. Bin 0 is plain counts.
+CLOSE_TIME_BIN_HOURS = [1, 2, 4, 8, 12, 24, 48, 72, 120, 168, 336, 720]
+
+MAX_HOURLY_RANGE = timedelta(days=31)
+MAX_DAILY_RANGE = timedelta(days=731)
+
+REQUEST_MODELS = {'equipment': EquipmentRequest, 'user': UserRequest, 'student': StudentRequest}
+
+
+def close_time_bin(seconds):
+    return bisect.bisect_left(CLOSE_TIME_BIN_HOURS, seconds / 3600) + 1
+
+
+def _hour_bucket(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _day_bucket(moment):
+    """Stored timestamps are naive UTC; days follow the display time zone so they match what staff see."""
+    return moment.replace(tzinfo=timezone.utc).astimezone(DISPLAY_TZ).date()
+
+
+def _bump(model, metric, bucket_start, dimension, bin, count, seconds):
+    statement = insert(model).values(
+        metric=metric, bucket_start=bucket_start, dimension=dimension, bin=bin, count=count, total_seconds=seconds
+    )
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=[model.metric, model.bucket_start, model.dimension, model.bin],
+        set_={'count': model.count + count, 'total_seconds': model.total_seconds + seconds}
+    ))
+
+
+def record_event(metric, dimension, at, count=1, bin=0, seconds=0):
+    """Adds an event to its hour and day, inside the caller's transaction."""
+    _bump(AnalyticsHourlyRollup, metric, _hour_bucket(at), dimension, bin, count, seconds)
+    _bump(AnalyticsDailyRollup, metric, _day_bucket(at), dimension, bin, count, seconds)
+
+
+def record_ticket_opened(ticket):
+    record_event(TICKETS_OPENED, ticket.department, ticket.timestamp or datetime.utcnow())
+
+
+def record_ticket_closed(ticket):
+    """Call when an open ticket closes, after setting ticket.closed_at."""
+    record_event(TICKETS_CLOSED, ticket.department, ticket.closed_at)
+    seconds = max(int((ticket.closed_at - ticket.timestamp).total_seconds()), 0)
+    record_event(TIME_TO_CLOSE, ticket.department, ticket.closed_at, bin=close_time_bin(seconds), seconds=seconds)
+
+
+def record_request_created(request_type, at=None, count=1):
+    record_event(REQUESTS_CREATED, request_type, at or datetime.utcnow(), count=count)
+
+
+# --- Reading ---
+
+def _empty_bucket():
+    return {'tickets_opened': {}, 'tickets_closed': {}, 'requests_created': {}}
+
+
+def _bucket_keys(since, until, granularity):
+    step = timedelta(hours=1) if granularity == 'hour' else timedelta(days=1)
+    keys = []
+    current = since
+    while current < until:
+        keys.append(current)
+        current += step
+    return keys
+
+
+def _median_hours(histogram):
+    """Median time to close estimated from histogram bins, interpolating within the middle bin."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    half = total / 2
+    seen = 0
+    for bin in sorted(histogram):
+        count = histogram[bin]
+        if seen + count >= half:
+            lower = CLOSE_TIME_BIN_HOURS[bin - 2] if bin >= 2 else 0
+            if bin > len(CLOSE_TIME_BIN_HOURS):
+                return float(lower) # Open-ended last bin
+            upper = CLOSE_TIME_BIN_HOURS[bin - 1]
+            return round(lower + (upper - lower) * (half - seen) / count, 2)
+        seen += count
+    return None
+
+
+def get_analytics(since, until, granularity='day', department=None):
+    """
+    Ticket and request activity over [since, until) from the rollup tables, so the cost depends on the
+    length of the range rather than on how many tickets exist. since/until are dates for
+    granularity='day' (local days) and UTC datetimes for 'hour'. Returns (report, error).
+    """
+    if granularity not in ('day', 'hour'):
+        return None, "granularity must be 'day' or 'hour'."
+    if until <= since:
+        return None, "until must be after since."
+    if granularity == 'hour':
+        since, until = _hour_bucket(since), _hour_bucket(until)
+        if until - since > MAX_HOURLY_RANGE:
+            return None, f"Hourly ranges are limited to {MAX_HOURLY_RANGE.days} days."
+        model = AnalyticsHourlyRollup
+    else:
+        if until - since > MAX_DAILY_RANGE:
+            return None, f"Daily ranges are limited to {MAX_DAILY_RANGE.days} days."
+        model = AnalyticsDailyRollup
+
+    query = model.query.filter(model.bucket_start >= since, model.bucket_start < until)
+    if department:
+        query = query.filter((model.metric == REQUESTS_CREATED) | (model.dimension == department))
+
+    buckets = {key: _empty_bucket() for key in _bucket_keys(since, until, granularity)}
+    totals = _empty_bucket()
+    close_times = defaultdict(lambda: {'count': 0, 'seconds': 0, 'histogram': defaultdict(int)})
+    field_by_metric = {TICKETS_OPENED: 'tickets_opened', TICKETS_CLOSED: 'tickets_closed', REQUESTS_CREATED: 'requests_created'}
+
+    for row in query:
+        if row.metric == TIME_TO_CLOSE:
+            for key in (row.dimension, 'all'):
+                close_times[key]['count'] += row.count
+                close_times[key]['seconds'] += row.total_seconds
+                close_times[key]['histogram'][row.bin] += row.count
+            continue
+        field = field_by_metric.get(row.metric)
+        if not field:
+            continue
+        bucket = buckets.setdefault(row.bucket_start, _empty_bucket())
+        bucket[field][row.dimension] = bucket[field].get(row.dimension, 0) + row.count
+        totals[field][row.dimension] = totals[field].get(row.dimension, 0) + row.count
+
+    return {
+        'granularity': granularity,
+        'since': since.isoformat(),
+        'until': until.isoformat(),
+        'department': department,
+        'series': [dict(bucket=key.isoformat(), **buckets[key]) for key in sorted(buckets)],
+        'totals': totals,
+        'time_to_close': {
+            key: {
+                'count': stats['count'],
+                'mean_hours': round(stats['seconds'] / stats['count'] / 3600, 2) if stats['count'] else None,
+                'median_hours': _median_hours(stats['histogram']),
+            }
+            for key, stats in close_times.items()
+        },
+    }, None
+
+
+# --- Maintenance ---
+
+def _parse_status_closed_at(status):
+    """'Closed: 2024-05-01 13:45:00' is server local time; returns naive UTC, or None."""
+    try:
+        closed_local = datetime.strptime(status[len('Closed: '):], '%Y-%m-%d %H:%M:%S')
+    except (TypeError, ValueError):
+        return None
+    return closed_local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def backfill_analytics():
+    """
+    Rebuilds both rollup tables from ticket and request history, first filling Ticket.closed_at
+    from the status text of tickets closed before that column existed. Events written while it
+    runs can be missed, so run it when the app is quiet. Returns the number of events counted.
+    """
+    missing_closed_at = [
+        {'id': ticket_id, 'closed_at': _parse_status_closed_at(status)}
+        for ticket_id, status in db.session.query(Ticket.id, Ticket.status)
+        .filter(Ticket.closed_at.is_(None), Ticket.status.like('Closed: %'))
+    ]
+    missing_closed_at = [row for row in missing_closed_at if row['closed_at']]
+    for start in range(0, len(missing_closed_at), 500):
+        db.session.execute(db.update(Ticket), missing_closed_at[start:start + 500])
+
+    hourly = defaultdict(lambda: [0, 0]) # (metric, hour, dimension, bin) -> [count, total_seconds]
+    daily = defaultdict(lambda: [0, 0])
+
+    def add(metric, dimension, at, bin=0, seconds=0):
+        for rollup, bucket in ((hourly, _hour_bucket(at)), (daily, _day_bucket(at))):
+            entry = rollup[(metric, bucket, dimension, bin)]
+            entry[0] += 1
+            entry[1] += seconds
+
+    events = 0
+    # Soft-deleted and archived tickets still count: the live write paths never take events back out
+    ticket_rows = itertools.chain.from_iterable(
+        db.session.query(model.timestamp, model.closed_at, model.department).yield_per(1000)
+        for model in (Ticket, ArchivedTicket)
+    )
+    for opened_at, closed_at, department in ticket_rows:
+        if opened_at:
+            add(TICKETS_OPENED, department, opened_at)
+            events += 1
+        if opened_at and closed_at:
+            seconds = max(int((closed_at - opened_at).total_seconds()), 0)
+            add(TICKETS_CLOSED, department, closed_at)
+            add(TIME_TO_CLOSE, department, closed_at, close_time_bin(seconds), seconds)
+            events += 1
+    for request_type, model in REQUEST_MODELS.items():
+        for (created_at,) in db.session.query(model.timestamp).yield_per(1000):
+            if created_at:
+                add(REQUESTS_CREATED, request_type, created_at)
+                events += 1
+
+    for model, rollup in ((AnalyticsHourlyRollup, hourly), (AnalyticsDailyRollup, daily)):
+        model.query.delete(synchronize_session=False)
+        rows = [
+            {'metric': metric, 'bucket_start': bucket, 'dimension': dimension, 'bin': bin, 'count': count, 'total_seconds': seconds}
+            for (metric, bucket, dimension, bin), (count, seconds) in rollup.items()
+        ]
+        for start in range(0, len(rows), 500):
+            db.session.execute(db.insert(model), rows[start:start + 500])
+    db.session.commit()
+    return events
+
+
+def prune_hourly_rollups():
+    """Drops hourly buckets older than ANALYTICS_HOURLY_RETENTION_DAYS; the daily buckets keep the history."""
+    if Config.ANALYTICS_HOURLY_RETENTION_DAYS <= 0:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(days=Config.ANALYTICS_HOURLY_RETENTION_DAYS)
+    deleted = AnalyticsHourlyRollup.query.filter(AnalyticsHourlyRollup.bucket_start < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+register_job('analytics_prune', prune_hourly_rollups, Config.ANALYTICS_PRUNE_INTERVAL_SECONDS)
@@ -0,0 +1,117 @@
+from datetime import datetime
+from models import db, User, Ticket, AssignmentPolicy
+from services.user_service import get_tech_admins, get_maintenance_admins, get_management_admins
+from config import Config
+from utils.background import register_job
+
+# Department -> its admin directory, the same lists used for new-ticket emails
+DEPARTMENT_ADMIN_DIRECTORY = {
+    'IT': get_tech_admins,
+    'Maintenance': get_maintenance_admins,
+    'Management': get_management_admins,
+}
+
+
+def adjust_open_assigned_count(user_id, delta):
+    """Moves an admin's open-ticket counter in SQL, inside the caller's transaction."""
+    if user_id:
+        User.query.filter_by(id=user_id).update(
+            {User.open_assigned_count: User.open_assigned_count + delta}, synchronize_session=False
+        )
+
+
+def get_assignment_policies():
+    saved = {policy.department: policy for policy in AssignmentPolicy.query.all()}
+    return [
+        saved[department].to_dict() if department in saved else {'department': department, 'enabled': False, 'updated_at': None}
+        for department in DEPARTMENT_ADMIN_DIRECTORY
+    ]
+
+
+def set_assignment_policy(department, enabled):
+    if department not in DEPARTMENT_ADMIN_DIRECTORY:
+        return None, f"Department must be one of: {', '.join(DEPARTMENT_ADMIN_DIRECTORY)}."
+    policy = AssignmentPolicy.query.filter_by(department=department).first()
+    if not policy:
+        policy = AssignmentPolicy(department=department)
+        db.session.add(policy)
+    policy.enabled = bool(enabled)
+    policy.updated_at = datetime.utcnow()
+    db.session.commit()
+    return policy, None
+
+
+def pick_assignee(department):
+    """
+    The department admin with the fewest open assigned tickets, or None when auto-assignment
+    is off for the department or it has no admins. Reads the maintained counters, not Ticket.
+    """
+    policy = AssignmentPolicy.query.filter_by(department=department, enabled=True).first()
+    if not policy:
+        return None
+    admin_emails = DEPARTMENT_ADMIN_DIRECTORY[department]()
+    if not admin_emails:
+        return None
+    return (
+        User.query.filter(User.email.in_(admin_emails))
+        .order_by(User.open_assigned_count.asc(), User.last_assigned_at.asc().nullsfirst(), User.id.asc())
+        .first()
+    )
+
+
+def auto_assign_ticket(ticket):
+    """Assigns a new ticket per its department's policy. Call before the ticket is committed."""
+    assignee = pick_assignee(ticket.department)
+    if not assignee:
+        return None
+    ticket.assignee_id = assignee.id
+    assignee.last_assigned_at = datetime.utcnow()
+    adjust_open_assigned_count(assignee.id, 1)
+    return assignee
+
+
+def get_workload_summary(department=None):
+    """Per department: each admin's open assigned tickets (from the counters) and the open unassigned count."""
+    departments = [department] if department else list(DEPARTMENT_ADMIN_DIRECTORY)
+    unassigned = dict(
+        db.session.query(Ticket.department, db.func.count())
+        .filter(
+            Ticket.status == 'open',
+            Ticket.assignee_id.is_(None),
+            Ticket.deleted_at.is_(None),
+            Ticket.department.in_(departments)
+        )
+        .group_by(Ticket.department)
+        .all()
+    )
+    enabled = {policy.department for policy in AssignmentPolicy.query.filter_by(enabled=True)}
+
+    summary = []
+    for name in departments:
+        admin_emails = DEPARTMENT_ADMIN_DIRECTORY[name]()
+        admins = (
+            User.query.filter(User.email.in_(admin_emails)).order_by(User.open_assigned_count.desc(), User.email).all()
+            if admin_emails else []
+        )
+        summary.append({
+            'department': name,
+            'auto_assign': name in enabled,
+            'unassigned_open': unassigned.get(name, 0),
+            'admins': [{'email': admin.email, 'open_assigned': admin.open_assigned_count or 0} for admin in admins],
+        })
+    return summary
+
+
+def reconcile_open_assigned_counts():
+    """Recomputes every user's open_assigned_count from Ticket. Returns rows updated."""
+    open_assigned = (
+        db.select(db.func.count(Ticket.id))
+        .where(Ticket.assignee_id == User.id, Ticket.status == 'open', Ticket.deleted_at.is_(None))
+        .scalar_subquery()
+    )
+    result = db.session.execute(db.update(User).values(open_assigned_count=open_assigned))
+    db.session.commit()
+    return result.rowcount
+
+
+register_job('open_assigned_reconcile', reconcile_open_assigned_counts, Config.ASSIGNMENT_RECONCILE_INTERVAL_SECONDS)
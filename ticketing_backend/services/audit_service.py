@@ -0,0 +1,120 @@
+import json
+import threading
+from collections import deque
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session, joinedload
+from models import db, Log
+from config import Config
+from utils.background import register_job, wake_job
+
+_PENDING_KEY = 'pending_audit_rows'
+_buffer = deque()
+_buffer_lock = threading.Lock()
+
+
+def _buffering_enabled():
+    # Buffered rows are written by the 'audit_flush' job, so without background jobs they would never land
+    return Config.AUDIT_BUFFERED and Config.BACKGROUND_JOBS_ENABLED
+
+
+# Ticket department -> audit category, so ticket events sit with the same department's task log
+DEPARTMENT_CATEGORIES = {'IT': 'tech', 'Maintenance': 'maintenance', 'Management': 'administration'}
+REQUEST_CATEGORY = 'tech' # Requests are handled by IT
+
+
+def department_category(department):
+    return DEPARTMENT_CATEGORIES.get(department, 'administration')
+
+
+def _record_row(row):
+    if _buffering_enabled():
+        db.session.info.setdefault(_PENDING_KEY, []).append(row)
+    else:
+        db.session.add(Log(**row))
+
+
+def record_audit(action, category, user_id, entity_type=None, entity_id=None, details=None):
+    """
+    Records a structured audit event (e.g. 'task.completed' on task 12 by user 3) as part of the
+    caller's current transaction; the caller's commit writes the change and its event together.
+    With AUDIT_BUFFERED on, the event is instead held until that commit succeeds and then
+    group-committed with other events. details holds the values the message is rendered from.
+    """
+    _record_row({
+        'message': '',
+        'action': action,
+        'category': category,
+        'user_id': user_id,
+        'entity_type': entity_type,
+        'entity_id': str(entity_id) if entity_id is not None else None,
+        'details': json.dumps(details) if details else None,
+        'timestamp': datetime.utcnow(),
+    })
+
+
+@event.listens_for(Session, 'after_commit')
+def _queue_committed_audit_rows(session):
+    rows = session.info.pop(_PENDING_KEY, None)
+    if not rows:
+        return
+    with _buffer_lock:
+        _buffer.extend(rows)
+        full = len(_buffer) >= Config.AUDIT_BATCH_SIZE
+    if full:
+        wake_job('audit_flush')
+
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_rolled_back_audit_rows(session):
+    # The change never happened, so neither did its audit entry
+    session.info.pop(_PENDING_KEY, None)
+
+
+def flush_audit_buffer():
+    """Writes buffered audit rows with one multi-row INSERT per batch. Returns the number written."""
+    written = 0
+    while True:
+        with _buffer_lock:
+            batch = [_buffer.popleft() for _ in range(min(len(_buffer), Config.AUDIT_BATCH_SIZE))]
+        if not batch:
+            return written
+        try:
+            db.session.execute(db.insert(Log), batch)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with _buffer_lock:
+                _buffer.extendleft(reversed(batch)) # Keep them for the next run
+            raise
+        written += len(batch)
+
+
+def add_log(message, category, user_id):
+    """Writes a free-text entry on its own. Write paths that change data use record_audit() before their commit."""
+    _record_row({'message': message, 'category': category, 'user_id': user_id, 'timestamp': datetime.utcnow()})
+    db.session.commit()
+
+
+def get_audit_events(category=None, actor_id=None, entity_type=None, entity_id=None, action=None,
+                     since=None, until=None, limit=100):
+    """Newest-first events matching every given filter; each filter is served by one of Log's indexes."""
+    query = Log.query.options(joinedload(Log.log_user))
+    if category:
+        query = query.filter(Log.category == category)
+    if actor_id:
+        query = query.filter(Log.user_id == actor_id)
+    if entity_type:
+        query = query.filter(Log.entity_type == entity_type)
+    if entity_id:
+        query = query.filter(Log.entity_id == str(entity_id))
+    if action:
+        query = query.filter(Log.action == action)
+    if since:
+        query = query.filter(Log.timestamp >= since)
+    if until:
+        query = query.filter(Log.timestamp < until)
+    return query.order_by(Log.timestamp.desc(), Log.id.desc()).limit(limit).all()
+
+
+register_job('audit_flush', flush_audit_buffer, Config.AUDIT_FLUSH_INTERVAL_SECONDS)
@@ -2,6 +2,8 @@ from models import db, User
 from config import Config
 from flask_login import login_user, logout_user
 from werkzeug.security import generate_password_hash
+from services.autocomplete_service import record_autocomplete_value
+from services.dashboard_service import adjust_counter, USERS
 
 def register_user(email, password, auth_code):
     if User.query.filter_by(email=email.lower()).first():
@@ -18,7 +20,9 @@ def register_user(email, password, auth_code):
     new_user = User(email=email.lower(), role=role, associations=associations)
     new_user.set_password(password)
     db.session.add(new_user)
+    adjust_counter(USERS, 1)
     db.session.commit()
+    record_autocomplete_value('user', new_user.email)
     return new_user, None
 
 def authenticate_user(email, password):
@@ -36,6 +40,7 @@ def create_initial_super_admin():
         super_admin = User(email=Config.SUPER_ADMIN_EMAIL, role='admin', associations='oscar') # Oscar for super admin, all departments
         super_admin.set_password('superadminpassword') # CHANGE THIS DEFAULT PASSWORD IMMEDIATELY!
         db.session.add(super_admin)
+        adjust_counter(USERS, 1)
         db.session.commit()
         print(f"Super admin user '{Config.SUPER_ADMIN_EMAIL}' created with default password 'superadminpassword'.")
         return True
@@ -0,0 +1,67 @@
+import threading
+from models import db, Ticket, EquipmentRequest, StudentRequest, User
+from config import Config
+from utils.prefix_index import PrefixIndex
+from utils.background import register_job
+
+# Field name -> columns whose values feed that field's suggestions
+AUTOCOMPLETE_SOURCES = {
+    'location': [Ticket.location, EquipmentRequest.location],
+    'equipment': [EquipmentRequest.equipment],
+    'teacher': [StudentRequest.teacher],
+    'user': [User.email],
+}
+
+_indexes = {}
+_build_lock = threading.Lock()
+
+
+def _build_index(field):
+    index = PrefixIndex()
+    for column in AUTOCOMPLETE_SOURCES[field]:
+        query = db.session.query(column, db.func.count()).group_by(column)
+        if column.class_ is Ticket:
+            query = query.filter(Ticket.deleted_at.is_(None))
+        for value, count in query:
+            index.add(value, count)
+    return index
+
+
+def get_autocomplete_index(field):
+    """Returns the index for field, building it from the database on first use."""
+    index = _indexes.get(field)
+    if index is None:
+        with _build_lock:
+            index = _indexes.get(field)
+            if index is None:
+                index = _indexes[field] = _build_index(field)
+    return index
+
+
+def autocomplete(field, prefix, limit=10):
+    return [
+        {'value': value, 'count': count}
+        for value, count in get_autocomplete_index(field).search(prefix, limit)
+    ]
+
+
+def record_autocomplete_value(field, value):
+    """Called by write paths. Indexes that haven't been built yet pick the value up when they are."""
+    index = _indexes.get(field)
+    if index is not None:
+        index.add(value)
+
+
+def forget_autocomplete_value(field, value):
+    index = _indexes.get(field)
+    if index is not None:
+        index.remove(value)
+
+
+def rebuild_autocomplete_indexes():
+    """Rebuilds built indexes so writes made by other app nodes and deletions show up."""
+    for field in list(_indexes):
+        _indexes[field] = _build_index(field)
+
+
+register_job('autocomplete_rebuild', rebuild_autocomplete_indexes, Config.AUTOCOMPLETE_REBUILD_INTERVAL_SECONDS)
@@ -0,0 +1,150 @@
+import hashlib
+import secrets
+import threading
+from datetime import datetime, timedelta
+from models import db, EquipmentRequest, User
+from utils.helpers import parse_time_of_day
+from utils.ical import build_event, build_calendar
+from services.user_service import get_tech_admins
+
+# Equipment is handled by IT, so that is the only department with a booking feed
+CALENDAR_DEPARTMENTS = ['IT']
+FEED_MAX_AGE = timedelta(hours=1) # Full rebuild after this, to pick up writes from other app nodes
+TOKEN_CACHE_TTL = timedelta(minutes=15)
+
+
+class _Feed:
+    """A rendered feed plus the per-request VEVENT text it was built from."""
+
+    def __init__(self, name, events):
+        self.name = name
+        self.events = events # equipment request id -> VEVENT text
+        self.built_at = datetime.utcnow()
+        self.render()
+
+    def render(self):
+        self.body = build_calendar(self.name, [self.events[key] for key in sorted(self.events)]).encode("utf-8")
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        self.last_modified = datetime.utcnow()
+
+
+_feeds = {}
+_token_cache = {}
+_lock = threading.Lock()
+
+
+def _render_request_events(request):
+    """VEVENTs for one approved request: the event itself and, while open, its return deadline."""
+    events = []
+    start_time = parse_time_of_day(request.time)
+    if start_time:
+        start = datetime.combine(request.date, start_time)
+        events.append(build_event(
+            uid=f"equipment-{request.id}-event@ticketing",
+            summary=f"{request.event}: {request.equipment}",
+            start=start, end=start + timedelta(hours=1),
+            location=request.location, description=request.description, stamp=request.timestamp
+        ))
+    else:
+        events.append(build_event(
+            uid=f"equipment-{request.id}-event@ticketing",
+            summary=f"{request.event}: {request.equipment} ({request.time})",
+            start=request.date, all_day=True,
+            location=request.location, description=request.description, stamp=request.timestamp
+        ))
+
+    if request.status == 'open':
+        return_time = parse_time_of_day(request.return_time)
+        if return_time:
+            due = datetime.combine(request.return_date, return_time)
+            events.append(build_event(
+                uid=f"equipment-{request.id}-return@ticketing",
+                summary=f"Return {request.equipment} to IT",
+                start=due, end=due + timedelta(minutes=30), stamp=request.timestamp
+            ))
+        else:
+            events.append(build_event(
+                uid=f"equipment-{request.id}-return@ticketing",
+                summary=f"Return {request.equipment} to IT ({request.return_time})",
+                start=request.return_date, all_day=True, stamp=request.timestamp
+            ))
+    return "".join(events)
+
+
+def _feed_keys_for_request(request):
+    return [f"user:{request.user_id}"] + [f"dept:{department}" for department in CALENDAR_DEPARTMENTS]
+
+
+def _build_feed(key):
+    query = EquipmentRequest.query.filter(EquipmentRequest.approval_status == 'approved')
+    if key.startswith("user:"):
+        query = query.filter(EquipmentRequest.user_id == int(key.split(":", 1)[1]))
+        name = "My Equipment Bookings"
+    else:
+        name = f"{key.split(':', 1)[1]} Equipment Bookings"
+    return _Feed(name, {request.id: _render_request_events(request) for request in query})
+
+
+def get_feed(key):
+    """Returns the cached feed for key ('user:<id>' or 'dept:<name>'), building it if needed."""
+    feed = _feeds.get(key)
+    if feed is None or datetime.utcnow() - feed.built_at > FEED_MAX_AGE:
+        feed = _build_feed(key)
+        with _lock:
+            _feeds[key] = feed
+    return feed
+
+
+def refresh_equipment_request_events(request):
+    """
+    Called after approve/deny/close. Re-renders only this request's events in the feeds
+    that are already cached; feeds not yet built pick the change up when they are.
+    """
+    events = _render_request_events(request) if request.approval_status == 'approved' else None
+    with _lock:
+        for key in _feed_keys_for_request(request):
+            feed = _feeds.get(key)
+            if feed is None:
+                continue
+            if events is None and request.id not in feed.events:
+                continue
+            if events is None:
+                del feed.events[request.id]
+            elif feed.events.get(request.id) == events:
+                continue
+            else:
+                feed.events[request.id] = events
+            feed.render()
+
+
+# --- Feed tokens ---
+def get_calendar_token(user):
+    """Returns the user's secret feed token, creating one on first use."""
+    if not user.calendar_token:
+        user.calendar_token = secrets.token_urlsafe(24)
+        db.session.commit()
+    return user.calendar_token
+
+
+def rotate_calendar_token(user):
+    old_token = user.calendar_token
+    user.calendar_token = secrets.token_urlsafe(24)
+    db.session.commit()
+    with _lock:
+        _token_cache.pop(old_token, None)
+    return user.calendar_token
+
+
+def resolve_calendar_token(token):
+    """Returns (user_id, is_it_admin) for a feed token, or None. Cached so polling skips the database."""
+    cached = _token_cache.get(token)
+    if cached and datetime.utcnow() - cached[2] < TOKEN_CACHE_TTL:
+        return cached[0], cached[1]
+
+    user = User.query.filter_by(calendar_token=token).first()
+    if not user:
+        return None
+    is_it_admin = user.email in get_tech_admins()
+    with _lock:
+        _token_cache[token] = (user.id, is_it_admin, datetime.utcnow())
+    return user.id, is_it_admin
@@ -0,0 +1,170 @@
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from models import db, DashboardCounter, Ticket, Comment, ArchivedTicket, ArchivedComment, EquipmentRequest, UserRequest, StudentRequest, User
+from config import Config
+from utils.background import register_job
+
+TICKETS_TOTAL = 'tickets.total'
+TICKETS_OPEN = 'tickets.open'
+TICKETS_SHIMMER = 'tickets.shimmer'
+TICKETS_DEPARTMENT_PREFIX = 'tickets.department.'
+COMMENTS = 'comments'
+EQUIPMENT_REQUESTS = 'requests.equipment'
+USER_REQUESTS = 'requests.user'
+STUDENT_REQUESTS = 'requests.student'
+USERS = 'users'
+RECONCILED_AT = 'counters.reconciled' # Present once the counters have been computed from the tables
+
+_CHANGED_KEY = 'dashboard_counters_changed'
+_cached = None # (statistics, monotonic time loaded)
+_refresh_lock = threading.Lock()
+
+
+def adjust_counter(name, delta):
+    """Moves a counter in SQL, inside the caller's transaction, so concurrent writers never lose updates."""
+    if not delta:
+        return
+    now = datetime.utcnow()
+    statement = insert(DashboardCounter).values(name=name, value=delta, updated_at=now)
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=[DashboardCounter.name],
+        set_={'value': DashboardCounter.value + delta, 'updated_at': now}
+    ))
+    db.session.info[_CHANGED_KEY] = True
+
+
+def count_ticket(ticket, delta):
+    """Adds (delta=1) or removes (delta=-1) a live ticket from every ticket counter it belongs to."""
+    adjust_counter(TICKETS_TOTAL, delta)
+    adjust_counter(TICKETS_DEPARTMENT_PREFIX + ticket.department, delta)
+    if ticket.shimmer:
+        adjust_counter(TICKETS_SHIMMER, delta)
+    if ticket.status == 'open':
+        adjust_counter(TICKETS_OPEN, delta)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_cached_statistics(session):
+    # A committed counter change shows up on this process's next read instead of after the cache expires
+    global _cached
+    if session.info.pop(_CHANGED_KEY, None):
+        _cached = None
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_changes(session):
+    session.info.pop(_CHANGED_KEY, None)
+
+
+def _load_statistics():
+    counters = {counter.name: counter.value for counter in DashboardCounter.query.all()}
+    if RECONCILED_AT not in counters:
+        reconcile_dashboard_counters()
+        counters = {counter.name: counter.value for counter in DashboardCounter.query.all()}
+
+    total_tickets = counters.get(TICKETS_TOTAL, 0)
+    open_tickets = counters.get(TICKETS_OPEN, 0)
+    total_equipment_requests = counters.get(EQUIPMENT_REQUESTS, 0)
+    total_user_requests = counters.get(USER_REQUESTS, 0)
+    total_student_requests = counters.get(STUDENT_REQUESTS, 0)
+    return {
+        "num_total_tickets": total_tickets,
+        "num_open_tickets": open_tickets,
+        "num_closed_tickets": total_tickets - open_tickets,
+        "num_comments": counters.get(COMMENTS, 0),
+        "num_shimmer_tickets": counters.get(TICKETS_SHIMMER, 0),
+        "num_equipment_requests": total_equipment_requests,
+        "num_user_requests": total_user_requests,
+        "num_student_requests": total_student_requests,
+        "total_requests": total_equipment_requests + total_user_requests + total_student_requests,
+        "total_users": counters.get(USERS, 0),
+        "tickets_by_department": {
+            name[len(TICKETS_DEPARTMENT_PREFIX):]: value
+            for name, value in counters.items()
+            if name.startswith(TICKETS_DEPARTMENT_PREFIX) and value
+        }
+    }
+
+
+def get_dashboard_statistics():
+    """
+    Dashboard totals read from the counters table, cached in process for DASHBOARD_STATS_CACHE_SECONDS.
+    Only one request reloads an expired cache; requests arriving meanwhile get the previous value.
+    """
+    global _cached
+    cached = _cached
+    if cached and time.monotonic() - cached[1] < Config.DASHBOARD_STATS_CACHE_SECONDS:
+        return cached[0]
+    # Without a previous value there is nothing to serve, so wait for the load in progress
+    if not _refresh_lock.acquire(blocking=cached is None):
+        return cached[0]
+    try:
+        cached = _cached
+        if cached and time.monotonic() - cached[1] < Config.DASHBOARD_STATS_CACHE_SECONDS:
+            return cached[0]
+        statistics = _load_statistics()
+        _cached = (statistics, time.monotonic())
+        return statistics
+    finally:
+        _refresh_lock.release()
+
+
+def reconcile_dashboard_counters():
+    """
+    Recomputes every counter from the tables, correcting any drift. Archived tickets (all closed) count
+    like live ones. Returns the counters that were wrong.
+    """
+    # Stamp the marker first: the write takes the database's write lock, so no adjust_counter can
+    # commit between the counts below and the corrections, which would otherwise overwrite it
+    now = datetime.utcnow()
+    statement = insert(DashboardCounter).values(name=RECONCILED_AT, value=0, updated_at=now)
+    db.session.execute(statement.on_conflict_do_update(index_elements=[DashboardCounter.name], set_={'updated_at': now}))
+
+    live_tickets = Ticket.query.filter(Ticket.deleted_at.is_(None)) # Exclude soft-deleted tickets awaiting purge
+    archived_tickets = ArchivedTicket.query
+    actual = {
+        TICKETS_TOTAL: live_tickets.count() + archived_tickets.count(),
+        TICKETS_OPEN: live_tickets.filter(Ticket.status.ilike('open%')).count(),
+        TICKETS_SHIMMER: live_tickets.filter_by(shimmer=True).count() + archived_tickets.filter_by(shimmer=True).count(),
+        COMMENTS: Comment.query.join(Ticket).filter(Ticket.deleted_at.is_(None)).count() + ArchivedComment.query.count(),
+        EQUIPMENT_REQUESTS: EquipmentRequest.query.count(),
+        USER_REQUESTS: UserRequest.query.count(),
+        STUDENT_REQUESTS: StudentRequest.query.count(),
+        USERS: User.query.count(),
+    }
+    for model in (Ticket, ArchivedTicket):
+        department_counts = (
+            db.session.query(model.department, db.func.count(model.id))
+            .filter(model.deleted_at.is_(None))
+            .group_by(model.department)
+        )
+        for department, count in department_counts:
+            if department:
+                name = TICKETS_DEPARTMENT_PREFIX + department
+                actual[name] = actual.get(name, 0) + count
+
+    stored = {counter.name: counter for counter in DashboardCounter.query.populate_existing()}
+    for name, counter in stored.items():
+        # Departments that no longer have live tickets
+        if name.startswith(TICKETS_DEPARTMENT_PREFIX) and name not in actual:
+            actual[name] = 0
+    corrected = 0
+    for name, value in actual.items():
+        counter = stored.get(name)
+        if counter is None:
+            db.session.add(DashboardCounter(name=name, value=value, updated_at=now))
+            corrected += 1
+        elif counter.value != value:
+            counter.value = value
+            counter.updated_at = now
+            corrected += 1
+    db.session.info[_CHANGED_KEY] = True
+    db.session.commit()
+    return corrected
+
+
+register_job('dashboard_counters_reconcile', reconcile_dashboard_counters, Config.DASHBOARD_COUNTERS_RECONCILE_INTERVAL_SECONDS)
@@ -0,0 +1,104 @@
+import threading
+from models import Ticket
+from config import Config
+from utils.similarity_index import SimilarityIndex, tokenize
+from utils.background import register_job
+
+_index = None
+_build_lock = threading.Lock()
+
+
+def _ticket_tokens(title, description, location):
+    # Titles and locations are short but say the most ("projector", "Room 204"), so they count twice
+    return tokenize(title) * 2 + tokenize(description) + tokenize(location) * 2
+
+
+def _ticket_meta(ticket):
+    return {
+        'title': ticket.title,
+        'location': ticket.location,
+        'department': ticket.department,
+        'user_id': ticket.user_id,
+        'shimmer': ticket.shimmer,
+        'timestamp': ticket.timestamp.isoformat() if ticket.timestamp else None,
+    }
+
+
+def _is_indexable(ticket):
+    return ticket.status == 'open' and not ticket.deleted_at and not ticket.merged_into_id
+
+
+def _build_index():
+    index = SimilarityIndex()
+    open_tickets = Ticket.query.filter(
+        Ticket.status == 'open',
+        Ticket.deleted_at.is_(None),
+        Ticket.merged_into_id.is_(None)
+    )
+    for ticket in open_tickets:
+        index.add(ticket.id, _ticket_tokens(ticket.title, ticket.description, ticket.location), _ticket_meta(ticket))
+    return index
+
+
+def get_duplicate_index():
+    """Returns the open-ticket similarity index, building it from the database on first use."""
+    global _index
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                _index = _build_index()
+    return _index
+
+
+def index_ticket(ticket):
+    """Called by ticket write paths. Adds or refreshes an open ticket, or drops one that is no longer open."""
+    if _index is None:
+        return
+    if _is_indexable(ticket):
+        _index.add(ticket.id, _ticket_tokens(ticket.title, ticket.description, ticket.location), _ticket_meta(ticket))
+    else:
+        _index.remove(ticket.id)
+
+
+def unindex_ticket(ticket_id):
+    if _index is not None:
+        _index.remove(ticket_id)
+
+
+def find_similar_tickets(title, description=None, location=None, department=None, user_id=None,
+                         is_admin=False, exclude_id=None, limit=5, min_score=None):
+    """Open tickets that look like the given text, most similar first, limited to ones the user may see."""
+    def accept(ticket_id, meta):
+        if ticket_id == exclude_id:
+            return False
+        if department and meta['department'] != department:
+            return False
+        return is_admin or meta['user_id'] == user_id or not meta['shimmer']
+
+    matches = get_duplicate_index().search(
+        _ticket_tokens(title, description, location),
+        limit=limit,
+        min_score=Config.DUPLICATE_MIN_SCORE if min_score is None else min_score,
+        accept=accept
+    )
+    return [
+        {
+            'id': ticket_id,
+            'title': meta['title'],
+            'location': meta['location'],
+            'department': meta['department'],
+            'timestamp': meta['timestamp'],
+            'score': round(score, 3),
+        }
+        for ticket_id, score, meta in matches
+    ]
+
+
+def rebuild_duplicate_index():
+    """Rebuilds the index, if built, so tickets changed by other app nodes show up."""
+    global _index
+    if _index is not None:
+        _index = _build_index()
+
+
+register_job('duplicate_index_rebuild', rebuild_duplicate_index, Config.DUPLICATE_INDEX_REBUILD_INTERVAL_SECONDS)
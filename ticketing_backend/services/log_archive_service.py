@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+import json
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy.orm import joinedload
+from models import db, Log, LogArchiveSegment
+from config import Config
+from utils.storage import get_storage
+from utils.background import register_job
+
+ARCHIVE_PREFIX = "log_archives"
+SPOOL_MAX_MEMORY = 4 * 1024 * 1024 # Segments larger than this spill to a temp file while being written
+DELETE_CHUNK_SIZE = 500 # Stays under SQLite's bound-parameter limit
+
+
+def _archive_record(log):
+    """One NDJSON line: the structured event plus its rendered text, so archives read on their own."""
+    data = log.to_dict()
+    data['user_id'] = log.user_id
+    data['details'] = json.loads(log.details) if log.details else None
+    return data
+
+
+def _write_segment(category, logs):
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    with gzip.GzipFile(fileobj=spool, mode="wb") as archive:
+        for log in logs:
+            archive.write((json.dumps(_archive_record(log)) + "\n").encode("utf-8"))
+    size = spool.tell()
+
+    spool.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: spool.read(64 * 1024), b""):
+        digest.update(chunk)
+    spool.seek(0)
+
+    start_at, end_at = logs[0].timestamp, logs[-1].timestamp
+    # The random suffix means a segment is never overwritten, even by a retried run
+    key = (
+        f"{ARCHIVE_PREFIX}/{category}/"
+        f"{start_at:%Y%m%dT%H%M%S}-{end_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.ndjson.gz"
+    )
+    get_storage().save(key, spool)
+    spool.close()
+    return LogArchiveSegment(
+        category=category, start_at=start_at, end_at=end_at, row_count=len(logs),
+        storage_key=key, size_bytes=size, sha256=digest.hexdigest()
+    )
+
+
+def archive_logs(query, category):
+    """
+    Moves the rows matched by query (a Log query within one category) into archive
+    segments of up to Config.LOG_ARCHIVE_SEGMENT_ROWS rows, oldest first. Each segment
+    is stored before its rows are deleted, so a crash can leave an unreferenced file but
+    never loses events. Returns (segments created, rows archived).
+    """
+    segments = archived = 0
+    while True:
+        logs = (
+            query.options(joinedload(Log.log_user))
+            .order_by(Log.timestamp.asc(), Log.id.asc())
+            .limit(Config.LOG_ARCHIVE_SEGMENT_ROWS)
+            .all()
+        )
+        if not logs:
+            return segments, archived
+
+        db.session.add(_write_segment(category, logs))
+        ids = [log.id for log in logs]
+        # By id rather than by timestamp range, so rows inserted meanwhile are never deleted unarchived
+        for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+            Log.query.filter(Log.id.in_(ids[start:start + DELETE_CHUNK_SIZE])).delete(synchronize_session=False)
+        db.session.commit()
+        segments += 1
+        archived += len(logs)
+
+
+def rotate_logs():
+    """Retention job: archives every category's entries older than Config.LOG_RETENTION_DAYS."""
+    if Config.LOG_RETENTION_DAYS <= 0:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(days=Config.LOG_RETENTION_DAYS)
+    categories = [category for (category,) in db.session.query(Log.category).filter(Log.timestamp < cutoff).distinct()]
+    archived = 0
+    for category in categories:
+        archived += archive_logs(Log.query.filter(Log.category == category, Log.timestamp < cutoff), category)[1]
+    return archived
+
+
+def get_log_archive_segments(category, since=None, until=None):
+    """Segments of category overlapping [since, until), newest first."""
+    query = LogArchiveSegment.query.filter(LogArchiveSegment.category == category)
+    if since:
+        query = query.filter(LogArchiveSegment.end_at >= since)
+    if until:
+        query = query.filter(LogArchiveSegment.start_at < until)
+    return query.order_by(LogArchiveSegment.start_at.desc()).all()
+
+
+def get_log_archive_segment(segment_id):
+    return LogArchiveSegment.query.get(segment_id)
+
+
+def _iter_segment_records(segment):
+    with get_storage().open(segment.storage_key) as source:
+        with gzip.GzipFile(fileobj=source, mode="rb") as archive:
+            for line in archive:
+                yield json.loads(line)
+
+
+def search_log_archives(category, text=None, since=None, until=None, action=None, entity_type=None,
+                        entity_id=None, actor=None, limit=100):
+    """
+    Newest-first archived events matching every given filter. Only segments whose time range
+    overlaps [since, until) are opened, and they are read as streams, one line at a time.
+    """
+    text = text.lower() if text else None
+    results = []
+    for segment in get_log_archive_segments(category, since, until):
+        matches = []
+        for record in _iter_segment_records(segment):
+            timestamp = datetime.fromisoformat(record['timestamp'])
+            if (since and timestamp < since) or (until and timestamp >= until):
+                continue
+            if action and record.get('action') != action:
+                continue
+            if entity_type and record.get('entity_type') != entity_type:
+                continue
+            if entity_id and record.get('entity_id') != str(entity_id):
+                continue
+            if actor and record.get('user_email') != actor:
+                continue
+            if text and text not in (record.get('message') or '').lower():
+                continue
+            record['segment_id'] = segment.id
+            matches.append(record)
+        # Segment lines run oldest to newest
+        results.extend(reversed(matches))
+        if len(results) >= limit:
+            break
+    return results[:limit]
+
+
+register_job('log_rotation', rotate_logs, Config.LOG_ROTATION_INTERVAL_SECONDS)
@@ -0,0 +1,282 @@
+import io
+import json
+from datetime import datetime, date, time, timedelta, timezone
+from sqlalchemy.exc import IntegrityError
+from models import db, DepartmentReport, Ticket, Task, Log
+from config import Config
+from utils.audit_messages import DISPLAY_TZ
+from utils.storage import get_storage
+from utils.email_sender import send_email
+from utils.background import register_job
+from services.analytics_service import get_analytics, REQUEST_MODELS
+from services.sla_service import get_overdue_counts, SLA_REQUEST_DEPARTMENT
+from services.audit_service import department_category
+from services.assignment_service import DEPARTMENT_ADMIN_DIRECTORY
+
+REPORT_PREFIX = "reports"
+REPORT_PERIODS = ['weekly', 'monthly']
+REPORT_DEPARTMENTS = list(DEPARTMENT_ADMIN_DIRECTORY)
+
+
+def _local_today():
+    return datetime.now(DISPLAY_TZ).date()
+
+
+def last_finished_period(period, today=None):
+    """(start, end) local dates of the last complete week (Monday to Sunday) or calendar month; end is exclusive."""
+    today = today or _local_today()
+    if period == 'weekly':
+        end = today - timedelta(days=today.weekday())
+        return end - timedelta(days=7), end
+    end = today.replace(day=1)
+    return (end - timedelta(days=1)).replace(day=1), end
+
+
+def period_containing(period, day):
+    """(start, end) of the week or month that contains day."""
+    if period == 'weekly':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    start = day.replace(day=1)
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+def _utc_start_of(day):
+    return datetime.combine(day, time(0), tzinfo=DISPLAY_TZ).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _task_completions(category, since, until):
+    """Tasks completed in [since, until), counted from the indexed audit events rather than the Task table."""
+    completions = Log.query.filter(
+        Log.category == category,
+        Log.action.in_(['task.completed', 'task.batch_completed']),
+        Log.timestamp >= since,
+        Log.timestamp < until
+    ).with_entities(Log.action, Log.details)
+    total = 0
+    for action, details in completions:
+        total += (json.loads(details).get('count', 0) if details else 0) if action == 'task.batch_completed' else 1
+    return total
+
+
+def build_report(department, period, period_start, period_end):
+    """The report snapshot as a dict. Ticket and request figures come from the analytics rollups."""
+    analytics, error = get_analytics(period_start, period_end, 'day', department)
+    if error:
+        raise ValueError(error)
+    open_now = (
+        Ticket.query.filter(Ticket.status == 'open', Ticket.department == department, Ticket.deleted_at.is_(None)).count()
+    )
+    overdue = get_overdue_counts()
+    category = department_category(department)
+    tasks_total, tasks_completed = (
+        db.session.query(db.func.count(Task.id), db.func.count(Task.id).filter(Task.completed.is_(True)))
+        .filter(Task.category == category)
+        .one()
+    )
+
+    report = {
+        'department': department,
+        'period': period,
+        'period_start': period_start.isoformat(),
+        'period_end': period_end.isoformat(),
+        'generated_at': datetime.utcnow().isoformat(),
+        'tickets': {
+            'opened': analytics['totals']['tickets_opened'].get(department, 0),
+            'closed': analytics['totals']['tickets_closed'].get(department, 0),
+            'time_to_close': analytics['time_to_close'].get(
+                department, {'count': 0, 'mean_hours': None, 'median_hours': None}
+            ),
+            'open_now': open_now,
+            'overdue_now': overdue.get('ticket', {}).get(department, 0),
+            'daily': [
+                {
+                    'date': bucket['bucket'],
+                    'opened': bucket['tickets_opened'].get(department, 0),
+                    'closed': bucket['tickets_closed'].get(department, 0),
+                }
+                for bucket in analytics['series']
+            ],
+        },
+        'tasks': {
+            'category': category,
+            'completed_in_period': _task_completions(category, _utc_start_of(period_start), _utc_start_of(period_end)),
+            'total_now': tasks_total,
+            'completed_now': tasks_completed,
+        },
+    }
+    if department == SLA_REQUEST_DEPARTMENT:
+        report['requests'] = {
+            'created': {request_type: analytics['totals']['requests_created'].get(request_type, 0) for request_type in REQUEST_MODELS},
+            'overdue_now': {
+                item_type: counts.get(SLA_REQUEST_DEPARTMENT, 0)
+                for item_type, counts in overdue.items() if item_type != 'ticket'
+            },
+        }
+    return report
+
+
+def render_report_email(report):
+    last_day = date.fromisoformat(report['period_end']) - timedelta(days=1)
+    tickets = report['tickets']
+    time_to_close = tickets['time_to_close']
+    lines = [
+        f"{report['department']} {report['period']} report: {report['period_start']} to {last_day.isoformat()}",
+        "",
+        "Tickets",
+        f"  Opened: {tickets['opened']}",
+        f"  Closed: {tickets['closed']}",
+        f"  Median time to close: {time_to_close['median_hours'] if time_to_close['median_hours'] is not None else 'n/a'} hours",
+        f"  Mean time to close: {time_to_close['mean_hours'] if time_to_close['mean_hours'] is not None else 'n/a'} hours",
+        f"  Open now: {tickets['open_now']} ({tickets['overdue_now']} past their SLA target)",
+    ]
+    if 'requests' in report:
+        lines += ["", "Requests"]
+        for request_type, count in sorted(report['requests']['created'].items()):
+            lines.append(f"  {request_type.capitalize()} requests created: {count}")
+        overdue_requests = sum(report['requests']['overdue_now'].values())
+        lines.append(f"  Open past their SLA target: {overdue_requests}")
+    tasks = report['tasks']
+    lines += [
+        "",
+        f"Tasks ({tasks['category']})",
+        f"  Completed this period: {tasks['completed_in_period']}",
+        f"  Checklist now: {tasks['completed_now']} of {tasks['total_now']} complete",
+        "",
+        "This is an automated message. Do not reply to this email.",
+    ]
+    return "\n".join(lines)
+
+
+def _claim_expired():
+    """Matches reports left 'generating' for longer than REPORTS_CLAIM_TIMEOUT_SECONDS, e.g. by a process that died."""
+    cutoff = datetime.utcnow() - timedelta(seconds=Config.REPORTS_CLAIM_TIMEOUT_SECONDS)
+    return db.and_(
+        DepartmentReport.status == 'generating',
+        db.or_(DepartmentReport.claimed_at.is_(None), DepartmentReport.claimed_at < cutoff)
+    )
+
+
+def _claim_report(department, period, period_start, period_end, regenerate):
+    """
+    Inserts the report row, or takes over an existing one whose claim has expired (or, with regenerate,
+    one that is ready); None if another process holds it.
+    """
+    now = datetime.utcnow()
+    existing = DepartmentReport.query.filter_by(department=department, period=period, period_start=period_start).first()
+    if existing:
+        claimable = db.or_(DepartmentReport.status == 'ready', _claim_expired()) if regenerate else _claim_expired()
+        # Checked in the UPDATE itself so two processes can't both take the same row over
+        claimed = DepartmentReport.query.filter(DepartmentReport.id == existing.id, claimable).update(
+            {DepartmentReport.status: 'generating', DepartmentReport.claimed_at: now}, synchronize_session=False
+        )
+        db.session.commit()
+        return existing if claimed else None
+    report_row = DepartmentReport(
+        department=department, period=period, period_start=period_start, period_end=period_end,
+        status='generating', claimed_at=now
+    )
+    db.session.add(report_row)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback() # Another app process claimed it first
+        return None
+    return report_row
+
+
+def generate_report(department, period, period_start=None, regenerate=False, email=None):
+    """
+    Builds a department report, stores its JSON and email text, and optionally emails it to the
+    department's admins. Defaults to the last finished period. Returns (DepartmentReport, error).
+    """
+    if department not in REPORT_DEPARTMENTS:
+        return None, f"Department must be one of: {', '.join(REPORT_DEPARTMENTS)}."
+    if period not in REPORT_PERIODS:
+        return None, f"Period must be one of: {', '.join(REPORT_PERIODS)}."
+    if period_start:
+        period_start, period_end = period_containing(period, period_start)
+    else:
+        period_start, period_end = last_finished_period(period)
+    if period_start > _local_today():
+        return None, "That period has not started yet."
+
+    report_row = _claim_report(department, period, period_start, period_end, regenerate)
+    if not report_row:
+        return None, "A report for that period already exists or is being generated."
+
+    try:
+        report = build_report(department, period, period_start, period_end)
+        body = json.dumps(report, separators=(',', ':')).encode('utf-8')
+        key = f"{REPORT_PREFIX}/{department}/{period}/{period_start.isoformat()}"
+        storage = get_storage()
+        storage.save(f"{key}.json", io.BytesIO(body))
+        email_text = render_report_email(report)
+        storage.save(f"{key}.txt", io.BytesIO(email_text.encode('utf-8')))
+    except Exception:
+        db.session.rollback()
+        if report_row.storage_key:
+            report_row.status = 'ready' # A failed regeneration keeps serving the previous snapshot
+        else:
+            db.session.delete(report_row) # Leave the period free for the next run
+        db.session.commit()
+        raise
+
+    report_row.storage_key = f"{key}.json"
+    report_row.size_bytes = len(body)
+    report_row.status = 'ready'
+    report_row.generated_at = datetime.utcnow()
+    db.session.commit()
+
+    if Config.REPORTS_EMAIL_ENABLED if email is None else email:
+        subject = f"{department} {period.capitalize()} Report ({period_start.isoformat()})"
+        for admin_email in DEPARTMENT_ADMIN_DIRECTORY[department]():
+            send_email(admin_email, subject, email_text)
+        report_row.emailed_at = datetime.utcnow()
+        db.session.commit()
+    return report_row, None
+
+
+def get_reports(department=None, period=None, limit=52):
+    query = DepartmentReport.query.filter(DepartmentReport.status == 'ready')
+    if department:
+        query = query.filter(DepartmentReport.department == department)
+    if period:
+        query = query.filter(DepartmentReport.period == period)
+    return query.order_by(DepartmentReport.period_start.desc(), DepartmentReport.department.asc()).limit(limit).all()
+
+
+def get_report(report_id):
+    report_row = DepartmentReport.query.get(report_id)
+    return report_row if report_row and report_row.status == 'ready' else None
+
+
+def report_email_key(report_row):
+    return report_row.storage_key[:-len('.json')] + '.txt'
+
+
+def generate_due_reports():
+    """
+    Background job: during the off-peak hours, generates any missing report for the last finished
+    week and month, including ones whose generation was abandoned. Returns how many were generated.
+    """
+    if not Config.REPORTS_OFFPEAK_START_HOUR <= datetime.now(DISPLAY_TZ).hour < Config.REPORTS_OFFPEAK_END_HOUR:
+        return 0
+    generated = 0
+    for period in REPORT_PERIODS:
+        period_start, _ = last_finished_period(period)
+        existing = {
+            department for (department,) in db.session.query(DepartmentReport.department)
+            .filter_by(period=period, period_start=period_start)
+            .filter(db.not_(_claim_expired())) # Abandoned claims are generated again
+        }
+        for department in REPORT_DEPARTMENTS:
+            if department in existing:
+                continue
+            report_row, _ = generate_report(department, period)
+            if report_row:
+                generated += 1
+    return generated
+
+
+register_job('department_reports', generate_due_reports, Config.REPORTS_CHECK_INTERVAL_SECONDS)
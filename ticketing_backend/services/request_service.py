@@ -1,8 +1,15 @@
-from datetime import datetime, date
-from models import db, EquipmentRequest, UserRequest, StudentRequest, User
-from utils.helpers import generate_unique_id
+import re
+from datetime import datetime, date, time
+from sqlalchemy.exc import IntegrityError
+from models import db, EquipmentRequest, UserRequest, StudentRequest, User, EquipmentItem, EquipmentReservation
+from utils.helpers import generate_unique_id, encode_cursor, decode_cursor, parse_time_of_day
 from utils.email_sender import send_email
 from services.user_service import get_user_by_email, get_user_by_id, get_tech_admins
+from services.autocomplete_service import record_autocomplete_value
+from services.calendar_service import refresh_equipment_request_events
+from services.audit_service import record_audit, REQUEST_CATEGORY
+from services.dashboard_service import adjust_counter, EQUIPMENT_REQUESTS, USER_REQUESTS, STUDENT_REQUESTS
+from services.analytics_service import record_request_created
 
 # --- Equipment Requests ---
 def create_equipment_request(name, event, request_date_str, request_time, location, equipment, description, return_date_str, return_time, user_id):
@@ -29,7 +36,12 @@ def create_equipment_request(name, event, request_date_str, request_time, locati
         approval_status='pending'
     )
     db.session.add(new_request)
+    adjust_counter(EQUIPMENT_REQUESTS, 1)
+    record_request_created('equipment')
+    record_audit('equipment_request.created', REQUEST_CATEGORY, user_id, 'equipment_request', request_id, {'equipment': equipment})
     db.session.commit()
+    record_autocomplete_value('location', location)
+    record_autocomplete_value('equipment', equipment)
 
     # Send notifications to IT admins
     request_user = get_user_by_id(user_id)
@@ -47,7 +59,7 @@ def create_equipment_request(name, event, request_date_str, request_time, locati
 
     return new_request, None
 
-def get_equipment_requests(search_keyword=None, current_user_id=None, is_admin=False):
+def get_equipment_requests(search_keyword=None, current_user_id=None, is_admin=False, overdue=False):
     query = EquipmentRequest.query.order_by(
         db.case((EquipmentRequest.status == 'open', 0), else_=1),
         EquipmentRequest.timestamp.desc()
@@ -66,18 +78,62 @@ def get_equipment_requests(search_keyword=None, current_user_id=None, is_admin=F
             (EquipmentRequest.description.ilike(keyword)) |
             (EquipmentRequest.request_user.has(User.email.ilike(keyword)))
         )
+    if overdue:
+        query = query.filter(EquipmentRequest.status == 'open', EquipmentRequest.sla_breached_at.isnot(None))
     return query.all()
 
 def get_equipment_request_by_id(request_id):
     return EquipmentRequest.query.get(request_id)
 
-def approve_equipment_request(request_id):
+def approve_equipment_request(request_id, equipment_item_ids=None, user_id=None):
+    """
+    Approves a request and books its equipment items for the request's interval.
+    Items are the given inventory IDs, or matched from the request's equipment text.
+    Returns (request, error); the error names the conflicting booking if an item is taken.
+    """
     request = get_equipment_request_by_id(request_id)
     if not request:
         return None, "Equipment request not found."
-    
+
+    start_at, end_at = get_equipment_request_interval(request)
+    if end_at <= start_at:
+        return None, "Return date/time must be after the event date/time."
+
+    # Re-approval replaces the request's earlier bookings. Doing this write first takes SQLite's write
+    # lock, so a concurrent approval waits here until this one commits instead of passing the same
+    # conflict check; pysqlite issues no BEGIN for the SELECTs below, which on their own lock nothing.
+    EquipmentReservation.query.filter_by(equipment_request_id=request_id).delete(synchronize_session=False)
+
+    if equipment_item_ids:
+        items = EquipmentItem.query.filter(EquipmentItem.id.in_(equipment_item_ids), EquipmentItem.active == True).all()
+        if len(items) != len(set(equipment_item_ids)):
+            db.session.rollback()
+            return None, "Equipment item not found."
+    else:
+        items = match_equipment_items(request.equipment, start_at, end_at, exclude_request_id=request_id)
+
+    conflicts = find_reservation_conflicts([item.id for item in items], start_at, end_at, exclude_request_id=request_id)
+    if conflicts:
+        conflict = conflicts[0]
+        error = (
+            f"Equipment conflict: {conflict.equipment_item.name} is already booked from "
+            f"{conflict.start_at.strftime('%Y-%m-%d %H:%M')} to {conflict.end_at.strftime('%Y-%m-%d %H:%M')} "
+            f"(request {conflict.equipment_request_id})."
+        )
+        db.session.rollback() # Keeps the earlier bookings
+        return None, error
+
+    for item in items:
+        db.session.add(EquipmentReservation(
+            equipment_request_id=request_id,
+            equipment_item_id=item.id,
+            start_at=start_at,
+            end_at=end_at
+        ))
     request.approval_status = 'approved'
+    record_audit('equipment_request.approved', REQUEST_CATEGORY, user_id, 'equipment_request', request_id)
     db.session.commit()
+    refresh_equipment_request_events(request)
 
     # Notify user
     subject = "Equipment Request Approved"
@@ -92,13 +148,16 @@ def approve_equipment_request(request_id):
         send_email(request.request_user.email, subject, message)
     return request, None
 
-def deny_equipment_request(request_id):
+def deny_equipment_request(request_id, user_id=None):
     request = get_equipment_request_by_id(request_id)
     if not request:
         return None, "Equipment request not found."
     
     request.approval_status = 'denied'
+    EquipmentReservation.query.filter_by(equipment_request_id=request_id).delete(synchronize_session=False)
+    record_audit('equipment_request.denied', REQUEST_CATEGORY, user_id, 'equipment_request', request_id)
     db.session.commit()
+    refresh_equipment_request_events(request)
 
     # Notify user
     subject = "Equipment Request Denied"
@@ -111,14 +170,141 @@ def deny_equipment_request(request_id):
         send_email(request.request_user.email, subject, message)
     return request, None
 
-def close_equipment_request(request_id):
+def close_equipment_request(request_id, user_id=None):
     request = get_equipment_request_by_id(request_id)
     if not request:
         return None
     request.status = 'closed'
+    # Closing means the equipment came back, so its bookings stop blocking others
+    EquipmentReservation.query.filter_by(equipment_request_id=request_id, released_at=None).update(
+        {'released_at': datetime.utcnow()}, synchronize_session=False
+    )
+    record_audit('equipment_request.closed', REQUEST_CATEGORY, user_id, 'equipment_request', request_id)
     db.session.commit()
+    refresh_equipment_request_events(request)
     return request
 
+# --- Equipment Inventory and Reservations ---
+def get_equipment_items(include_inactive=False):
+    query = EquipmentItem.query
+    if not include_inactive:
+        query = query.filter(EquipmentItem.active == True)
+    return query.order_by(EquipmentItem.category.asc(), EquipmentItem.name.asc()).all()
+
+def create_equipment_item(name, category=None):
+    if EquipmentItem.query.filter(db.func.lower(EquipmentItem.name) == name.strip().lower()).first():
+        return None, "An equipment item with this name already exists."
+    item = EquipmentItem(name=name.strip(), category=category.strip() if category else None, active=True)
+    db.session.add(item)
+    db.session.commit()
+    return item, None
+
+def update_equipment_item(item_id, name=None, category=None, active=None):
+    item = EquipmentItem.query.get(item_id)
+    if not item:
+        return None
+    if name:
+        item.name = name.strip()
+    if category is not None:
+        item.category = category.strip() or None
+    if active is not None:
+        item.active = bool(active)
+    db.session.commit()
+    return item
+
+def get_equipment_request_interval(request):
+    """Normalizes a request's date/time strings into a (start, end) datetime interval."""
+    start_time = parse_time_of_day(request.time, default=time.min)
+    end_time = parse_time_of_day(request.return_time, default=time.max)
+    return datetime.combine(request.date, start_time), datetime.combine(request.return_date, end_time)
+
+def find_reservation_conflicts(item_ids, start_at, end_at, exclude_request_id=None):
+    """Active bookings of any of item_ids overlapping [start_at, end_at)."""
+    if not item_ids:
+        return []
+    query = EquipmentReservation.query.filter(
+        EquipmentReservation.equipment_item_id.in_(item_ids),
+        EquipmentReservation.end_at > start_at,
+        EquipmentReservation.start_at < end_at,
+        EquipmentReservation.released_at.is_(None)
+    )
+    if exclude_request_id:
+        query = query.filter(EquipmentReservation.equipment_request_id != exclude_request_id)
+    return query.order_by(EquipmentReservation.start_at.asc()).all()
+
+def match_equipment_items(equipment_text, start_at, end_at, exclude_request_id=None):
+    """
+    Maps a request's free-text equipment ("Projector, Speaker 2") to inventory items.
+    A part naming an item exactly books that item; a part naming a category books the
+    first item of that category that is free for the interval (or the first one, so the
+    conflict is reported). Parts matching nothing are left to the admin.
+    """
+    parts = [p.strip().lower() for p in re.split(r",|;|&|/|\band\b", equipment_text or "") if p.strip()]
+    if not parts:
+        return []
+    active_items = get_equipment_items()
+    by_name = {item.name.lower(): item for item in active_items}
+
+    matched = []
+    for part in parts:
+        if part in by_name:
+            matched.append(by_name[part])
+            continue
+        candidates = [
+            item for item in active_items
+            if item.category and item.category.lower() in (part, part.rstrip('s')) and item not in matched
+        ]
+        if not candidates:
+            continue
+        busy_ids = {r.equipment_item_id for r in find_reservation_conflicts(
+            [item.id for item in candidates], start_at, end_at, exclude_request_id
+        )}
+        free = [item for item in candidates if item.id not in busy_ids]
+        matched.append(free[0] if free else candidates[0])
+    return matched
+
+def get_equipment_availability(start_at, end_at, category=None):
+    """Every active item with whether it is free for [start_at, end_at) and the bookings in the way."""
+    items = get_equipment_items()
+    if category:
+        items = [item for item in items if item.category and item.category.lower() == category.lower()]
+    busy = {}
+    for reservation in find_reservation_conflicts([item.id for item in items], start_at, end_at):
+        busy.setdefault(reservation.equipment_item_id, []).append(reservation)
+    return [{
+        'item': item.to_dict(),
+        'available': item.id not in busy,
+        'reservations': [r.to_dict() for r in busy.get(item.id, [])]
+    } for item in items]
+
+def backfill_equipment_reservations():
+    """Creates bookings for open, approved requests that predate the reservation model.
+    Returns (created, conflicting) request counts; conflicting requests are left unbooked."""
+    created = conflicting = 0
+    requests = EquipmentRequest.query.filter(
+        EquipmentRequest.approval_status == 'approved',
+        EquipmentRequest.status == 'open',
+        ~EquipmentRequest.reservations.any()
+    ).order_by(EquipmentRequest.timestamp.asc()).all()
+    for request in requests:
+        start_at, end_at = get_equipment_request_interval(request)
+        if end_at <= start_at:
+            continue
+        items = match_equipment_items(request.equipment, start_at, end_at, exclude_request_id=request.id)
+        if not items:
+            continue
+        if find_reservation_conflicts([item.id for item in items], start_at, end_at, exclude_request_id=request.id):
+            conflicting += 1
+            continue
+        for item in items:
+            db.session.add(EquipmentReservation(
+                equipment_request_id=request.id, equipment_item_id=item.id, start_at=start_at, end_at=end_at
+            ))
+        db.session.flush()
+        created += 1
+    db.session.commit()
+    return created, conflicting
+
 # --- User Requests (New Employee) ---
 def create_user_request(fname, lname, job_title, department, start_date_str, description, user_id):
     request_id = generate_unique_id()
@@ -139,6 +325,9 @@ def create_user_request(fname, lname, job_title, department, start_date_str, des
         status='open'
     )
     db.session.add(new_request)
+    adjust_counter(USER_REQUESTS, 1)
+    record_request_created('user')
+    record_audit('user_request.created', REQUEST_CATEGORY, user_id, 'user_request', request_id, {'name': f"{fname} {lname}"})
     db.session.commit()
 
     # Notify IT admins (assuming IT handles new user creation)
@@ -157,7 +346,7 @@ def create_user_request(fname, lname, job_title, department, start_date_str, des
     
     return new_request, None
 
-def get_user_requests(search_keyword=None, current_user_id=None, is_admin=False):
+def get_user_requests(search_keyword=None, current_user_id=None, is_admin=False, overdue=False):
     query = UserRequest.query.order_by(
         db.case((UserRequest.status == 'open', 0), else_=1),
         UserRequest.timestamp.desc()
@@ -174,16 +363,19 @@ def get_user_requests(search_keyword=None, current_user_id=None, is_admin=False)
             (UserRequest.description.ilike(keyword)) |
             (UserRequest.request_user.has(User.email.ilike(keyword)))
         )
+    if overdue:
+        query = query.filter(UserRequest.status == 'open', UserRequest.sla_breached_at.isnot(None))
     return query.all()
 
 def get_user_request_by_id(request_id):
     return UserRequest.query.get(request_id)
 
-def close_user_request(request_id):
+def close_user_request(request_id, user_id=None):
     request = get_user_request_by_id(request_id)
     if not request:
         return None
     request.status = 'closed'
+    record_audit('user_request.closed', REQUEST_CATEGORY, user_id, 'user_request', request_id)
     db.session.commit()
     return request
 
@@ -206,7 +398,11 @@ def create_student_request(fname, lname, grade, teacher, description, user_id):
         azure_created=False
     )
     db.session.add(new_request)
+    adjust_counter(STUDENT_REQUESTS, 1)
+    record_request_created('student')
+    record_audit('student_request.created', REQUEST_CATEGORY, user_id, 'student_request', request_id, {'name': f"{fname} {lname}"})
     db.session.commit()
+    record_autocomplete_value('teacher', teacher)
 
     # Notify IT admins (assuming IT handles student setup)
     request_user = get_user_by_id(user_id)
@@ -222,7 +418,117 @@ def create_student_request(fname, lname, grade, teacher, description, user_id):
         send_email(admin_email, subject, message)
     return new_request
 
-def get_student_requests(search_keyword=None, current_user_id=None, is_admin=False):
+STUDENT_IMPORT_FIELDS = ['fname', 'lname', 'grade', 'teacher', 'description']
+STUDENT_IMPORT_ALIASES = {'first_name': 'fname', 'last_name': 'lname', 'firstname': 'fname', 'lastname': 'lname'}
+STUDENT_IMPORT_BATCH_SIZE = 500
+
+def _normalize_student_row(row):
+    normalized = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        key = key.strip().lower().replace(' ', '_')
+        key = STUDENT_IMPORT_ALIASES.get(key, key)
+        normalized[key] = value.strip() if isinstance(value, str) else value
+    return normalized
+
+def import_student_requests(rows, user_id, partial=False):
+    """
+    Creates student requests from a list of row dicts (parsed CSV or JSON).
+    Every row is validated first; unless partial is set, one invalid row aborts the
+    whole import. Valid rows are inserted in batched transactions and IT admins get a
+    single summary email instead of one per student.
+    Returns a report dict with per-row results.
+    """
+    results = []
+    valid_rows = []
+    for row_number, raw_row in enumerate(rows, start=1):
+        if not isinstance(raw_row, dict):
+            results.append({'row': row_number, 'status': 'error', 'errors': ['Row must be an object.']})
+            continue
+        row = _normalize_student_row(raw_row)
+        errors = [f"Missing {field}." for field in STUDENT_IMPORT_FIELDS if field != 'description' and not row.get(field)]
+        for field, max_length in (('fname', 100), ('lname', 100), ('grade', 50), ('teacher', 100)):
+            if row.get(field) and len(str(row[field])) > max_length:
+                errors.append(f"{field} is longer than {max_length} characters.")
+        if errors:
+            results.append({'row': row_number, 'status': 'error', 'errors': errors})
+        else:
+            result = {'row': row_number, 'status': 'valid'}
+            results.append(result)
+            valid_rows.append((result, row))
+
+    has_errors = len(valid_rows) != len(results)
+    if not valid_rows or (has_errors and not partial):
+        for result in results:
+            if result['status'] == 'valid':
+                result['status'] = 'skipped'
+        return {'created': 0, 'failed': len(results) - len(valid_rows), 'rows': results}
+
+    # One generate_unique_id() value plus a row suffix: the '-' keeps these IDs apart from the
+    # digits-only IDs generate_unique_id() hands out, and another import starts from its own base
+    base_id = generate_unique_id()
+    now = datetime.utcnow()
+    created = 0
+    for start in range(0, len(valid_rows), STUDENT_IMPORT_BATCH_SIZE):
+        batch = valid_rows[start:start + STUDENT_IMPORT_BATCH_SIZE]
+        values = []
+        for offset, (result, row) in enumerate(batch, start=start):
+            request_id = f"{base_id}-{offset + 1}"
+            result['id'] = request_id
+            values.append({
+                'id': request_id,
+                'fname': str(row['fname']),
+                'lname': str(row['lname']),
+                'grade': str(row['grade']),
+                'teacher': str(row['teacher']),
+                'description': str(row.get('description') or ''),
+                'user_id': user_id,
+                'timestamp': now,
+                'status': 'open',
+                'email_created': False,
+                'computer_created': False,
+                'bag_created': False,
+                'id_card_created': False,
+                'azure_created': False
+            })
+        try:
+            db.session.execute(db.insert(StudentRequest), values)
+            adjust_counter(STUDENT_REQUESTS, len(values))
+            record_request_created('student', now, count=len(values))
+            # One event per batch rather than per student
+            record_audit('student_request.imported', REQUEST_CATEGORY, user_id, 'student_request', None, {
+                'count': len(values), 'first_id': values[0]['id'], 'last_id': values[-1]['id']
+            })
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            for result, row in batch:
+                result['status'] = 'error'
+                result['errors'] = ['Could not be saved: a request with this ID already exists.']
+                del result['id']
+            continue
+        created += len(batch)
+        for result, row in batch:
+            result['status'] = 'created'
+            record_autocomplete_value('teacher', str(row['teacher']))
+
+    if not created:
+        return {'created': 0, 'failed': len(results), 'rows': results}
+    request_user = get_user_by_id(user_id)
+    subject = "Student Requests Imported"
+    message = (
+        f"{created} new student request(s) were imported by {request_user.email if request_user else 'N/A'} "
+        f"at {now.strftime('%Y-%m-%d %H:%M:%S')}.\n"
+        f"Rows rejected: {len(results) - created}.\n\n"
+        "This is an automated message. Do not reply to this email."
+    )
+    for admin_email in get_tech_admins():
+        send_email(admin_email, subject, message)
+
+    return {'created': created, 'failed': len(results) - created, 'rows': results}
+
+def get_student_requests(search_keyword=None, current_user_id=None, is_admin=False, overdue=False):
     query = StudentRequest.query.order_by(
         db.case((StudentRequest.status == 'open', 0), else_=1),
         StudentRequest.timestamp.desc()
@@ -239,27 +545,196 @@ def get_student_requests(search_keyword=None, current_user_id=None, is_admin=Fal
             (StudentRequest.description.ilike(keyword)) |
             (StudentRequest.request_user.has(User.email.ilike(keyword)))
         )
+    if overdue:
+        query = query.filter(StudentRequest.status == 'open', StudentRequest.sla_breached_at.isnot(None))
     return query.all()
 
 def get_student_request_by_id(request_id):
     return StudentRequest.query.get(request_id)
 
-def close_student_request(request_id):
+def close_student_request(request_id, user_id=None):
     request = get_student_request_by_id(request_id)
     if not request:
         return None
     request.status = 'closed'
+    record_audit('student_request.closed', REQUEST_CATEGORY, user_id, 'student_request', request_id)
     db.session.commit()
     return request
 
+STUDENT_CHECKLIST_FIELDS = ['email_created', 'computer_created', 'bag_created', 'id_card_created', 'azure_created']
+
 def toggle_student_status(request_id, status_field):
-    request = get_student_request_by_id(request_id)
-    if not request:
-        return None
-    
-    if not hasattr(request, status_field) or not isinstance(getattr(request, status_field), bool):
+    if status_field not in STUDENT_CHECKLIST_FIELDS:
         return None # Invalid field
-        
-    setattr(request, status_field, not getattr(request, status_field))
+
+    # Flip the flag in SQL so two admins clicking at once can't overwrite each other
+    column = getattr(StudentRequest, status_field)
+    updated = StudentRequest.query.filter_by(id=request_id).update({
+        column: db.case((column == True, False), else_=True),
+        StudentRequest.version: StudentRequest.version + 1
+    }, synchronize_session=False)
+    db.session.commit()
+    if not updated:
+        return None
+    return get_student_request_by_id(request_id)
+
+STUDENT_CHECKLIST_MAX_STUDENTS = 5000
+
+def update_student_checklists(students, fields):
+    """
+    Sets checklist fields on many student requests in one transaction.
+    students is a list of {'id': ..., 'version': ...}; when a version is given the row
+    is only updated if it still has that version. The batch is all-or-nothing.
+    Returns (updated_requests, error, stale_ids).
+    """
+    if not fields or any(field not in STUDENT_CHECKLIST_FIELDS for field in fields):
+        return None, f"Fields must be among: {', '.join(STUDENT_CHECKLIST_FIELDS)}.", []
+    if any(not isinstance(value, bool) for value in fields.values()):
+        return None, "Checklist values must be true or false.", []
+    if not students:
+        return None, "No students given.", []
+    if len(students) > STUDENT_CHECKLIST_MAX_STUDENTS:
+        return None, f"At most {STUDENT_CHECKLIST_MAX_STUDENTS} students per update.", []
+
+    ids = [str(student['id']) for student in students]
+    # One IN list per expected version (None: any), chunked like the import; a condition per
+    # student would exceed SQLite's expression depth limit for large batches
+    versions = {str(student['id']): student.get('version') for student in students}
+    ids_by_version = {}
+    for student_id, version in versions.items():
+        ids_by_version.setdefault(None if version is None else int(version), []).append(student_id)
+
+    values = {getattr(StudentRequest, field): value for field, value in fields.items()}
+    values[StudentRequest.version] = StudentRequest.version + 1
+    updated = 0
+    for version, version_ids in ids_by_version.items():
+        for start in range(0, len(version_ids), STUDENT_IMPORT_BATCH_SIZE):
+            query = StudentRequest.query.filter(StudentRequest.id.in_(version_ids[start:start + STUDENT_IMPORT_BATCH_SIZE]))
+            if version is not None:
+                query = query.filter(StudentRequest.version == version)
+            updated += query.update(values, synchronize_session=False)
+
+    if updated != len(versions):
+        db.session.rollback()
+        current = {r.id: r.version for r in db.session.query(StudentRequest.id, StudentRequest.version).filter(StudentRequest.id.in_(ids))}
+        stale_ids = [
+            str(student['id']) for student in students
+            if str(student['id']) not in current
+            or (student.get('version') is not None and current[str(student['id'])] != int(student['version']))
+        ]
+        return None, "Some student requests were not found or were changed by someone else.", stale_ids
+
     db.session.commit()
-    return request
\ No newline at end of file
+    return StudentRequest.query.filter(StudentRequest.id.in_(ids)).all(), None, []
+
+def get_student_onboarding_progress(status='open'):
+    """Checklist completion counts per grade and overall, from one aggregate query."""
+    columns = [db.func.count(StudentRequest.id)]
+    columns += [db.func.sum(db.case((getattr(StudentRequest, field) == True, 1), else_=0)) for field in STUDENT_CHECKLIST_FIELDS]
+    columns.append(db.func.sum(db.case((db.and_(*[getattr(StudentRequest, field) == True for field in STUDENT_CHECKLIST_FIELDS]), 1), else_=0)))
+
+    query = db.session.query(StudentRequest.grade, *columns)
+    if status:
+        query = query.filter(StudentRequest.status == status)
+
+    def empty():
+        return {'total': 0, 'fully_complete': 0, **{field: 0 for field in STUDENT_CHECKLIST_FIELDS}}
+
+    overall = empty()
+    by_grade = {}
+    for grade, total, *sums in query.group_by(StudentRequest.grade):
+        counts = by_grade[grade] = empty()
+        counts['total'] = total
+        for field, value in zip(STUDENT_CHECKLIST_FIELDS, sums):
+            counts[field] = value or 0
+        counts['fully_complete'] = sums[-1] or 0
+        for key, value in counts.items():
+            overall[key] += value
+    return {'overall': overall, 'by_grade': by_grade}
+
+# --- Unified Request Inbox ---
+INBOX_PAGE_SIZE = 25
+INBOX_TYPES = ('equipment', 'user', 'student')
+
+def _inbox_branch(model, request_type, summary, current_user_id, is_admin, status):
+    """One SELECT of the inbox UNION, projected onto the common inbox columns."""
+    branch = db.select(
+        model.id.label('id'),
+        db.literal(request_type).label('type'),
+        model.user_id.label('user_id'),
+        summary.label('summary'),
+        model.status.label('status'),
+        model.timestamp.label('timestamp'),
+        db.case((model.status == 'open', 0), else_=1).label('status_rank')
+    )
+    # Filters go on each branch so every table can use its own (status, timestamp) index
+    if not is_admin and current_user_id:
+        branch = branch.where(model.user_id == current_user_id)
+    if status:
+        branch = branch.where(model.status == status)
+    return branch
+
+def get_request_inbox(current_user_id=None, is_admin=False, types=None, status=None, cursor=None, limit=INBOX_PAGE_SIZE):
+    """
+    Returns (items, next_cursor) for equipment, user and student requests merged by one
+    UNION ALL query, open requests first and newest first within each group. Only the
+    common columns are loaded; type-specific detail is fetched from each item's detail_url.
+    Raises ValueError for a malformed cursor.
+    """
+    types = [t for t in (types or INBOX_TYPES) if t in INBOX_TYPES]
+    branches = []
+    if 'equipment' in types:
+        branches.append(_inbox_branch(EquipmentRequest, 'equipment', EquipmentRequest.equipment + ' - ' + EquipmentRequest.event, current_user_id, is_admin, status))
+    if 'user' in types:
+        branches.append(_inbox_branch(UserRequest, 'user', UserRequest.fname + ' ' + UserRequest.lname, current_user_id, is_admin, status))
+    if 'student' in types:
+        branches.append(_inbox_branch(StudentRequest, 'student', StudentRequest.fname + ' ' + StudentRequest.lname, current_user_id, is_admin, status))
+    if not branches:
+        return [], None
+
+    inbox = db.union_all(*branches).subquery('inbox')
+    query = db.select(inbox, User.email.label('user_email')).outerjoin(User, User.id == inbox.c.user_id)
+
+    if cursor:
+        values = decode_cursor(cursor)
+        if not values or len(values) != 4:
+            raise ValueError("Invalid cursor.")
+        rank, timestamp_str, request_id, request_type = values
+        try:
+            timestamp = datetime.fromisoformat(timestamp_str)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor.")
+        # Keyset on (status_rank ASC, timestamp DESC, id DESC, type DESC)
+        query = query.where(
+            (inbox.c.status_rank > rank) |
+            ((inbox.c.status_rank == rank) & (
+                (inbox.c.timestamp < timestamp) |
+                ((inbox.c.timestamp == timestamp) & (
+                    (inbox.c.id < request_id) |
+                    ((inbox.c.id == request_id) & (inbox.c.type < request_type))
+                ))
+            ))
+        )
+
+    query = query.order_by(
+        inbox.c.status_rank.asc(), inbox.c.timestamp.desc(), inbox.c.id.desc(), inbox.c.type.desc()
+    ).limit(limit + 1)
+    rows = db.session.execute(query).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.status_rank, last.timestamp, last.id, last.type)
+
+    detail_paths = {'equipment': 'equipment', 'user': 'users', 'student': 'students'}
+    items = [{
+        'id': row.id,
+        'type': row.type,
+        'summary': row.summary,
+        'user_email': row.user_email,
+        'status': row.status,
+        'timestamp': row.timestamp.isoformat() if row.timestamp else None,
+        'detail_url': f"/requests/{detail_paths[row.type]}/{row.id}"
+    } for row in rows]
+    return items, next_cursor
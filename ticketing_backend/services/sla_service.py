@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from models import db, Ticket, EquipmentRequest, UserRequest, StudentRequest, SlaTarget
+from config import Config
+from utils.background import register_job
+
+# Item type -> model. Requests are all handled by IT; tickets are split by Ticket.department.
+SLA_ITEM_MODELS = {
+    'ticket': Ticket,
+    'equipment_request': EquipmentRequest,
+    'user_request': UserRequest,
+    'student_request': StudentRequest,
+}
+SLA_TICKET_DEPARTMENTS = ['IT', 'Maintenance', 'Management']
+SLA_REQUEST_DEPARTMENT = 'IT'
+
+
+def _default_sla_targets():
+    targets = {
+        ('ticket', 'IT'): Config.SLA_TICKET_HOURS_IT,
+        ('ticket', 'Maintenance'): Config.SLA_TICKET_HOURS_MAINTENANCE,
+        ('ticket', 'Management'): Config.SLA_TICKET_HOURS_MANAGEMENT,
+    }
+    for item_type in SLA_ITEM_MODELS:
+        if item_type != 'ticket':
+            targets[(item_type, SLA_REQUEST_DEPARTMENT)] = Config.SLA_REQUEST_HOURS
+    return targets
+
+
+def get_sla_targets():
+    """Returns {(item_type, department): target_hours}, with saved targets overriding the config defaults."""
+    targets = _default_sla_targets()
+    for target in SlaTarget.query.all():
+        targets[(target.item_type, target.department)] = target.target_hours
+    return targets
+
+
+def set_sla_target(item_type, department, target_hours):
+    if item_type not in SLA_ITEM_MODELS:
+        return None, f"Unknown item type '{item_type}'."
+    valid_departments = SLA_TICKET_DEPARTMENTS if item_type == 'ticket' else [SLA_REQUEST_DEPARTMENT]
+    if department not in valid_departments:
+        return None, f"Department must be one of: {', '.join(valid_departments)}."
+    try:
+        target_hours = int(target_hours)
+    except (TypeError, ValueError):
+        return None, "target_hours must be a whole number of hours."
+    if target_hours < 1:
+        return None, "target_hours must be at least 1."
+
+    target = SlaTarget.query.filter_by(item_type=item_type, department=department).first()
+    if target:
+        target.target_hours = target_hours
+    else:
+        target = SlaTarget(item_type=item_type, department=department, target_hours=target_hours)
+        db.session.add(target)
+
+    # A longer target un-breaches items that are no longer past it; the next sweep catches shorter ones
+    model = SLA_ITEM_MODELS[item_type]
+    query = model.query.filter(
+        model.status == 'open',
+        model.sla_breached_at.isnot(None),
+        model.timestamp >= datetime.utcnow() - timedelta(hours=target_hours)
+    )
+    if item_type == 'ticket':
+        query = query.filter(Ticket.department == department)
+    query.update({model.sla_breached_at: None}, synchronize_session=False)
+    db.session.commit()
+    return target, None
+
+
+def sweep_sla_breaches(now=None):
+    """
+    Marks open items older than their target as breached. Each (type, department) is one
+    UPDATE that walks the (status, timestamp) index over open rows only, so a pass costs
+    about the number of open items rather than the size of the tables.
+    Returns the number of newly breached items per item type.
+    """
+    now = now or datetime.utcnow()
+    breached = {item_type: 0 for item_type in SLA_ITEM_MODELS}
+    for (item_type, department), target_hours in get_sla_targets().items():
+        model = SLA_ITEM_MODELS[item_type]
+        query = model.query.filter(
+            model.status == 'open',
+            model.timestamp < now - timedelta(hours=target_hours),
+            model.sla_breached_at.is_(None)
+        )
+        if item_type == 'ticket':
+            query = query.filter(Ticket.department == department, Ticket.deleted_at.is_(None))
+        breached[item_type] += query.update({model.sla_breached_at: now}, synchronize_session=False)
+    db.session.commit()
+    return breached
+
+
+def get_overdue_counts():
+    """Open, breached items per type (and per department for tickets), answered from the (status, sla_breached_at) indexes."""
+    counts = {}
+    for item_type, model in SLA_ITEM_MODELS.items():
+        query = model.query.filter(model.status == 'open', model.sla_breached_at.isnot(None))
+        if item_type == 'ticket':
+            rows = (
+                query.filter(Ticket.deleted_at.is_(None))
+                .with_entities(Ticket.department, db.func.count())
+                .group_by(Ticket.department)
+                .all()
+            )
+            counts['ticket'] = {department: count for department, count in rows}
+        else:
+            counts[item_type] = {SLA_REQUEST_DEPARTMENT: query.count()}
+    return counts
+
+
+register_job('sla_sweep', sweep_sla_breaches, Config.SLA_SWEEP_INTERVAL_SECONDS)
@@ -1,10 +1,15 @@
-import os
-from datetime import datetime
-from models import Comment, EquipmentRequest, StudentRequest, User, UserRequest, db, Task, Log, Ticket
-from utils.helpers import get_days_until_set_date
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from models import db, Task, TaskSchedule, Log
+from utils.helpers import get_days_until_set_date, encode_cursor, decode_cursor
+from utils.audit_messages import render_audit_message, DISPLAY_TZ
+from utils.background import register_job
 from config import Config
-from services.user_service import get_user_by_id
-from sqlalchemy import func
+from services.audit_service import record_audit, add_log
+from services.log_archive_service import archive_logs
+from sqlalchemy.orm import joinedload
 
 
 
@@ -16,12 +21,9 @@ def add_task(title, description, category, user_id):
         created_by_user_id=user_id
     )
     db.session.add(new_task)
+    db.session.flush() # Assigns the id the audit event refers to
+    record_audit('task.added', category, user_id, 'task', new_task.id, {'title': title})
     db.session.commit()
-    
-    # Log the action
-    log_message = f"Task '{title}' added at {new_task.created_at.strftime('%B %d, %Y, %I:%M %p')} by {get_user_by_id(user_id).email if get_user_by_id(user_id) else 'N/A'}"
-    add_log(log_message, category, user_id)
-    
     return new_task
 
 def complete_task(task_id, category, user_id):
@@ -32,10 +34,8 @@ def complete_task(task_id, category, user_id):
     if not task.completed:
         task.completed = True
         task.completed_at = datetime.utcnow()
+        record_audit('task.completed', category, user_id, 'task', task.id, {'title': task.title})
         db.session.commit()
-
-        log_message = f"Task '{task.title}' completed at {task.completed_at.strftime('%B %d, %Y, %I:%M %p')} by {get_user_by_id(user_id).email if get_user_by_id(user_id) else 'N/A'}"
-        add_log(log_message, category, user_id)
     
     return task
 
@@ -48,10 +48,8 @@ def reset_task(task_id, category, user_id):
         task.completed = False
         task.last_completed_at = task.completed_at
         task.completed_at = None # Reset completed_at when task is reset
+        record_audit('task.reset', category, user_id, 'task', task.id, {'title': task.title})
         db.session.commit()
-
-        log_message = f"Task '{task.title}' reset at {datetime.now().strftime('%B %d, %Y, %I:%M %p')} by {get_user_by_id(user_id).email if get_user_by_id(user_id) else 'N/A'}"
-        add_log(log_message, category, user_id)
     
     return task
 
@@ -60,80 +58,251 @@ def delete_task(task_id, category, user_id):
     if not task:
         return False
     
-    deleted_title = task.title
     db.session.delete(task)
+    record_audit('task.deleted', category, user_id, 'task', task.id, {'title': task.title})
     db.session.commit()
-
-    log_message = f"Task '{deleted_title}' deleted at {datetime.now().strftime('%B %d, %Y, %I:%M %p')} by {get_user_by_id(user_id).email if get_user_by_id(user_id) else 'N/A'}"
-    add_log(log_message, category, user_id)
-    
     return True
 
+TASK_BATCH_MAX = 1000
+
+def _task_batch_criteria(category, task_ids):
+    criteria = [Task.category == category]
+    if task_ids is not None:
+        criteria.append(Task.id.in_(task_ids))
+    return criteria
+
+def _record_task_batch(action, category, user_id, task_ids, details=None):
+    if task_ids:
+        record_audit(action, category, user_id, 'task', None, dict(details or {}, count=len(task_ids), task_ids=', '.join(map(str, task_ids))))
+
+def complete_tasks(category, user_id, task_ids=None):
+    """
+    Completes the category's uncompleted tasks (all of them, or those in task_ids) with a single
+    UPDATE and one audit event for the batch. Returns the ids of the tasks it changed.
+    """
+    changed_ids = db.session.execute(
+        db.update(Task)
+        .where(*_task_batch_criteria(category, task_ids), Task.completed.isnot(True))
+        .values(completed=True, completed_at=datetime.utcnow())
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    _record_task_batch('task.batch_completed', category, user_id, changed_ids)
+    db.session.commit()
+    return changed_ids
+
+def _reset_tasks(category, task_ids=None):
+    # SET expressions see the row's old values, so last_completed_at gets the completion being cleared
+    return db.session.execute(
+        db.update(Task)
+        .where(*_task_batch_criteria(category, task_ids), Task.completed.is_(True))
+        .values(completed=False, last_completed_at=Task.completed_at, completed_at=None)
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+def reset_tasks(category, user_id, task_ids=None):
+    """Resets the category's completed tasks (all, or those in task_ids) in one UPDATE. Returns the ids changed."""
+    changed_ids = _reset_tasks(category, task_ids)
+    _record_task_batch('task.batch_reset', category, user_id, changed_ids)
+    db.session.commit()
+    return changed_ids
+
+def delete_tasks(category, user_id, task_ids):
+    """Deletes the given tasks of the category in one DELETE. Returns the ids deleted."""
+    deleted_ids = db.session.execute(
+        db.delete(Task)
+        .where(*_task_batch_criteria(category, task_ids))
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    _record_task_batch('task.batch_deleted', category, user_id, deleted_ids)
+    db.session.commit()
+    return deleted_ids
+
 def get_tasks_by_category(category):
     return Task.query.filter_by(category=category).order_by(Task.created_at.asc()).all()
 
-def add_log(message, category, user_id):
-    new_log = Log(message=message, category=category, user_id=user_id)
-    db.session.add(new_log)
-    db.session.commit()
-    return new_log
+def _task_log_query(category):
+    # The task manager's log is the task events (and free-text entries) of its category;
+    # ticket and request events share the table but are browsed through /api/audit
+    return Log.query.filter(
+        Log.category == category,
+        (Log.entity_type == 'task') | Log.entity_type.is_(None)
+    )
 
 def get_logs_by_category(category):
-    return Log.query.filter_by(category=category).order_by(Log.timestamp.desc()).all()
+    return _task_log_query(category).options(joinedload(Log.log_user)).order_by(Log.timestamp.desc()).all()
+
+LOGS_PAGE_SIZE = 50
+
+def get_logs_page(category, cursor=None, limit=LOGS_PAGE_SIZE):
+    """
+    Returns (logs, next_cursor) for one newest-first page of a category's task log,
+    read along the (category, timestamp) index. Raises ValueError for a malformed cursor.
+    """
+    query = _task_log_query(category).options(joinedload(Log.log_user))
+    if cursor:
+        values = decode_cursor(cursor)
+        if not values or len(values) != 2:
+            raise ValueError("Invalid cursor.")
+        try:
+            cursor_timestamp, cursor_id = datetime.fromisoformat(values[0]), int(values[1])
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor.")
+        query = query.filter(
+            (Log.timestamp < cursor_timestamp) |
+            ((Log.timestamp == cursor_timestamp) & (Log.id < cursor_id))
+        )
+
+    logs = query.order_by(Log.timestamp.desc(), Log.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(logs) > limit:
+        logs = logs[:limit]
+        next_cursor = encode_cursor(logs[-1].timestamp, logs[-1].id)
+    return logs, next_cursor
 
 def clear_logs_by_category(category):
-    Log.query.filter_by(category=category).delete()
+    """Empties the category's task log by moving every entry into archive segments. Returns (segments, entries)."""
+    return archive_logs(_task_log_query(category).filter(Log.timestamp <= datetime.utcnow()), category)
+
+LOG_EXPORT_FORMATS = {'txt': 'text/plain', 'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+LOG_EXPORT_BATCH_SIZE = 1000
+LOG_EXPORT_COLUMNS = ['id', 'timestamp', 'category', 'action', 'entity_type', 'entity_id', 'user_email', 'message']
+
+def iter_log_export_lines(category, fmt='txt'):
+    """
+    Yields a category's task log newest first as lines of text (plain messages, CSV or NDJSON).
+    Rows come from a server-side cursor in batches of LOG_EXPORT_BATCH_SIZE, so only one batch
+    is ever held in memory.
+    """
+    statement = (
+        _task_log_query(category)
+        .options(joinedload(Log.log_user))
+        .order_by(Log.timestamp.desc(), Log.id.desc())
+        .statement
+        .execution_options(yield_per=LOG_EXPORT_BATCH_SIZE) # Implies stream_results
+    )
+    # Executed as a 2.0-style statement: legacy Query de-duplicates joined-eager rows, which rules out yield_per
+    logs = db.session.scalars(statement)
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(LOG_EXPORT_COLUMNS)
+        yield buffer.getvalue()
+    for log in logs:
+        if fmt == 'txt':
+            yield render_audit_message(log) + "\n"
+            continue
+        data = log.to_dict()
+        if fmt == 'ndjson':
+            yield json.dumps(data) + "\n"
+        else:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow([data[column] for column in LOG_EXPORT_COLUMNS])
+            yield buffer.getvalue()
+
+# --- Task schedules ---
+
+TASK_SCHEDULE_ACTIONS = ['reset']
+
+def _next_schedule_run(time_of_day, weekdays, after):
+    """First run strictly after the naive UTC time after, as naive UTC. time_of_day is local 'HH:MM'."""
+    local_after = after.replace(tzinfo=timezone.utc).astimezone(DISPLAY_TZ)
+    run_time = datetime.strptime(time_of_day, '%H:%M').time()
+    for days_ahead in range(8):
+        day = local_after.date() + timedelta(days=days_ahead)
+        if str(day.weekday()) not in weekdays:
+            continue
+        candidate = datetime.combine(day, run_time, tzinfo=DISPLAY_TZ)
+        if candidate > local_after:
+            return candidate.astimezone(timezone.utc).replace(tzinfo=None)
+    return None
+
+def _parse_schedule_fields(time_of_day, weekdays):
+    """Returns (time_of_day, weekdays string, error)."""
+    try:
+        time_of_day = datetime.strptime(str(time_of_day), '%H:%M').strftime('%H:%M')
+    except ValueError:
+        return None, None, "time_of_day must be HH:MM (24-hour, local time)."
+    if weekdays is None:
+        weekdays = list(range(7))
+    if not isinstance(weekdays, list) or not weekdays or any(day not in range(7) for day in weekdays):
+        return None, None, "weekdays must be a non-empty list of days, Monday = 0 to Sunday = 6."
+    return time_of_day, ''.join(str(day) for day in sorted(set(weekdays))), None
+
+def get_task_schedules(category=None):
+    query = TaskSchedule.query
+    if category:
+        query = query.filter_by(category=category)
+    return query.order_by(TaskSchedule.category.asc(), TaskSchedule.time_of_day.asc()).all()
+
+def create_task_schedule(category, time_of_day, user_id, weekdays=None, action='reset'):
+    if action not in TASK_SCHEDULE_ACTIONS:
+        return None, f"action must be one of: {', '.join(TASK_SCHEDULE_ACTIONS)}."
+    time_of_day, weekdays, error = _parse_schedule_fields(time_of_day, weekdays)
+    if error:
+        return None, error
+    schedule = TaskSchedule(
+        category=category,
+        action=action,
+        time_of_day=time_of_day,
+        weekdays=weekdays,
+        enabled=True,
+        next_run_at=_next_schedule_run(time_of_day, weekdays, datetime.utcnow()),
+        created_by_user_id=user_id
+    )
+    db.session.add(schedule)
     db.session.commit()
-    return True
+    return schedule, None
 
-def download_logs_by_category_to_file(category):
-    logs = get_logs_by_category(category)
-    if not logs:
-        return None
+def update_task_schedule(schedule_id, time_of_day=None, weekdays=None, enabled=None):
+    schedule = TaskSchedule.query.get(schedule_id)
+    if not schedule:
+        return None, "Schedule not found."
+    new_time, new_weekdays, error = _parse_schedule_fields(
+        time_of_day if time_of_day is not None else schedule.time_of_day,
+        weekdays if weekdays is not None else [int(day) for day in schedule.weekdays]
+    )
+    if error:
+        return None, error
+    schedule.time_of_day, schedule.weekdays = new_time, new_weekdays
+    if enabled is not None:
+        schedule.enabled = bool(enabled)
+    schedule.next_run_at = _next_schedule_run(new_time, new_weekdays, datetime.utcnow())
+    db.session.commit()
+    return schedule, None
 
-    current_datetime_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    filename = f"{current_datetime_str}_{category}_logs.txt"
-    filepath = os.path.join(Config.UPLOAD_FOLDER, 'logs', filename)
-    os.makedirs(os.path.join(Config.UPLOAD_FOLDER, 'logs'), exist_ok=True)
+def delete_task_schedule(schedule_id):
+    schedule = TaskSchedule.query.get(schedule_id)
+    if not schedule:
+        return False
+    db.session.delete(schedule)
+    db.session.commit()
+    return True
 
-    with open(filepath, "w") as f:
-        for log in logs:
-            f.write(log.message + "\n")
-    
-    return filepath
-
-def get_dashboard_statistics():
-    total_tickets = Ticket.query.count()
-    open_tickets = Ticket.query.filter(Ticket.status.ilike('open%')).count()
-    closed_tickets = total_tickets - open_tickets 
-    total_comments = Comment.query.count()
-    shimmer_tickets = Ticket.query.filter_by(shimmer=True).count()
-
-    total_equipment_requests = EquipmentRequest.query.count()
-    total_user_requests = UserRequest.query.count()
-    total_student_requests = StudentRequest.query.count()
-    total_requests = total_equipment_requests + total_user_requests + total_student_requests
-
-    total_users = User.query.count()
-
-    # Calculate tickets per department
-    department_counts_query = db.session.query(
-        Ticket.department, 
-        func.count(Ticket.id).label('count')
-    ).group_by(Ticket.department).all()
-    
-    tickets_by_department = {dept: count for dept, count in department_counts_query if dept}
-
-    return {
-        "num_total_tickets": total_tickets,
-        "num_open_tickets": open_tickets,
-        "num_closed_tickets": closed_tickets,
-        "num_comments": total_comments,
-        "num_shimmer_tickets": shimmer_tickets,
-        "num_equipment_requests": total_equipment_requests,
-        "num_user_requests": total_user_requests,
-        "num_student_requests": total_student_requests,
-        "total_requests": total_requests,
-        "total_users": total_users,
-        "tickets_by_department": tickets_by_department
-    }
\ No newline at end of file
+def run_due_task_schedules():
+    """
+    Background job: runs every enabled schedule whose next run has come. A run missed while the
+    app was down happens once on the next check rather than once per missed day.
+    """
+    now = datetime.utcnow()
+    due = TaskSchedule.query.filter(TaskSchedule.enabled.is_(True), TaskSchedule.next_run_at <= now).all()
+    ran = 0
+    for schedule in due:
+        # Claim the run by moving next_run_at, so only one app process acts on it
+        claimed = TaskSchedule.query.filter_by(id=schedule.id, next_run_at=schedule.next_run_at).update({
+            TaskSchedule.next_run_at: _next_schedule_run(schedule.time_of_day, schedule.weekdays, now),
+            TaskSchedule.last_run_at: now
+        }, synchronize_session=False)
+        if not claimed:
+            db.session.rollback()
+            continue
+        changed_ids = _reset_tasks(schedule.category)
+        _record_task_batch('task.scheduled_reset', schedule.category, None, changed_ids, {'time_of_day': schedule.time_of_day})
+        db.session.commit()
+        ran += 1
+    return ran
+
+register_job('task_schedules', run_due_task_schedules, Config.TASK_SCHEDULE_INTERVAL_SECONDS)
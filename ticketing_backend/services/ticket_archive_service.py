@@ -0,0 +1,104 @@
+import time
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from models import db, Ticket, Comment, Attachment, ArchivedTicket, ArchivedComment, ArchivedAttachment
+from config import Config
+from utils.background import register_job
+
+HOT_TABLES = (Ticket, Comment, Attachment)
+ARCHIVE_TABLES = (ArchivedTicket, ArchivedComment, ArchivedAttachment)
+
+
+def _move_tickets(ticket_ids, source, destination, *criteria):
+    """
+    Moves tickets (with their comments and attachment rows) from the source models' tables to the
+    destination's in one transaction, keeping every id. Rows are deleted from the source first with
+    RETURNING and then inserted, so the source's write lock is held before anything is read and no
+    comment can slip in between the copy and the delete. criteria further restrict which tickets move.
+    Returns the ids of the tickets moved; the caller commits.
+
+    SQLite commits a transaction across attached databases atomically in its default rollback-journal
+    mode. Under WAL each file commits on its own, so a crash mid-commit could leave a ticket in both.
+    """
+    ticket, comment, attachment = (model.__table__ for model in source)
+    moved_tickets = db.session.execute(
+        db.delete(ticket).where(ticket.c.id.in_(ticket_ids), *criteria).returning(*ticket.c)
+    ).mappings().all()
+    if not moved_tickets:
+        return []
+    moved_ids = [row['id'] for row in moved_tickets]
+
+    comment_ids = db.select(comment.c.id).where(comment.c.ticket_id.in_(moved_ids))
+    moved_attachments = db.session.execute(
+        db.delete(attachment)
+        .where(attachment.c.ticket_id.in_(moved_ids) | attachment.c.comment_id.in_(comment_ids))
+        .returning(*attachment.c)
+    ).mappings().all()
+    moved_comments = db.session.execute(
+        db.delete(comment).where(comment.c.ticket_id.in_(moved_ids)).returning(*comment.c)
+    ).mappings().all()
+
+    for model, rows in zip(destination, (moved_tickets, moved_comments, moved_attachments)):
+        if rows:
+            db.session.execute(db.insert(model.__table__), [dict(row) for row in rows])
+    return moved_ids
+
+
+def _archive_criteria(cutoff):
+    return (
+        Ticket.closed_at < cutoff,
+        Ticket.deleted_at.is_(None),
+        db.func.coalesce(Ticket.last_activity_at, Ticket.closed_at) < cutoff,
+    )
+
+
+def _archivable_tickets(cutoff, limit):
+    # Comment and attachment ids are AUTOINCREMENT, so ids moved into the archive are never reused
+    return [
+        ticket_id for (ticket_id,) in db.session.query(Ticket.id)
+        .filter(*_archive_criteria(cutoff))
+        .order_by(Ticket.closed_at.asc())
+        .limit(limit)
+    ]
+
+
+def archive_closed_tickets(max_batches=None):
+    """
+    Archival job: moves tickets closed and idle for more than Config.TICKET_ARCHIVE_AFTER_DAYS into the
+    archive database, oldest first, Config.TICKET_ARCHIVE_BATCH_SIZE tickets per transaction. Each batch
+    holds the write lock only briefly and the job pauses between batches, so writers are never held up
+    for long. The dashboard counters and analytics rollups still count archived tickets, and the
+    duplicate index only holds open ones, so nothing else changes. Returns the number archived.
+    """
+    if Config.TICKET_ARCHIVE_AFTER_DAYS <= 0:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(days=Config.TICKET_ARCHIVE_AFTER_DAYS)
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        ticket_ids = _archivable_tickets(cutoff, Config.TICKET_ARCHIVE_BATCH_SIZE)
+        db.session.commit() # End the read so the batch below starts its own transaction
+        if not ticket_ids:
+            break
+        # The criteria are checked again under the write lock in case a ticket changed since it was picked
+        moved = _move_tickets(ticket_ids, HOT_TABLES, ARCHIVE_TABLES, *_archive_criteria(cutoff))
+        db.session.commit()
+        archived += len(moved)
+        batches += 1
+        if len(ticket_ids) < Config.TICKET_ARCHIVE_BATCH_SIZE:
+            break
+        time.sleep(Config.TICKET_ARCHIVE_BATCH_PAUSE_SECONDS)
+    return archived
+
+
+def restore_tickets(ticket_ids):
+    """Moves archived tickets back into the hot tables, e.g. before one is commented on. Returns the ids restored."""
+    try:
+        restored = _move_tickets(ticket_ids, ARCHIVE_TABLES, HOT_TABLES)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback() # An id is already taken in the hot tables; the tickets stay archived
+        return []
+    return restored
+
+
+register_job('ticket_archive', archive_closed_tickets, Config.TICKET_ARCHIVE_INTERVAL_SECONDS)
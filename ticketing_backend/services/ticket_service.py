@@ -1,8 +1,18 @@
 import os
-from datetime import datetime
-from models import db, Ticket, Comment, Attachment, User
-from utils.helpers import generate_unique_id, save_attachment
+from datetime import datetime, timedelta, timezone
+from models import db, Ticket, Comment, Attachment, User, TicketPurgeJob, ArchivedTicket, ArchivedComment, ArchivedAttachment
+from utils.helpers import generate_unique_id, save_attachment, encode_cursor, decode_cursor
+from utils.storage import get_storage
+from utils.background import register_job, wake_job
+from services.autocomplete_service import record_autocomplete_value
+from services.duplicate_service import index_ticket, unindex_ticket
+from services.assignment_service import auto_assign_ticket, adjust_open_assigned_count
+from services.audit_service import record_audit, department_category
+from services.dashboard_service import adjust_counter, count_ticket, COMMENTS, TICKETS_OPEN
+from services.analytics_service import record_ticket_opened, record_ticket_closed
+from services.ticket_archive_service import restore_tickets
 from utils.email_sender import send_email
+from utils.audit_messages import DISPLAY_TZ
 from config import Config
 from services.user_service import get_user_by_id, get_user_by_email, get_tech_admins, get_maintenance_admins, get_management_admins
 from zoneinfo import ZoneInfo
@@ -18,7 +28,10 @@ def create_ticket(title, description, location, user_id, shimmer, department, fi
         location=location,
         user_id=user_id,
         shimmer=shimmer,
-        department=department
+        department=department,
+        comment_count=0,
+        attachment_count=0,
+        last_activity_at=datetime.utcnow()
     )
     db.session.add(new_ticket)
     db.session.flush() # Get ticket_id before commit for attachment
@@ -28,8 +41,15 @@ def create_ticket(title, description, location, user_id, shimmer, department, fi
         if filename and filepath:
             attachment = Attachment(filename=filename, filepath=filepath, ticket_id=ticket_id)
             db.session.add(attachment)
+            new_ticket.attachment_count = 1
 
+    auto_assign_ticket(new_ticket)
+    count_ticket(new_ticket, 1)
+    record_ticket_opened(new_ticket)
+    record_audit('ticket.created', department_category(department), user_id, 'ticket', ticket_id, {'title': title})
     db.session.commit()
+    record_autocomplete_value('location', location)
+    index_ticket(new_ticket)
 
     # Send notifications
     creator = get_user_by_id(user_id)
@@ -54,39 +74,48 @@ def create_ticket(title, description, location, user_id, shimmer, department, fi
 
     return new_ticket
 
-def get_tickets(search_keyword=None, is_admin=False, user_id=None, department=None, include_shimmer=True, status=None, sort_by=None):
-    # Start with a base query without an immediate order_by, as sorting will be applied conditionally
-    query = Ticket.query 
+def _ticket_search_query(model, search_keyword, is_admin, user_id, department, include_shimmer, status, overdue):
+    """The filters of get_tickets applied to model (Ticket or ArchivedTicket)."""
+    query = model.query.filter(model.deleted_at.is_(None))
 
     if not is_admin:
         # Non-admins only see their own tickets and non-shimmer tickets
         query = query.filter(
-            (Ticket.user_id == user_id) | (Ticket.shimmer == False) 
+            (model.user_id == user_id) | (model.shimmer == False) 
         )
     
     if not include_shimmer and is_admin: # Admins can filter out shimmer tickets
-        query = query.filter(Ticket.shimmer == False)
+        query = query.filter(model.shimmer == False)
 
     if search_keyword:
         keyword = f"%{search_keyword.lower()}%"
         query = query.filter(
-            (Ticket.title.ilike(keyword)) |
-            (Ticket.description.ilike(keyword)) |
-            (Ticket.location.ilike(keyword)) |
-            (Ticket.creator.has(User.email.ilike(keyword))) |
-            (Ticket.department.ilike(keyword))
+            (model.title.ilike(keyword)) |
+            (model.description.ilike(keyword)) |
+            (model.location.ilike(keyword)) |
+            (model.creator.has(User.email.ilike(keyword))) |
+            (model.department.ilike(keyword))
         )
     
     if department:
-        query = query.filter(Ticket.department == department)
+        query = query.filter(model.department == department)
 
     if status:
         status_lower = status.lower()
         if status_lower == 'open':
             # Tickets are open if they don't have 'closed' in their status
-            query = query.filter(~Ticket.status.ilike('%closed%'))
+            query = query.filter(~model.status.ilike('%closed%'))
         elif status_lower == 'closed':
-            query = query.filter(Ticket.status.ilike('%closed%'))
+            query = query.filter(model.status.ilike('%closed%'))
+
+    if overdue:
+        # Breach state is recorded by the SLA sweeper (services/sla_service.py)
+        query = query.filter(model.status == 'open', model.sla_breached_at.isnot(None))
+    return query
+
+def get_tickets(search_keyword=None, is_admin=False, user_id=None, department=None, include_shimmer=True, status=None, sort_by=None, overdue=False, include_archived=False):
+    filters = (search_keyword, is_admin, user_id, department, include_shimmer, status, overdue)
+    query = _ticket_search_query(Ticket, *filters)
 
     # --- Sorting Logic ---
     if sort_by:
@@ -94,6 +123,8 @@ def get_tickets(search_keyword=None, is_admin=False, user_id=None, department=No
             query = query.order_by(Ticket.timestamp.desc())
         elif sort_by == 'date_asc':
             query = query.order_by(Ticket.timestamp.asc())
+        elif sort_by == 'activity_desc':
+            query = query.order_by(db.func.coalesce(Ticket.last_activity_at, Ticket.timestamp).desc())
         # Add other sorting options here if needed
     else:
         # Default sort if no specific sort_by is provided
@@ -101,13 +132,35 @@ def get_tickets(search_keyword=None, is_admin=False, user_id=None, department=No
 
     # Cache the results to avoid processing the query twice
     result = query.all()
+
+    # Archived tickets are all closed, so open/overdue listings never need the archive
+    if include_archived and (status or '').lower() != 'open' and not overdue:
+        archived = _ticket_search_query(ArchivedTicket, *filters).all()
+        if archived:
+            if sort_by == 'activity_desc':
+                result = sorted(result + archived, key=lambda t: t.last_activity_at or t.timestamp, reverse=True)
+            else:
+                result = sorted(result + archived, key=lambda t: t.timestamp, reverse=sort_by != 'date_asc')
     return result
 
 def get_ticket_by_id(ticket_id):
-    return Ticket.query.get(ticket_id)
+    """A live or archived ticket (check ticket.archived); write paths use _get_ticket_for_update."""
+    ticket = Ticket.query.get(ticket_id)
+    if ticket and ticket.deleted_at:
+        return None # Soft-deleted tickets are hidden while they wait to be purged
+    return ticket or ArchivedTicket.query.get(ticket_id)
+
+def _get_ticket_for_update(ticket_id):
+    """The live ticket, first moving it back out of the archive if it was archived."""
+    ticket = Ticket.query.get(ticket_id)
+    if ticket is None and restore_tickets([ticket_id]):
+        ticket = Ticket.query.get(ticket_id)
+    if ticket and ticket.deleted_at:
+        return None
+    return ticket
 
 def add_comment_to_ticket(ticket_id, user_id, comment_text, attachment_file):
-    ticket = get_ticket_by_id(ticket_id)
+    ticket = _get_ticket_for_update(ticket_id)
     if not ticket:
         return None
 
@@ -120,12 +173,22 @@ def add_comment_to_ticket(ticket_id, user_id, comment_text, attachment_file):
     db.session.add(new_comment)
     db.session.flush() # To get comment ID for attachment
 
+    added_attachments = 0
     if attachment_file:
         filename, filepath = save_attachment(attachment_file, 'comment_attachments', ticket_id, new_comment.timestamp.strftime('%Y-%m-%d %H:%M:%S'))
         if filename and filepath:
             attachment = Attachment(filename=filename, filepath=filepath, comment_id=new_comment.id)
             db.session.add(attachment)
-
+            added_attachments = 1
+
+    # Increment in SQL rather than in Python so concurrent comments don't lose updates
+    Ticket.query.filter_by(id=ticket_id).update({
+        Ticket.comment_count: Ticket.comment_count + 1,
+        Ticket.attachment_count: Ticket.attachment_count + added_attachments,
+        Ticket.last_activity_at: datetime.utcnow()
+    }, synchronize_session=False)
+    adjust_counter(COMMENTS, 1)
+    record_audit('ticket.commented', department_category(ticket.department), user_id, 'ticket', ticket_id)
     db.session.commit()
 
     # Notify ticket creator and relevant admins
@@ -157,37 +220,133 @@ def add_comment_to_ticket(ticket_id, user_id, comment_text, attachment_file):
 
     return new_comment
 
-def close_ticket(ticket_id):
-    ticket = get_ticket_by_id(ticket_id)
+def _close_if_open(ticket, status):
+    """
+    Moves a live ticket off 'open' with a conditional UPDATE and, only if this call did, takes it
+    out of the open-ticket counters. Two concurrent closes both read 'open', but only one UPDATE
+    matches once it has the write lock. Returns whether this call closed it.
+    """
+    closed_at = datetime.utcnow()
+    closed = Ticket.query.filter(Ticket.id == ticket.id, Ticket.status == 'open', Ticket.deleted_at.is_(None)).update(
+        {Ticket.status: status, Ticket.closed_at: closed_at, Ticket.last_activity_at: closed_at}, synchronize_session=False
+    )
+    if closed:
+        adjust_open_assigned_count(ticket.assignee_id, -1)
+        adjust_counter(TICKETS_OPEN, -1)
+        ticket.closed_at = ticket.last_activity_at = closed_at
+        record_ticket_closed(ticket)
+    ticket.status = status
+    return bool(closed)
+
+def close_ticket(ticket_id, user_id=None):
+    ticket = _get_ticket_for_update(ticket_id)
     if not ticket:
         return None
-    ticket.status = f"Closed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    _close_if_open(ticket, f"Closed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    record_audit('ticket.closed', department_category(ticket.department), user_id, 'ticket', ticket_id)
     db.session.commit()
+    index_ticket(ticket)
     return ticket
 
-def delete_ticket(ticket_id):
-    ticket = get_ticket_by_id(ticket_id)
+def delete_ticket(ticket_id, user_id=None):
+    ticket = _get_ticket_for_update(ticket_id)
     if not ticket:
         return False
 
-    # Delete associated attachments files
-    ticket_attachments_dir = os.path.join(Config.UPLOAD_FOLDER, 'ticket_attachments', ticket_id)
-    if os.path.exists(ticket_attachments_dir):
-        import shutil
-        shutil.rmtree(ticket_attachments_dir)
-
-    for comment in ticket.comments:
-        comment_attachments_dir = os.path.join(Config.UPLOAD_FOLDER, 'comment_attachments', ticket_id, comment.timestamp.strftime('%Y_%m_%d_%H_%M_%S'))
-        if os.path.exists(comment_attachments_dir):
-            import shutil
-            shutil.rmtree(comment_attachments_dir)
-
-    db.session.delete(ticket)
+    # Hide the ticket right away; comments, attachments and files are removed
+    # in batches by the purge job so large tickets don't block the request.
+    deleted = Ticket.query.filter(Ticket.id == ticket_id, Ticket.deleted_at.is_(None)).update(
+        {Ticket.deleted_at: datetime.utcnow()}, synchronize_session=False
+    )
+    if not deleted:
+        db.session.rollback() # Deleted by a concurrent request, which already adjusted the counters
+        return False
+    db.session.refresh(ticket) # Read under the write lock the UPDATE took, so the status is current
+    if ticket.status == 'open':
+        adjust_open_assigned_count(ticket.assignee_id, -1)
+    count_ticket(ticket, -1)
+    adjust_counter(COMMENTS, -(ticket.comment_count or 0))
+    job = TicketPurgeJob(
+        ticket_id=ticket_id,
+        comments_total=Comment.query.filter_by(ticket_id=ticket_id).count()
+    )
+    db.session.add(job)
+    record_audit('ticket.deleted', department_category(ticket.department), user_id, 'ticket', ticket_id)
+    db.session.commit()
+    unindex_ticket(ticket_id)
+    wake_job('ticket_purge')
+    return job
+
+def get_ticket_purge_job(ticket_id):
+    return TicketPurgeJob.query.filter_by(ticket_id=ticket_id).order_by(TicketPurgeJob.id.desc()).first()
+
+PURGE_BATCH_SIZE = 200
+PURGE_MAX_ATTEMPTS = 5
+PURGE_STALE_AFTER = timedelta(minutes=10) # A 'running' job untouched this long was orphaned by a crash
+
+def _purge_ticket(job):
+    ticket_id = job.ticket_id
+    while True:
+        comment_ids = [cid for (cid,) in db.session.query(Comment.id).filter_by(ticket_id=ticket_id).limit(PURGE_BATCH_SIZE)]
+        if not comment_ids:
+            break
+        Attachment.query.filter(Attachment.comment_id.in_(comment_ids)).delete(synchronize_session=False)
+        Comment.query.filter(Comment.id.in_(comment_ids)).delete(synchronize_session=False)
+        job.comments_purged += len(comment_ids)
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+
+    # Comment attachments all live below comment_attachments/<ticket_id>/, so one
+    # prefix delete covers every comment.
+    storage = get_storage()
+    storage.delete_prefix(f"ticket_attachments/{ticket_id}/")
+    storage.delete_prefix(f"comment_attachments/{ticket_id}/")
+
+    Attachment.query.filter_by(ticket_id=ticket_id).delete(synchronize_session=False)
+    Ticket.query.filter_by(id=ticket_id).delete(synchronize_session=False)
     db.session.commit()
-    return True
 
-def assign_ticket(ticket_id, assignee_email):
-    ticket = get_ticket_by_id(ticket_id)
+def purge_deleted_tickets(max_jobs=10):
+    """Runs pending ticket purge jobs. Returns the number of jobs that finished."""
+    now = datetime.utcnow()
+    jobs = TicketPurgeJob.query.filter(
+        ((TicketPurgeJob.status == 'pending') & (TicketPurgeJob.next_attempt_at <= now)) |
+        ((TicketPurgeJob.status == 'running') & (TicketPurgeJob.updated_at < now - PURGE_STALE_AFTER))
+    ).order_by(TicketPurgeJob.id.asc()).limit(max_jobs).all()
+
+    finished = 0
+    for job in jobs:
+        # Claim the job with a conditional UPDATE so two app nodes never purge the same ticket
+        claimed = TicketPurgeJob.query.filter_by(id=job.id, status=job.status, updated_at=job.updated_at).update(
+            {'status': 'running', 'updated_at': now}, synchronize_session=False
+        )
+        db.session.commit()
+        if not claimed:
+            continue
+
+        db.session.refresh(job)
+        try:
+            _purge_ticket(job)
+            job.status = 'done'
+            job.last_error = None
+            finished += 1
+        except Exception as e:
+            db.session.rollback()
+            job.attempts += 1
+            job.last_error = str(e)
+            if job.attempts >= PURGE_MAX_ATTEMPTS:
+                job.status = 'failed'
+            else:
+                job.status = 'pending'
+                job.next_attempt_at = datetime.utcnow() + timedelta(seconds=30 * 2 ** job.attempts)
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+    return finished
+
+register_job('ticket_purge', purge_deleted_tickets, Config.TICKET_PURGE_INTERVAL_SECONDS)
+
+def assign_ticket(ticket_id, assignee_email, user_id=None):
+    ticket = _get_ticket_for_update(ticket_id)
     if not ticket:
         return None, "Ticket not found."
     
@@ -195,18 +354,249 @@ def assign_ticket(ticket_id, assignee_email):
     if not assignee_user:
         return None, "Assignee user not found."
 
+    def reassign_if_open(previous_assignee_id):
+        return Ticket.query.filter(
+            Ticket.id == ticket_id, Ticket.status == 'open', Ticket.deleted_at.is_(None),
+            Ticket.assignee_id.is_(None) if previous_assignee_id is None else Ticket.assignee_id == previous_assignee_id
+        ).update({Ticket.assignee_id: assignee_user.id}, synchronize_session=False)
+
+    previous_assignee_id = ticket.assignee_id
+    moved = reassign_if_open(previous_assignee_id)
+    if not moved:
+        # Closed or reassigned since it was read; the UPDATE took the write lock, so this read is current
+        db.session.refresh(ticket)
+        previous_assignee_id = ticket.assignee_id
+        moved = reassign_if_open(previous_assignee_id)
+    if moved and previous_assignee_id != assignee_user.id:
+        adjust_open_assigned_count(previous_assignee_id, -1)
+        adjust_open_assigned_count(assignee_user.id, 1)
     ticket.assignee_id = assignee_user.id
+    # Assignment leaves last_activity_at alone; reconcile_ticket_counters rebuilds it from comments and closing
+    assignee_user.last_assigned_at = datetime.utcnow()
+    record_audit('ticket.assigned', department_category(ticket.department), user_id, 'ticket', ticket_id, {'assignee': assignee_user.email})
     db.session.commit()
     return ticket, None
 
+def _merged_attachment_key(key, duplicate_id, target_id):
+    """Storage key for a duplicate's file once it belongs to the target, so the target's purge removes it."""
+    for folder in ("ticket_attachments", "comment_attachments"):
+        prefix = f"{folder}/{duplicate_id}/"
+        if key.startswith(prefix):
+            return f"{folder}/{target_id}/merged-{duplicate_id}/{key[len(prefix):]}"
+    return key # Legacy absolute paths stay where they are
+
+def merge_tickets(target_id, duplicate_ids, user_id):
+    """
+    Folds duplicate tickets into target_id. Each duplicate's description becomes a comment on
+    the target, its comments and attachments move over, and it is closed with merged_into_id
+    set and a note pointing at the target. Returns (target, error).
+    """
+    target = _get_ticket_for_update(target_id)
+    if not target:
+        return None, "Ticket not found."
+    if target.merged_into_id:
+        return None, f"Ticket {target_id} was itself merged into {target.merged_into_id}."
+
+    duplicate_ids = [ticket_id for ticket_id in dict.fromkeys(duplicate_ids or []) if ticket_id != target_id]
+    if not duplicate_ids:
+        return None, "No duplicate tickets given."
+    duplicates = Ticket.query.filter(Ticket.id.in_(duplicate_ids), Ticket.deleted_at.is_(None)).all()
+    missing = set(duplicate_ids) - {ticket.id for ticket in duplicates}
+    if missing:
+        return None, f"Ticket(s) not found: {', '.join(sorted(missing))}."
+    already_merged = [ticket.id for ticket in duplicates if ticket.merged_into_id]
+    if already_merged:
+        return None, f"Ticket(s) already merged: {', '.join(already_merged)}."
+
+    storage = get_storage()
+    copied_keys = [] # Old keys, deleted once the database points at the copies
+    now_local = datetime.now(ZoneInfo("America/Indiana/Indianapolis"))
+    added_comments = added_attachments = 0
+
+    for duplicate in duplicates:
+        comment_ids = db.session.query(Comment.id).filter(Comment.ticket_id == duplicate.id)
+        attachments = Attachment.query.filter(
+            (Attachment.ticket_id == duplicate.id) | Attachment.comment_id.in_(comment_ids)
+        ).all()
+        for attachment in attachments:
+            new_key = _merged_attachment_key(attachment.filepath, duplicate.id, target_id)
+            if new_key != attachment.filepath and storage.exists(attachment.filepath):
+                source = storage.open(attachment.filepath)
+                try:
+                    storage.save(new_key, source)
+                finally:
+                    source.close()
+                copied_keys.append(attachment.filepath)
+            attachment.filepath = new_key
+            if attachment.ticket_id == duplicate.id:
+                attachment.ticket_id = target_id
+
+        db.session.add(Comment(
+            ticket_id=target_id,
+            user_id=duplicate.user_id,
+            text=f"[Merged from ticket {duplicate.id}] {duplicate.title}\n{duplicate.description}",
+            timestamp=duplicate.timestamp
+        ))
+        Comment.query.filter_by(ticket_id=duplicate.id).update({Comment.ticket_id: target_id}, synchronize_session=False)
+        added_comments += (duplicate.comment_count or 0) + 1
+        added_attachments += duplicate.attachment_count or 0
+
+        db.session.add(Comment(ticket_id=duplicate.id, user_id=user_id, text=f"Merged into ticket {target_id}.", timestamp=now_local))
+        _close_if_open(duplicate, f"Closed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        duplicate.merged_into_id = target_id
+        duplicate.comment_count = 1
+        duplicate.attachment_count = 0
+        duplicate.last_activity_at = datetime.utcnow()
+
+    Ticket.query.filter_by(id=target_id).update({
+        Ticket.comment_count: Ticket.comment_count + added_comments,
+        Ticket.attachment_count: Ticket.attachment_count + added_attachments,
+        Ticket.last_activity_at: datetime.utcnow()
+    }, synchronize_session=False)
+    adjust_counter(COMMENTS, 2 * len(duplicates)) # The description copied to the target and the note left on the duplicate
+    record_audit('ticket.merged', department_category(target.department), user_id, 'ticket', target_id, {
+        'duplicate_ids': ', '.join(duplicate.id for duplicate in duplicates)
+    })
+    db.session.commit()
+
+    for key in copied_keys:
+        storage.delete(key)
+    for duplicate in duplicates:
+        unindex_ticket(duplicate.id)
+        if duplicate.creator:
+            send_email(
+                duplicate.creator.email,
+                "Your Ticket Was Merged",
+                f"Your ticket {duplicate.id} ({duplicate.title}) reports the same problem as ticket {target_id} "
+                f"({target.title}) and has been merged into it. Updates will be posted on ticket {target_id}.\n\n"
+                "This is an automated message. Do not reply to this email."
+            )
+
+    db.session.refresh(target)
+    return target, None
+
 def get_ticket_comments(ticket_id):
     ticket = get_ticket_by_id(ticket_id)
     if not ticket:
         return []
-    return Comment.query.filter_by(ticket_id=ticket_id).order_by(Comment.timestamp.asc()).all()
+    model = ArchivedComment if ticket.archived else Comment
+    return model.query.filter_by(ticket_id=ticket_id).order_by(model.timestamp.asc()).all()
+
+COMMENTS_PAGE_SIZE = 20
+
+def get_ticket_comments_page(ticket_id, cursor=None, limit=COMMENTS_PAGE_SIZE, order='desc', archived=False):
+    """
+    Returns (comments, next_cursor) for one page of a ticket's comments, newest
+    first ('desc') or oldest first ('asc'). next_cursor is None on the last page.
+    Pass archived=ticket.archived for archived tickets. Raises ValueError for a malformed cursor.
+    """
+    model = ArchivedComment if archived else Comment
+    query = model.query.filter(model.ticket_id == ticket_id)
+
+    if cursor:
+        values = decode_cursor(cursor)
+        if not values or len(values) != 2:
+            raise ValueError("Invalid cursor.")
+        try:
+            cursor_timestamp, cursor_id = datetime.fromisoformat(values[0]), int(values[1])
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor.")
+        # Keyset condition on (timestamp, id); id breaks ties between equal timestamps
+        if order == 'asc':
+            query = query.filter(
+                (model.timestamp > cursor_timestamp) |
+                ((model.timestamp == cursor_timestamp) & (model.id > cursor_id))
+            )
+        else:
+            query = query.filter(
+                (model.timestamp < cursor_timestamp) |
+                ((model.timestamp == cursor_timestamp) & (model.id < cursor_id))
+            )
+
+    if order == 'asc':
+        query = query.order_by(model.timestamp.asc(), model.id.asc())
+    else:
+        query = query.order_by(model.timestamp.desc(), model.id.desc())
+
+    # Fetch one extra row to know whether another page exists
+    comments = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(comments) > limit:
+        comments = comments[:limit]
+        next_cursor = encode_cursor(comments[-1].timestamp, comments[-1].id)
+    return comments, next_cursor
 
 def get_total_comments_for_ticket(ticket_id):
-    return Comment.query.filter_by(ticket_id=ticket_id).count()
+    ticket = get_ticket_by_id(ticket_id)
+    return ticket.comment_count if ticket else 0
+
+def _local_to_utc(moment):
+    """A naive Indianapolis wall-clock time (how comment timestamps are stored) as naive UTC."""
+    return moment.replace(tzinfo=DISPLAY_TZ).astimezone(timezone.utc).replace(tzinfo=None)
+
+def reconcile_ticket_counters():
+    """Recomputes the denormalized ticket counters from comment/attachment rows. Returns rows updated."""
+    comment_count = (
+        db.select(db.func.count(Comment.id))
+        .where(Comment.ticket_id == Ticket.id)
+        .scalar_subquery()
+    )
+    ticket_attachment_count = (
+        db.select(db.func.count(Attachment.id))
+        .where(Attachment.ticket_id == Ticket.id)
+        .scalar_subquery()
+    )
+    comment_attachment_count = (
+        db.select(db.func.count(Attachment.id))
+        .join(Comment, Attachment.comment_id == Comment.id)
+        .where(Comment.ticket_id == Ticket.id)
+        .scalar_subquery()
+    )
+    # One set-based UPDATE with correlated subqueries instead of a pass over every ticket
+    result = db.session.execute(
+        db.update(Ticket).values(
+            comment_count=comment_count,
+            attachment_count=ticket_attachment_count + comment_attachment_count
+        )
+    )
+
+    # Last activity is the latest of creation, closing and the newest comment. Comment timestamps are
+    # Indianapolis wall time and the others UTC; SQLite can't convert across DST, so compare in Python.
+    last_comment_at = dict(
+        db.session.query(Comment.ticket_id, db.func.max(Comment.timestamp)).group_by(Comment.ticket_id)
+    )
+    changed = []
+    ticket_rows = db.session.query(Ticket.id, Ticket.timestamp, Ticket.closed_at, Ticket.last_activity_at).yield_per(1000)
+    for ticket_id, created_at, closed_at, last_activity_at in ticket_rows:
+        candidates = [moment for moment in (created_at, closed_at) if moment]
+        if ticket_id in last_comment_at:
+            candidates.append(_local_to_utc(last_comment_at[ticket_id]))
+        latest = max(candidates, default=None)
+        if latest != last_activity_at:
+            changed.append({'id': ticket_id, 'last_activity_at': latest})
+    for start in range(0, len(changed), 500):
+        db.session.execute(db.update(Ticket), changed[start:start + 500])
+    db.session.commit()
+    return result.rowcount
 
 def get_attachment_by_id(attachment_id):
-    return Attachment.query.get(attachment_id)
\ No newline at end of file
+    return Attachment.query.get(attachment_id) or ArchivedAttachment.query.get(attachment_id)
+
+def iter_ticket_attachments(ticket_id, archived=False):
+    """Yields (archive_name, attachment) pairs for a ticket's own and comment attachments."""
+    attachment_model, comment_model = (ArchivedAttachment, ArchivedComment) if archived else (Attachment, Comment)
+    attachments = (
+        attachment_model.query.outerjoin(comment_model, attachment_model.comment_id == comment_model.id)
+        .filter((attachment_model.ticket_id == ticket_id) | (comment_model.ticket_id == ticket_id))
+        .order_by(attachment_model.comment_id.isnot(None), attachment_model.timestamp.asc(), attachment_model.id.asc())
+    )
+    seen_names = set()
+    for attachment in attachments.yield_per(100):
+        if attachment.comment_id:
+            archive_name = f"{ticket_id}/comments/{attachment.comment_id}/{attachment.filename}"
+        else:
+            archive_name = f"{ticket_id}/{attachment.filename}"
+        if archive_name in seen_names:
+            archive_name = f"{os.path.dirname(archive_name)}/{attachment.id}_{attachment.filename}"
+        seen_names.add(archive_name)
+        yield archive_name, attachment
\ No newline at end of file
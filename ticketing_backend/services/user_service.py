@@ -1,6 +1,8 @@
 from models import db, User
 from config import Config
 from werkzeug.security import generate_password_hash
+from services.autocomplete_service import forget_autocomplete_value
+from services.dashboard_service import adjust_counter, USERS
 
 
 def get_user_by_id(user_id):
@@ -95,7 +97,9 @@ def delete_user_by_email(user_email, current_admin_email):
         return None, "Cannot alter the architect of the system!"
 
     db.session.delete(user)
+    adjust_counter(USERS, -1)
     db.session.commit()
+    forget_autocomplete_value("user", user.email)
     return True, None
 
 
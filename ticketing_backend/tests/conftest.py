@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Tests import the backend modules the way app.py does, from the backend folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config reads the environment at import, so this has to happen before anything imports it
+_database_dir = tempfile.mkdtemp(prefix="ticketing-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir, 'tickets.db')}"
+os.environ["BACKGROUND_JOBS_ENABLED"] = "false"
+os.environ.setdefault("SUPER_ADMIN_EMAIL", "admin@example.com")
+os.environ.setdefault("LICENSE_EXPIRATION_URL", "http://127.0.0.1:9/")
+os.environ.setdefault("LICENSE_EXPIRATION_DEFAULT", "2099-01-01")
+for _name in ("SYSTEM_EMAIL_NAME", "SYSTEM_EMAIL_PASSWORD"):
+    os.environ[_name] = "" # No email is sent from tests
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import app as flask_app
+    from database import db, upgrade_schema
+
+    with flask_app.app_context():
+        db.create_all()
+        upgrade_schema()
+    return flask_app
+
+
+@pytest.fixture
+def user(app):
+    """A fresh user to own test records."""
+    from models import db, User
+
+    with app.app_context():
+        new_user = User(email=f"user{User.query.count() + 1}@example.com", role="admin", associations="IT")
+        new_user.set_password("password")
+        db.session.add(new_user)
+        db.session.commit()
+        return new_user.id
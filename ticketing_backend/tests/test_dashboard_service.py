@@ -0,0 +1,40 @@
+import threading
+
+from sqlalchemy import event
+
+from models import db, DashboardCounter, User
+from services.dashboard_service import adjust_counter, reconcile_dashboard_counters, USERS
+
+
+def _add_user(app, email):
+    with app.app_context():
+        new_user = User(email=email, role="user", associations="IT")
+        new_user.set_password("password")
+        db.session.add(new_user)
+        adjust_counter(USERS, 1)
+        db.session.commit()
+        db.session.remove()
+
+
+def test_signup_during_reconcile_is_not_lost(app):
+    writers = []
+
+    def add_user_after_counting(conn, cursor, statement, parameters, context, executemany):
+        # A signup arrives after the users were counted; it must wait rather than be overwritten
+        if not writers and statement.startswith("SELECT") and "FROM dashboard_counter" in statement:
+            writer = threading.Thread(target=_add_user, args=(app, "during-reconcile@example.com"))
+            writers.append(writer)
+            writer.start()
+            writer.join(timeout=0.5)
+
+    with app.app_context():
+        reconcile_dashboard_counters()
+        event.listen(db.engine, "before_cursor_execute", add_user_after_counting)
+        try:
+            reconcile_dashboard_counters()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", add_user_after_counting)
+        writers[0].join()
+
+        db.session.expire_all()
+        assert db.session.get(DashboardCounter, USERS).value == User.query.count()
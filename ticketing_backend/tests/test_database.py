@@ -0,0 +1,36 @@
+from sqlalchemy import text
+
+from database import db, upgrade_schema
+from models import Comment, ArchivedComment
+
+
+def _table_sql(conn, name):
+    return conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': name}).scalar()
+
+
+def test_upgrade_rebuilds_comment_table_as_autoincrement(app):
+    with app.app_context():
+        with db.engine.begin() as conn:
+            # Put back the comment table as databases created before AUTOINCREMENT have it
+            legacy_sql = _table_sql(conn, 'comment').replace(' PRIMARY KEY AUTOINCREMENT', ' PRIMARY KEY')
+            conn.execute(text('DROP TABLE comment'))
+            conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'comment'"))
+            conn.execute(text(legacy_sql))
+            conn.execute(text("INSERT INTO comment (id, ticket_id, user_id, text) VALUES (5, 'legacy', 1, 'kept')"))
+            conn.execute(db.insert(ArchivedComment.__table__).values(id=40, ticket_id='legacy', user_id=1, text='archived'))
+
+        upgrade_schema()
+
+        with db.engine.connect() as conn:
+            assert 'AUTOINCREMENT' in _table_sql(conn, 'comment')
+            assert conn.execute(text("SELECT name FROM sqlite_master WHERE name = 'ix_comment_ticket_timestamp'")).scalar()
+        assert db.session.get(Comment, 5).text == 'kept'
+        # New ids continue after the archived comment's, which the old table would have handed out again
+        comment = Comment(ticket_id='legacy', user_id=1, text='new')
+        db.session.add(comment)
+        db.session.commit()
+        assert comment.id == 41
+
+        Comment.query.filter_by(ticket_id='legacy').delete()
+        ArchivedComment.query.filter_by(ticket_id='legacy').delete()
+        db.session.commit()
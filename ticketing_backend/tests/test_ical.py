@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from utils.ical import CALENDAR_TZID, build_calendar, build_event
+
+
+def test_calendar_defines_the_timezone_its_events_use():
+    event = build_event("1@test", "Projector", datetime(2030, 7, 1, 9, 30), end=datetime(2030, 7, 1, 11))
+    calendar = build_calendar("Bookings", [event])
+    lines = calendar.split("\r\n")
+
+    assert f"DTSTART;TZID={CALENDAR_TZID}:20300701T093000" in lines
+    assert lines.index(f"TZID:{CALENDAR_TZID}") < lines.index("BEGIN:VEVENT")
+
+
+def test_timezone_offsets_match_the_zone():
+    zone = ZoneInfo(CALENDAR_TZID)
+    assert datetime(2030, 1, 15, tzinfo=zone).utcoffset() == timedelta(hours=-5)
+    assert datetime(2030, 7, 15, tzinfo=zone).utcoffset() == timedelta(hours=-4)
+    calendar = build_calendar("Bookings", [])
+    assert "TZOFFSETTO:-0500\r\nTZNAME:EST" in calendar
+    assert "TZOFFSETTO:-0400\r\nTZNAME:EDT" in calendar
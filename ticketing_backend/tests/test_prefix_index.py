@@ -0,0 +1,40 @@
+import random
+
+from utils.prefix_index import PrefixIndex
+
+
+def _brute_force(index, prefix, limit):
+    matches = {
+        value for suffix, value in index._keys if suffix.startswith(prefix)
+    }
+    ranked = sorted(matches, key=lambda value: (-index._entries[value][1], value))[:limit]
+    return [(index._entries[value][0], index._entries[value][1]) for value in ranked]
+
+
+def test_short_prefix_rankings_match_a_full_scan():
+    rng = random.Random(7)
+    words = ["gym", "room", "lab", "rear", "main", "art", "ramp", "office", "rm", "g"]
+    values = [" ".join(rng.sample(words, rng.randint(1, 3))) + f" {n}" for n in range(400)]
+    index = PrefixIndex()
+    for _ in range(6000):
+        value = rng.choice(values)
+        if rng.random() < 0.35:
+            index.remove(value, rng.randint(1, 3))
+        else:
+            index.add(value, rng.randint(1, 3))
+
+    for prefix in ["", "r", "g", "ra", "rm", "ma", "1", "12", "zz"]:
+        for limit in (1, 10, PrefixIndex.TOP_LIMIT):
+            assert index.search(prefix, limit) == _brute_force(index, prefix, limit), (prefix, limit)
+    # Longer prefixes and larger limits still scan
+    assert index.search("room", 5) == _brute_force(index, "room", 5)
+    assert index.search("", 80) == _brute_force(index, "", 80)
+
+
+def test_word_starts_match():
+    index = PrefixIndex()
+    index.add("Main Gym", 3)
+    index.add("Gym", 1)
+    assert index.search("gy") == [("Main Gym", 3), ("Gym", 1)]
+    index.remove("Main Gym", 3)
+    assert index.search("g") == [("Gym", 1)]
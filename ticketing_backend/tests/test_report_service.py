@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+from config import Config
+from models import db, DepartmentReport
+import services.report_service as report_service
+
+
+def _report(period_start, status, claimed_at, department="IT"):
+    row = DepartmentReport(
+        department=department, period="weekly", period_start=period_start, period_end=period_start + timedelta(days=7),
+        status=status, claimed_at=claimed_at
+    )
+    db.session.add(row)
+    db.session.commit()
+    return row
+
+
+def test_expired_claim_is_taken_over_once(app):
+    period_start = datetime(2030, 1, 7).date()
+    with app.app_context():
+        stale = _report(period_start, "generating", datetime.utcnow() - timedelta(seconds=Config.REPORTS_CLAIM_TIMEOUT_SECONDS + 60))
+        fresh = _report(period_start, "generating", datetime.utcnow(), department="Maintenance")
+
+        claim = report_service._claim_report("IT", "weekly", period_start, stale.period_end, regenerate=False)
+        assert claim is not None and claim.id == stale.id
+        assert claim.claimed_at > datetime.utcnow() - timedelta(minutes=1)
+        # The takeover refreshed the claim, so nobody else gets it now
+        assert report_service._claim_report("IT", "weekly", period_start, stale.period_end, regenerate=False) is None
+        assert report_service._claim_report("Maintenance", "weekly", period_start, fresh.period_end, regenerate=True) is None
+
+
+def test_due_reports_retry_abandoned_generation(app, monkeypatch):
+    period_start, _ = report_service.last_finished_period("weekly")
+    generated = []
+    monkeypatch.setattr(Config, "REPORTS_OFFPEAK_START_HOUR", 0)
+    monkeypatch.setattr(Config, "REPORTS_OFFPEAK_END_HOUR", 24)
+    monkeypatch.setattr(report_service, "REPORT_PERIODS", ["weekly"])
+    monkeypatch.setattr(report_service, "generate_report", lambda department, period: generated.append(department) or (None, None))
+    with app.app_context():
+        _report(period_start, "ready", datetime.utcnow(), department="IT")
+        _report(period_start, "generating", datetime.utcnow(), department="Maintenance")
+        _report(period_start, "generating", None, department="Management") # Claimed before claims were timestamped
+
+        report_service.generate_due_reports()
+        assert generated == ["Management"]
@@ -0,0 +1,114 @@
+import threading
+from datetime import date
+
+from models import db, EquipmentItem, EquipmentRequest, EquipmentReservation, StudentRequest
+from services.request_service import approve_equipment_request
+from utils.helpers import generate_unique_id
+
+
+def _equipment_request(user_id, start_time, end_time, equipment):
+    request = EquipmentRequest(
+        id=generate_unique_id(), name="Teacher", event="Assembly", date=date(2030, 5, 1), time=start_time,
+        location="Gym", equipment=equipment, description="", return_date=date(2030, 5, 1), return_time=end_time,
+        user_id=user_id, status="open", approval_status="pending"
+    )
+    db.session.add(request)
+    return request
+
+
+def test_concurrent_approvals_cannot_double_book(app, user):
+    with app.app_context():
+        item = EquipmentItem(name="Concurrency Projector", category="Projector", active=True)
+        db.session.add(item)
+        first = _equipment_request(user, "10:00", "12:00", "Concurrency Projector")
+        second = _equipment_request(user, "11:00", "13:00", "Concurrency Projector")
+        db.session.commit()
+        item_id, request_ids = item.id, [first.id, second.id]
+
+    barrier = threading.Barrier(len(request_ids))
+    errors = {}
+
+    def approve(request_id):
+        with app.app_context():
+            barrier.wait()
+            _, errors[request_id] = approve_equipment_request(request_id, [item_id], user)
+            db.session.remove()
+
+    threads = [threading.Thread(target=approve, args=(request_id,)) for request_id in request_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(error is None for error in errors.values()) == [False, True]
+    assert "Equipment conflict" in next(error for error in errors.values() if error)
+    with app.app_context():
+        assert EquipmentReservation.query.filter_by(equipment_item_id=item_id).count() == 1
+
+
+def test_rejected_reapproval_keeps_earlier_booking(app, user):
+    with app.app_context():
+        item = EquipmentItem(name="Reapproval Speaker", category="Speaker", active=True)
+        db.session.add(item)
+        booked = _equipment_request(user, "09:00", "11:00", "Reapproval Speaker")
+        other = _equipment_request(user, "13:00", "15:00", "Reapproval Speaker")
+        db.session.commit()
+        assert approve_equipment_request(booked.id, [item.id], user)[1] is None
+        assert approve_equipment_request(other.id, [item.id], user)[1] is None
+
+        # Moving the first booking onto the second one's slot fails and leaves it as it was
+        booked.time, booked.return_time = "14:00", "16:00"
+        db.session.commit()
+        _, error = approve_equipment_request(booked.id, [item.id], user)
+        assert error and "Equipment conflict" in error
+        assert EquipmentReservation.query.filter_by(equipment_request_id=booked.id).count() == 1
+
+
+def _student_rows(count):
+    return [{'fname': f'Student{n}', 'lname': 'Import', 'grade': '5', 'teacher': 'Ms. Rivera'} for n in range(count)]
+
+
+def test_imported_ids_do_not_collide_with_new_requests(app, user):
+    from services.request_service import import_student_requests, create_student_request
+
+    with app.app_context():
+        report = import_student_requests(_student_rows(300), user)
+        assert report['created'] == 300
+        assert all('-' in row['id'] for row in report['rows'])
+        # Previously imported IDs were the next 300 microsecond timestamps
+        request = create_student_request('New', 'Student', '5', 'Ms. Rivera', '', user)
+        assert request.id.isdigit()
+
+
+def test_import_reports_a_batch_that_cannot_be_saved(app, user, monkeypatch):
+    import services.request_service as request_service
+
+    monkeypatch.setattr(request_service, 'STUDENT_IMPORT_BATCH_SIZE', 2)
+    monkeypatch.setattr(request_service, 'generate_unique_id', lambda: '1000')
+    with app.app_context():
+        db.session.add(StudentRequest(id='1000-3', fname='Taken', lname='Id', grade='5', teacher='T', description='', user_id=user))
+        db.session.commit()
+
+        report = request_service.import_student_requests(_student_rows(5), user, partial=True)
+        assert report['created'] == 3 and report['failed'] == 2
+        assert [row['status'] for row in report['rows']] == ['created', 'created', 'error', 'error', 'created']
+        assert StudentRequest.query.filter(StudentRequest.id.like('1000-%')).count() == 4
+
+
+def test_checklist_update_handles_large_batches(app, user):
+    from services.request_service import import_student_requests, update_student_checklists
+
+    with app.app_context():
+        ids = [row['id'] for row in import_student_requests(_student_rows(1500), user)['rows']]
+        # Half pin the version they read, half don't; each used to be its own OR term
+        students = [{'id': student_id, 'version': 0 if n % 2 else None} for n, student_id in enumerate(ids)]
+        updated, error, _ = update_student_checklists(students, {'bag_created': True})
+        assert error is None and len(updated) == 1500
+        assert all(request.bag_created and request.version == 1 for request in updated)
+
+        # One stale version rolls the whole batch back
+        students = [{'id': student_id, 'version': 1} for student_id in ids]
+        students[-1]['version'] = 0
+        updated, error, stale_ids = update_student_checklists(students, {'bag_created': False})
+        assert updated is None and stale_ids == [ids[-1]]
+        assert all(request.bag_created for request in StudentRequest.query.filter(StudentRequest.id.in_(ids[:500])))
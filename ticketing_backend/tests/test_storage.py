@@ -0,0 +1,72 @@
+import io
+
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+
+from utils.storage import S3Storage
+
+BUCKET = "attachments"
+PART_SIZE = 5 * 1024 * 1024 # The smallest part S3 accepts
+
+
+@pytest.fixture
+def s3_client():
+    with moto.mock_aws():
+        client = boto3.client(
+            "s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+        )
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def storage(s3_client):
+    return S3Storage(BUCKET, prefix="tickets/", client=s3_client, multipart_threshold=PART_SIZE, max_concurrency=2)
+
+
+def test_save_open_and_exists(storage, s3_client):
+    storage.save("ticket_attachments/1/a.txt", io.BytesIO(b"hello"))
+
+    assert storage.exists("ticket_attachments/1/a.txt")
+    assert not storage.exists("ticket_attachments/1/missing.txt")
+    with storage.open("ticket_attachments/1/a.txt") as source:
+        assert source.read() == b"hello"
+    assert b"".join(storage.iter_chunks("ticket_attachments/1/a.txt", chunk_size=2)) == b"hello"
+    # Keys live under the configured prefix
+    s3_client.head_object(Bucket=BUCKET, Key="tickets/ticket_attachments/1/a.txt")
+
+
+def test_delete_and_delete_prefix(storage):
+    for key in ("comment_attachments/1/a.txt", "comment_attachments/1/b.txt", "comment_attachments/10/c.txt"):
+        storage.save(key, io.BytesIO(b"x"))
+
+    storage.delete_prefix("comment_attachments/1/")
+    assert not storage.exists("comment_attachments/1/a.txt")
+    assert not storage.exists("comment_attachments/1/b.txt")
+    assert storage.exists("comment_attachments/10/c.txt")
+
+    storage.delete("comment_attachments/10/c.txt")
+    assert not storage.exists("comment_attachments/10/c.txt")
+
+
+def test_large_upload_is_multipart(storage, s3_client):
+    data = bytes(range(256)) * (PART_SIZE * 2 // 256 + 1)
+    storage.save("ticket_attachments/2/big.bin", io.BytesIO(data))
+
+    head = s3_client.head_object(Bucket=BUCKET, Key="tickets/ticket_attachments/2/big.bin")
+    assert head["ETag"].strip('"').endswith("-3") # A multipart ETag ends in -<part count>
+    assert b"".join(storage.iter_chunks("ticket_attachments/2/big.bin")) == data
+
+
+def test_exists_raises_on_errors_other_than_missing(storage, s3_client):
+    with Stubber(s3_client) as stubber:
+        stubber.add_client_error("head_object", service_error_code="403", http_status_code=403)
+        with pytest.raises(ClientError):
+            storage.exists("ticket_attachments/1/a.txt")
+
+        stubber.add_client_error("head_object", service_error_code="404", http_status_code=404)
+        assert not storage.exists("ticket_attachments/1/a.txt")
@@ -0,0 +1,72 @@
+import threading
+
+from models import db, DashboardCounter, Ticket, User
+from services.dashboard_service import reconcile_dashboard_counters, TICKETS_OPEN
+from services.ticket_service import assign_ticket, close_ticket, delete_ticket, reconcile_ticket_counters
+from utils.helpers import generate_unique_id
+
+
+def _open_assigned_ticket(user_id):
+    ticket = Ticket(
+        id=generate_unique_id(), title="Printer jam", description="", location="Office", user_id=user_id,
+        assignee_id=user_id, department="IT", status="open"
+    )
+    db.session.add(ticket)
+    User.query.filter_by(id=user_id).update({User.open_assigned_count: 1})
+    db.session.commit()
+    reconcile_dashboard_counters()
+    return ticket.id
+
+
+def _run_concurrently(app, *calls):
+    barrier = threading.Barrier(len(calls))
+
+    def run(call):
+        with app.app_context():
+            barrier.wait()
+            call()
+            db.session.remove()
+
+    threads = [threading.Thread(target=run, args=(call,)) for call in calls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_closes_count_once(app, user):
+    with app.app_context():
+        ticket_id = _open_assigned_ticket(user)
+        open_before = db.session.get(DashboardCounter, TICKETS_OPEN).value
+
+    _run_concurrently(app, lambda: close_ticket(ticket_id, user), lambda: close_ticket(ticket_id, user))
+
+    with app.app_context():
+        assert db.session.get(User, user).open_assigned_count == 0
+        assert db.session.get(DashboardCounter, TICKETS_OPEN).value == open_before - 1
+
+
+def test_close_and_delete_at_once_count_once(app, user):
+    with app.app_context():
+        ticket_id = _open_assigned_ticket(user)
+        open_before = db.session.get(DashboardCounter, TICKETS_OPEN).value
+
+    _run_concurrently(app, lambda: close_ticket(ticket_id, user), lambda: delete_ticket(ticket_id, user))
+
+    with app.app_context():
+        assert db.session.get(User, user).open_assigned_count == 0
+        assert db.session.get(DashboardCounter, TICKETS_OPEN).value == open_before - 1
+
+
+def test_reconcile_keeps_last_activity_after_assigning_and_closing(app, user):
+    with app.app_context():
+        ticket_id = _open_assigned_ticket(user)
+        reconcile_ticket_counters()
+        assert assign_ticket(ticket_id, db.session.get(User, user).email, user)[1] is None
+        close_ticket(ticket_id, user)
+        close_ticket(ticket_id, user) # Closing again changes the status text, not the activity
+        before = db.session.get(Ticket, ticket_id).last_activity_at
+
+        reconcile_ticket_counters()
+        db.session.expire_all()
+        assert db.session.get(Ticket, ticket_id).last_activity_at == before == db.session.get(Ticket, ticket_id).closed_at
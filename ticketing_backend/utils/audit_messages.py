@@ -0,0 +1,55 @@
+import json
+from zoneinfo import ZoneInfo
+
+DISPLAY_TZ = ZoneInfo("America/Indiana/Indianapolis")
+
+# action -> message template. Placeholders: {actor}, {time}, {entity_id} and any key in the event's details.
+AUDIT_MESSAGES = {
+    'task.added': "Task '{title}' added at {time} by {actor}",
+    'task.completed': "Task '{title}' completed at {time} by {actor}",
+    'task.reset': "Task '{title}' reset at {time} by {actor}",
+    'task.deleted': "Task '{title}' deleted at {time} by {actor}",
+    'task.batch_completed': "{count} task(s) completed at {time} by {actor}",
+    'task.batch_reset': "{count} task(s) reset at {time} by {actor}",
+    'task.batch_deleted': "{count} task(s) deleted at {time} by {actor}",
+    'task.scheduled_reset': "{count} task(s) reset at {time} by the {time_of_day} schedule",
+    'ticket.created': "Ticket {entity_id} '{title}' created at {time} by {actor}",
+    'ticket.commented': "Comment added to ticket {entity_id} at {time} by {actor}",
+    'ticket.assigned': "Ticket {entity_id} assigned to {assignee} at {time} by {actor}",
+    'ticket.closed': "Ticket {entity_id} closed at {time} by {actor}",
+    'ticket.deleted': "Ticket {entity_id} deleted at {time} by {actor}",
+    'ticket.merged': "Ticket(s) {duplicate_ids} merged into ticket {entity_id} at {time} by {actor}",
+    'equipment_request.created': "Equipment request {entity_id} for {equipment} created at {time} by {actor}",
+    'equipment_request.approved': "Equipment request {entity_id} approved at {time} by {actor}",
+    'equipment_request.denied': "Equipment request {entity_id} denied at {time} by {actor}",
+    'equipment_request.closed': "Equipment request {entity_id} closed at {time} by {actor}",
+    'user_request.created': "New employee request {entity_id} for {name} created at {time} by {actor}",
+    'user_request.closed': "New employee request {entity_id} closed at {time} by {actor}",
+    'student_request.created': "Student request {entity_id} for {name} created at {time} by {actor}",
+    'student_request.imported': "{count} student request(s) ({first_id} to {last_id}) imported at {time} by {actor}",
+    'student_request.closed': "Student request {entity_id} closed at {time} by {actor}",
+}
+
+
+class _Blank(dict):
+    def __missing__(self, key):
+        return ''
+
+
+def format_audit_time(timestamp):
+    """Stored timestamps are naive UTC; messages show local time."""
+    return timestamp.replace(tzinfo=ZoneInfo("UTC")).astimezone(DISPLAY_TZ).strftime('%B %d, %Y, %I:%M %p')
+
+
+def render_audit_message(log):
+    """Renders a Log row's message at read time. Legacy rows keep their stored text."""
+    template = AUDIT_MESSAGES.get(log.action)
+    if not template:
+        return log.message or log.action or ''
+    values = _Blank(json.loads(log.details) if log.details else {})
+    values.update(
+        actor=log.log_user.email if log.log_user else 'N/A',
+        time=format_audit_time(log.timestamp) if log.timestamp else '',
+        entity_id=log.entity_id or '',
+    )
+    return template.format_map(values)
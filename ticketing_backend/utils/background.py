@@ -0,0 +1,72 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_jobs = {}
+_started = False
+_start_lock = threading.Lock()
+
+
+class PeriodicJob:
+    """Runs func inside an app context every interval seconds, or sooner when woken."""
+
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, app):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, args=(app,), name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def run_once(self, app):
+        from database import db
+
+        with app.app_context():
+            try:
+                self.func()
+            except Exception:
+                logger.exception(f"Background job '{self.name}' failed.")
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    def _run(self, app):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.run_once(app)
+
+
+def register_job(name, func, interval):
+    """Registers a periodic job. Services call this at import time; app.py starts them."""
+    _jobs[name] = PeriodicJob(name, func, interval)
+    return _jobs[name]
+
+
+def wake_job(name):
+    """Asks a registered job to run now instead of waiting for its next interval."""
+    job = _jobs.get(name)
+    if job:
+        job.wake()
+
+
+def start_background_jobs(app):
+    """Starts every registered job; only the first call in a process does anything."""
+    global _started
+    if _started:
+        return
+    with _start_lock:
+        if _started:
+            return
+        for job in _jobs.values():
+            job.start(app)
+        _started = True
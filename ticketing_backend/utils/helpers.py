@@ -1,8 +1,13 @@
 import os
-from datetime import datetime, date
+import re
+import json
+import base64
+import binascii
+from datetime import datetime, date, time, timezone
 from werkzeug.utils import secure_filename
 from config import Config  # Import Config to use UPLOAD_FOLDER and ALLOWED_EXTENSIONS
 from zoneinfo import ZoneInfo  # Add this import
+from utils.storage import get_storage
 
 
 def generate_unique_id():
@@ -13,6 +18,13 @@ def generate_unique_id():
     )  # More granular timestamp with Indiana time
 
 
+def to_naive_utc(moment):
+    """Converts an aware datetime (e.g. parsed from '...Z') to naive UTC, how timestamps are stored; naive ones pass through."""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 def allowed_file(filename):
     """Checks if a file's extension is allowed."""
     return (
@@ -22,28 +34,66 @@ def allowed_file(filename):
 
 
 def save_attachment(file, subfolder, item_id, comment_timestamp=None):
-    """Saves a file to the appropriate static subfolder."""
+    """Saves a file through the storage backend. Returns (filename, storage key)."""
     if not file or not allowed_file(file.filename):
         return None, None
 
-    # Determine the directory path
+    # Determine the key prefix
     if subfolder == "ticket_attachments":
-        target_dir = os.path.join(Config.UPLOAD_FOLDER, subfolder, str(item_id))
+        target_dir = f"{subfolder}/{item_id}"
     elif subfolder == "comment_attachments" and comment_timestamp:
         sanitized_timestamp = (
             comment_timestamp.replace(":", "_").replace(" ", "_").replace(".", "_")
         )
-        target_dir = os.path.join(
-            Config.UPLOAD_FOLDER, subfolder, str(item_id), sanitized_timestamp
-        )
+        target_dir = f"{subfolder}/{item_id}/{sanitized_timestamp}"
     else:
         return None, None  # Invalid subfolder or missing timestamp for comments
 
-    os.makedirs(target_dir, exist_ok=True)
     filename = secure_filename(file.filename)
-    filepath = os.path.join(target_dir, filename)
-    file.save(filepath)
-    return filename, filepath
+    key = f"{target_dir}/{filename}"
+    get_storage().save(key, file.stream)
+    return filename, key
+
+
+def encode_cursor(*values):
+    """Encodes keyset pagination values (e.g. timestamp, id) into an opaque cursor string."""
+    payload = [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decodes a cursor from encode_cursor. Returns the list of values, or None if invalid."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, binascii.Error, UnicodeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+_TIME_OF_DAY_RE = re.compile(r"^\s*(\d{1,2})(?:[:.](\d{2}))?\s*([ap])?\.?\s*m?\.?", re.IGNORECASE)
+
+
+def parse_time_of_day(value, default=None):
+    """
+    Parses the free-text times stored on equipment requests ("14:00", "2pm",
+    "2:30 PM", "noon", "1pm-3pm" -> first time). Returns default if unparseable.
+    """
+    text = (value or "").strip().lower()
+    if text.startswith("noon"):
+        return time(12, 0)
+    if text.startswith("midnight"):
+        return time(0, 0)
+    match = _TIME_OF_DAY_RE.match(text)
+    if not match:
+        return default
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem == "p" and hour < 12:
+        hour += 12
+    elif meridiem == "a" and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return default
+    return time(hour, minute)
 
 
 def get_days_until_set_date(set_date_str):
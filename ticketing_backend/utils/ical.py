@@ -0,0 +1,91 @@
+from datetime import datetime
+
+CALENDAR_TZID = "America/Indiana/Indianapolis"
+
+# Clients only resolve a TZID from a VTIMEZONE in the same calendar, so the zone's rules ship with it.
+# Indianapolis has followed the US daylight saving rules since 2007.
+CALENDAR_TIMEZONE = [
+    "BEGIN:VTIMEZONE",
+    f"TZID:{CALENDAR_TZID}",
+    "BEGIN:DAYLIGHT",
+    "DTSTART:20070311T020000",
+    "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=2SU",
+    "TZOFFSETFROM:-0500",
+    "TZOFFSETTO:-0400",
+    "TZNAME:EDT",
+    "END:DAYLIGHT",
+    "BEGIN:STANDARD",
+    "DTSTART:20071104T020000",
+    "RRULE:FREQ=YEARLY;BYMONTH=11;BYDAY=1SU",
+    "TZOFFSETFROM:-0400",
+    "TZOFFSETTO:-0500",
+    "TZNAME:EST",
+    "END:STANDARD",
+    "END:VTIMEZONE",
+]
+
+
+def escape_text(value):
+    """Escapes a TEXT property value (RFC 5545 3.3.11)."""
+    return (
+        str(value or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line):
+    """Folds a content line to 75 octets, continuation lines starting with a space."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte UTF-8 character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+    return "\r\n ".join(parts)
+
+
+def format_datetime(value):
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def build_event(uid, summary, start, end=None, all_day=False, description=None, location=None, stamp=None):
+    """Returns one VEVENT as CRLF-terminated text. Times are local to CALENDAR_TZID."""
+    lines = ["BEGIN:VEVENT", f"UID:{uid}", f"DTSTAMP:{format_datetime(stamp or datetime.utcnow())}Z"]
+    if all_day:
+        lines.append(f"DTSTART;VALUE=DATE:{start.strftime('%Y%m%d')}")
+    else:
+        lines.append(f"DTSTART;TZID={CALENDAR_TZID}:{format_datetime(start)}")
+        if end:
+            lines.append(f"DTEND;TZID={CALENDAR_TZID}:{format_datetime(end)}")
+    lines.append(f"SUMMARY:{escape_text(summary)}")
+    if location:
+        lines.append(f"LOCATION:{escape_text(location)}")
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) + "\r\n" for line in lines)
+
+
+def build_calendar(name, events):
+    """Wraps pre-rendered VEVENT strings in a VCALENDAR, with the VTIMEZONE their times refer to."""
+    header = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//TicketWorkforceSystem//Equipment Bookings//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+        f"X-WR-TIMEZONE:{CALENDAR_TZID}",
+        *CALENDAR_TIMEZONE,
+    ]
+    return "".join(fold_line(line) + "\r\n" for line in header) + "".join(events) + "END:VCALENDAR\r\n"
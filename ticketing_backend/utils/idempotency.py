@@ -0,0 +1,118 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import request, jsonify, g, make_response
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from models import db, IdempotencyKey
+from utils.background import register_job
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+PENDING_TIMEOUT = timedelta(minutes=5) # A first attempt still 'pending' after this is assumed to have died
+
+
+def _request_fingerprint():
+    """
+    Hash of what was submitted. Multipart bodies are hashed field by field rather than
+    as raw bytes because browsers pick a new boundary every time a form is resent.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.path}\n".encode())
+    if request.files or request.form:
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f"form:{name}={value}\n".encode())
+        for name, file in sorted(request.files.items(multi=True), key=lambda item: item[0]):
+            digest.update(f"file:{name}={file.filename}\n".encode())
+            for chunk in iter(lambda: file.stream.read(64 * 1024), b""):
+                digest.update(chunk)
+            file.stream.seek(0)
+    else:
+        body = request.get_json(silent=True)
+        if body is not None:
+            digest.update(json.dumps(body, sort_keys=True).encode())
+        else:
+            digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _replay(record):
+    response = make_response(record.response_body, record.response_status)
+    response.mimetype = record.response_mimetype
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(f):
+    """
+    Makes a create endpoint safe to retry. When the client sends an Idempotency-Key header,
+    the first successful response is stored for Config.IDEMPOTENCY_KEY_TTL_HOURS and returned
+    for any retry with the same key, without running the endpoint (or sending its emails) again.
+    Goes below the login decorator, since keys are scoped to g.user.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'message': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters.'}), 400
+
+        now = datetime.utcnow()
+        fingerprint = _request_fingerprint()
+        record = IdempotencyKey.query.filter_by(user_id=g.user.id, key=key).first()
+        if record and (record.expires_at < now or (record.status == 'pending' and record.created_at < now - PENDING_TIMEOUT)):
+            db.session.delete(record)
+            db.session.commit()
+            record = None
+
+        if record:
+            if record.endpoint != request.endpoint or record.request_hash != fingerprint:
+                return jsonify({'message': f'{IDEMPOTENCY_HEADER} was already used for a different request.'}), 422
+            if record.status == 'pending':
+                return jsonify({'message': 'The original request with this Idempotency-Key is still being processed.'}), 409
+            return _replay(record)
+
+        # Claim the key before running the endpoint; the unique constraint settles concurrent retries
+        record = IdempotencyKey(
+            user_id=g.user.id, key=key, endpoint=request.endpoint, request_hash=fingerprint,
+            status='pending', created_at=now, expires_at=now + timedelta(hours=Config.IDEMPOTENCY_KEY_TTL_HOURS)
+        )
+        db.session.add(record)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'message': 'The original request with this Idempotency-Key is still being processed.'}), 409
+        record_id = record.id
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            IdempotencyKey.query.filter_by(id=record_id).delete()
+            db.session.commit()
+            raise
+
+        if 200 <= response.status_code < 300:
+            IdempotencyKey.query.filter_by(id=record_id).update({
+                IdempotencyKey.status: 'done',
+                IdempotencyKey.response_status: response.status_code,
+                IdempotencyKey.response_body: response.get_data(as_text=True),
+                IdempotencyKey.response_mimetype: response.mimetype,
+            })
+        else:
+            # Failed attempts aren't stored, so the user can fix the form and resend with the same key
+            IdempotencyKey.query.filter_by(id=record_id).delete()
+        db.session.commit()
+        return response
+    return decorated_function
+
+
+def purge_expired_idempotency_keys():
+    IdempotencyKey.query.filter(IdempotencyKey.expires_at < datetime.utcnow()).delete()
+    db.session.commit()
+
+
+register_job('idempotency_cleanup', purge_expired_idempotency_keys, Config.IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS)
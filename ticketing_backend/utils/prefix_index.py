@@ -0,0 +1,121 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+
+
+class PrefixIndex:
+    """
+    In-memory typeahead index over a set of string values with usage counts.
+
+    Every word start of a value is stored as a sorted (suffix, value) key, so
+    "gym" matches both "Gym" and "Main Gym". Lookups bisect to the first key
+    with the prefix and rank the matching range by count. Prefixes of up to
+    SHORT_PREFIX_LENGTH characters match most of the index, so their top
+    TOP_LIMIT values are kept ranked as values are added and removed.
+    """
+
+    SHORT_PREFIX_LENGTH = 2
+    TOP_LIMIT = 50
+
+    def __init__(self):
+        self._keys = [] # Sorted (lowercase suffix, lowercase value) tuples
+        self._entries = {} # lowercase value -> [display value, count]
+        self._top = {} # short prefix -> its best lowercase values, ranked
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _suffixes(value_lower):
+        suffixes = [value_lower]
+        for i, char in enumerate(value_lower):
+            if i > 0 and value_lower[i - 1] in " -_/.,@" and char not in " -_/.,@":
+                suffixes.append(value_lower[i:])
+        return suffixes
+
+    def _rank(self, value_lower):
+        return (-self._entries[value_lower][1], value_lower)
+
+    def _short_prefixes(self, suffixes):
+        return {suffix[:n] for suffix in suffixes for n in range(self.SHORT_PREFIX_LENGTH + 1)}
+
+    def _scan(self, prefix, limit):
+        start = bisect_left(self._keys, (prefix,))
+        matches = set()
+        for i in range(start, len(self._keys)):
+            suffix, value_lower = self._keys[i]
+            if not suffix.startswith(prefix):
+                break
+            matches.add(value_lower)
+        return heapq.nsmallest(limit, matches, key=self._rank)
+
+    def _raise_in_top(self, value_lower, suffixes):
+        """Places a value whose count grew (or that is new) in its short prefixes' rankings."""
+        rank = self._rank(value_lower)
+        for prefix in self._short_prefixes(suffixes):
+            top = self._top.setdefault(prefix, [])
+            if len(top) == self.TOP_LIMIT and rank > self._rank(top[-1]):
+                continue # Still below the whole ranking
+            if value_lower in top:
+                top.remove(value_lower)
+            insort(top, value_lower, key=self._rank)
+            if len(top) > self.TOP_LIMIT:
+                top.pop()
+
+    def _lower_in_top(self, value_lower, suffixes):
+        """Re-ranks a value whose count fell (or that is gone); rescans only if it may have dropped out."""
+        for prefix in self._short_prefixes(suffixes):
+            top = self._top.get(prefix)
+            if not top or value_lower not in top:
+                continue # Values outside a ranking only matter there once they grow
+            top.remove(value_lower)
+            if value_lower not in self._entries:
+                if len(top) == self.TOP_LIMIT - 1:
+                    self._top[prefix] = self._scan(prefix, self.TOP_LIMIT)
+            elif len(top) < self.TOP_LIMIT - 1 or self._rank(value_lower) < self._rank(top[-1]):
+                insort(top, value_lower, key=self._rank)
+            else:
+                self._top[prefix] = self._scan(prefix, self.TOP_LIMIT)
+
+    def add(self, value, count=1):
+        value = (value or "").strip()
+        if not value:
+            return
+        value_lower = value.lower()
+        suffixes = self._suffixes(value_lower)
+        with self._lock:
+            entry = self._entries.get(value_lower)
+            if entry:
+                entry[1] += count
+            else:
+                self._entries[value_lower] = [value, count]
+                for suffix in suffixes:
+                    insort(self._keys, (suffix, value_lower))
+            self._raise_in_top(value_lower, suffixes)
+
+    def remove(self, value, count=1):
+        value_lower = (value or "").strip().lower()
+        with self._lock:
+            entry = self._entries.get(value_lower)
+            if not entry:
+                return
+            entry[1] -= count
+            suffixes = self._suffixes(value_lower)
+            if entry[1] <= 0:
+                del self._entries[value_lower]
+                for suffix in suffixes:
+                    i = bisect_left(self._keys, (suffix, value_lower))
+                    if i < len(self._keys) and self._keys[i] == (suffix, value_lower):
+                        del self._keys[i]
+            self._lower_in_top(value_lower, suffixes)
+
+    def search(self, prefix, limit=10):
+        """Returns up to limit (value, count) pairs whose value or a word in it starts with prefix."""
+        prefix = (prefix or "").strip().lower()
+        with self._lock:
+            if len(prefix) <= self.SHORT_PREFIX_LENGTH and limit <= self.TOP_LIMIT:
+                top = self._top.get(prefix, [])[:limit]
+            else:
+                top = self._scan(prefix, limit)
+            return [(self._entries[v][0], self._entries[v][1]) for v in top]
@@ -0,0 +1,100 @@
+import math
+import re
+import threading
+from collections import Counter
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset("""
+    a an and are as at be but by for from has have i in is it its my no not of on or our
+    please so that the their there this to was we were will with
+""".split())
+
+
+def tokenize(text):
+    """Lowercased word tokens without stop words, with a plural 's' stripped so 'projectors' matches 'projector'."""
+    tokens = []
+    for token in TOKEN_RE.findall((text or "").lower()):
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class SimilarityIndex:
+    """
+    Incremental TF-IDF index with an inverted index from term to documents.
+
+    Documents are added and removed one at a time. A query only visits the posting
+    lists of its own terms, so cost grows with how many documents share a word with
+    the query rather than with the size of the index.
+    """
+
+    def __init__(self):
+        self._postings = {} # term -> {doc_id: term frequency}
+        self._docs = {} # doc_id -> (Counter of terms, metadata)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._docs
+
+    def add(self, doc_id, tokens, meta=None):
+        terms = Counter(tokens)
+        with self._lock:
+            self._remove(doc_id)
+            self._docs[doc_id] = (terms, meta)
+            for term, count in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = count
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        entry = self._docs.pop(doc_id, None)
+        if not entry:
+            return
+        for term in entry[0]:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[term]
+
+    def _idf(self, term):
+        return math.log((1 + len(self._docs)) / (1 + len(self._postings.get(term, ())))) + 1
+
+    def search(self, tokens, limit=5, min_score=0.0, accept=None):
+        """
+        Returns up to limit (doc_id, cosine score, meta) tuples, best first.
+        accept(doc_id, meta) can reject documents the caller must not see.
+        """
+        query = Counter(tokens)
+        if not query:
+            return []
+        with self._lock:
+            weights = {term: count * self._idf(term) for term, count in query.items() if term in self._postings}
+            if not weights:
+                return []
+            dots = Counter()
+            for term, weight in weights.items():
+                idf = self._idf(term)
+                for doc_id, count in self._postings[term].items():
+                    dots[doc_id] += weight * count * idf
+
+            query_norm = math.sqrt(sum((count * self._idf(term)) ** 2 for term, count in query.items()))
+            results = []
+            for doc_id, dot in dots.items():
+                terms, meta = self._docs[doc_id]
+                if accept and not accept(doc_id, meta):
+                    continue
+                doc_norm = math.sqrt(sum((count * self._idf(term)) ** 2 for term, count in terms.items()))
+                score = dot / (query_norm * doc_norm)
+                if score >= min_score:
+                    results.append((doc_id, score, meta))
+        results.sort(key=lambda result: -result[1])
+        return results[:limit]
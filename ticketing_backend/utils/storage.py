@@ -0,0 +1,161 @@
+import os
+import shutil
+from config import Config
+
+CHUNK_SIZE = 64 * 1024
+
+
+class StorageBackend:
+    """
+    Interface for attachment storage. Keys are '/'-separated relative paths such as
+    'ticket_attachments/<ticket_id>/<filename>'.
+    """
+
+    def save(self, key, fileobj):
+        """Stores the contents of a readable binary file object under key."""
+        raise NotImplementedError
+
+    def open(self, key):
+        """Returns a readable binary file object for key. Caller closes it."""
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix):
+        """Deletes every object whose key starts with prefix."""
+        raise NotImplementedError
+
+    def iter_chunks(self, key, chunk_size=CHUNK_SIZE):
+        """Yields the object's contents in chunks without loading it whole."""
+        with self.open(key) as source:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+class LocalStorage(StorageBackend):
+    """Stores attachments on the local filesystem below root (Config.UPLOAD_FOLDER)."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        # Rows written before the storage layer existed hold absolute paths
+        if os.path.isabs(key):
+            return key
+        return os.path.join(self.root, *key.split("/"))
+
+    def save(self, key, fileobj):
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as out:
+            shutil.copyfileobj(fileobj, out, CHUNK_SIZE)
+
+    def open(self, key):
+        return open(self.path(key), "rb")
+
+    def exists(self, key):
+        return os.path.isfile(self.path(key))
+
+    def delete(self, key):
+        target = self.path(key)
+        if os.path.isfile(target):
+            os.remove(target)
+
+    def delete_prefix(self, prefix):
+        target = self.path(prefix.rstrip("/"))
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        elif os.path.isfile(target):
+            os.remove(target)
+
+
+class S3Storage(StorageBackend):
+    """
+    Stores attachments in an S3-compatible bucket. Point endpoint_url at MinIO or a
+    moto server to run against a local stand-in, or pass a ready-made client.
+    Uploads above multipart_threshold are split into parts sent in parallel.
+    """
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, region=None,
+                 access_key_id=None, secret_access_key=None, client=None,
+                 multipart_threshold=8 * 1024 * 1024, max_concurrency=4):
+        import boto3  # Optional dependency, only needed for this backend
+        from boto3.s3.transfer import TransferConfig
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = client or boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_threshold,
+            max_concurrency=max_concurrency,
+            use_threads=max_concurrency > 1,
+        )
+
+    def object_key(self, key):
+        key = key.lstrip("/")
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def save(self, key, fileobj):
+        self.client.upload_fileobj(fileobj, self.bucket, self.object_key(key), Config=self.transfer_config)
+
+    def open(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))["Body"]
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+            return True
+        except ClientError as e:
+            # Only a missing object is "not there"; a denied or throttled check must not look like one
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+
+    def delete_prefix(self, prefix):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.object_key(prefix)):
+            objects = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+            if objects:  # A page holds at most 1000 keys, the delete_objects limit
+                self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+
+
+_storage = None
+
+
+def get_storage():
+    """Returns the process-wide storage backend selected by Config.STORAGE_BACKEND."""
+    global _storage
+    if _storage is None:
+        if Config.STORAGE_BACKEND == "s3":
+            _storage = S3Storage(
+                bucket=Config.S3_BUCKET,
+                prefix=Config.S3_PREFIX,
+                endpoint_url=Config.S3_ENDPOINT_URL,
+                region=Config.S3_REGION,
+                access_key_id=Config.S3_ACCESS_KEY_ID,
+                secret_access_key=Config.S3_SECRET_ACCESS_KEY,
+                multipart_threshold=Config.S3_MULTIPART_THRESHOLD,
+                max_concurrency=Config.S3_MAX_CONCURRENCY,
+            )
+        else:
+            _storage = LocalStorage(Config.UPLOAD_FOLDER)
+    return _storage
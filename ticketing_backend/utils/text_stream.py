@@ -0,0 +1,38 @@
+import zlib
+
+CHUNK_SIZE = 64 * 1024
+
+
+def stream_text(lines, compress=False, chunk_size=CHUNK_SIZE):
+    """
+    Yields UTF-8 bytes for an iterable of text lines, optionally as a gzip stream.
+
+    Lines are gathered into chunks of about chunk_size bytes, so memory stays constant
+    however many lines there are. The first line is sent on its own so the client sees
+    the response start before the rest has been read.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None # wbits=31 writes a gzip header and trailer
+    pending = []
+    pending_size = 0
+    first = True
+
+    def encode(data, final=False):
+        if compressor is None:
+            return data
+        output = compressor.compress(data)
+        # A sync flush pushes everything compressed so far out to the client
+        return output + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    for line in lines:
+        data = line.encode("utf-8")
+        pending.append(data)
+        pending_size += len(data)
+        if first or pending_size >= chunk_size:
+            yield encode(b"".join(pending))
+            pending = []
+            pending_size = 0
+            first = False
+
+    tail = encode(b"".join(pending), final=True)
+    if tail:
+        yield tail
@@ -0,0 +1,58 @@
+import zipfile
+from datetime import datetime
+
+
+class _StreamBuffer:
+    """Write-only sink for ZipFile; the generator drains it after every write."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries):
+    """
+    Yields a ZIP archive piece by piece from (archive_name, chunks, modified_at) entries,
+    where chunks is a lazy iterable of bytes (e.g. StorageBackend.iter_chunks).
+
+    The archive is never held in memory or written to disk: at most one chunk
+    of the current file plus its compressed output is buffered at a time.
+    Entries whose source cannot be read are skipped so one stale attachment row
+    does not break the export.
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for archive_name, chunks, modified_at in entries:
+            chunks = iter(chunks)
+            try:
+                first_chunk = next(chunks, b"")
+            except Exception:
+                # Missing local files raise OSError, object stores raise their own errors
+                continue
+
+            modified_at = modified_at or datetime.now()
+            info = zipfile.ZipInfo(archive_name, date_time=modified_at.timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, mode="w", force_zip64=True) as target:
+                target.write(first_chunk)
+                for chunk in chunks:
+                    target.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            data = buffer.drain()
+            if data:
+                yield data
+    # Closing the archive writes the central directory
+    yield buffer.drain()
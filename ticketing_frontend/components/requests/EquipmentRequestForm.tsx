@@ -6,6 +6,7 @@ import { Button } from '../common/Button';
 import { Input } from '../common/Input';
 import { TextArea } from '../common/TextArea';
 import { useNotifications } from '../../hooks/useNotifications';
+import { newIdempotencyKey } from '../../services/api';
 
 const EquipmentRequestForm: React.FC = () => {
   const navigate = useNavigate();
@@ -23,6 +24,8 @@ const EquipmentRequestForm: React.FC = () => {
   });
   const [isLoading, setIsLoading] = useState(false);
   const [errors, setErrors] = useState<Record<string, string>>({});
+  // Sent with every submit of this form, so a resubmit after a timeout can't create a duplicate
+  const [idempotencyKey] = useState(newIdempotencyKey);
 
   const handleChange = (e: React.ChangeEvent<HTMLInputElement | HTMLTextAreaElement>) => {
     setFormData({ ...formData, [e.target.name]: e.target.value });
@@ -54,7 +57,7 @@ const EquipmentRequestForm: React.FC = () => {
 
     setIsLoading(true);
     try {
-      await requestService.createEquipmentRequest(formData);
+      await requestService.createEquipmentRequest(formData, idempotencyKey);
       addNotification('Equipment request submitted successfully!', 'success');
       navigate('/requests/equipment');
     } catch (err: any) {
@@ -7,6 +7,7 @@ import { Input } from '../common/Input';
 import { TextArea } from '../common/TextArea';
 import { Select } from '../common/Select';
 import { useNotifications } from '../../hooks/useNotifications';
+import { newIdempotencyKey } from '../../services/api';
 
 const GRADE_LEVELS = ['Kindergarten', '1st Grade', '2nd Grade', '3rd Grade', '4th Grade', '5th Grade', '6th Grade', '7th Grade', '8th Grade', 'Other'];
 
@@ -22,6 +23,8 @@ const StudentRequestForm: React.FC = () => {
   });
   const [isLoading, setIsLoading] = useState(false);
   const [errors, setErrors] = useState<Record<string, string>>({});
+  // Sent with every submit of this form, so a resubmit after a timeout can't create a duplicate
+  const [idempotencyKey] = useState(newIdempotencyKey);
 
   const gradeOptions = GRADE_LEVELS.map(g => ({ value: g, label: g }));
 
@@ -46,7 +49,7 @@ const StudentRequestForm: React.FC = () => {
 
     setIsLoading(true);
     try {
-      await requestService.createStudentRequest(formData);
+      await requestService.createStudentRequest(formData, idempotencyKey);
       addNotification('New student request submitted successfully!', 'success');
       navigate('/requests/students');
     } catch (err: any) {
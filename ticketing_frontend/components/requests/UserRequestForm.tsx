@@ -5,6 +5,7 @@ import { Button } from '../common/Button';
 import { Input } from '../common/Input';
 import { TextArea } from '../common/TextArea';
 import { useNotifications } from '../../hooks/useNotifications';
+import { newIdempotencyKey } from '../../services/api';
 
 
 const UserRequestForm: React.FC = () => {
@@ -20,6 +21,8 @@ const UserRequestForm: React.FC = () => {
   });
   const [isLoading, setIsLoading] = useState(false);
   const [errors, setErrors] = useState<Record<string, string>>({});
+  // Sent with every submit of this form, so a resubmit after a timeout can't create a duplicate
+  const [idempotencyKey] = useState(newIdempotencyKey);
 
   // const departmentOptions = DEPARTMENTS.map(d => ({ value: d, label: d }));
 
@@ -45,7 +48,7 @@ const UserRequestForm: React.FC = () => {
 
     setIsLoading(true);
     try {
-      await requestService.createUserRequest(formData);
+      await requestService.createUserRequest(formData, idempotencyKey);
       addNotification('New employee request submitted successfully!', 'success');
       navigate('/requests/users');
     } catch (err: any) {
@@ -56,7 +56,7 @@ const TicketCard: React.FC<TicketCardProps> = ({ ticket }) => {
         <div className="mt-4 pt-3 border-t border-gray-200 dark:border-gray-700 flex justify-between items-center text-sm">
           <div className="flex items-center text-gray-500 dark:text-gray-400">
             <ChatBubbleLeftEllipsisIcon className="h-5 w-5 mr-1" />
-            <span>{ticket.total_comments || 0} Comments</span>
+            <span>{ticket.comment_count ?? ticket.total_comments ?? 0} Comments</span>
           </div>
           <span className="text-primary dark:text-primary-light font-medium hover:underline">View Details &rarr;</span>
         </div>
@@ -1,7 +1,7 @@
 
-import React, { useState } from 'react';
-import { useNavigate } from 'react-router-dom';
-import { TicketDepartment } from '../../types';
+import React, { useEffect, useState } from 'react';
+import { Link, useNavigate } from 'react-router-dom';
+import { SimilarTicket, TicketDepartment } from '../../types';
 import * as ticketService from '../../services/ticketService';
 import { Button } from '../common/Button';
 import { Input } from '../common/Input';
@@ -11,6 +11,7 @@ import { Checkbox } from '../common/Checkbox';
 import { useNotifications } from '../../hooks/useNotifications';
 import { useAuth } from '../../hooks/useAuth'; // To check if user is admin for shimmer
 import { DEPARTMENTS } from '../../constants';
+import { newIdempotencyKey } from '../../services/api';
 
 const TicketForm: React.FC = () => {
   const navigate = useNavigate();
@@ -24,6 +25,23 @@ const TicketForm: React.FC = () => {
   const [file, setFile] = useState<File | null>(null);
   const [isLoading, setIsLoading] = useState(false);
   const [errors, setErrors] = useState<Record<string, string>>({});
+  // Sent with every submit of this form, so a resubmit after a timeout can't create a duplicate
+  const [idempotencyKey] = useState(newIdempotencyKey);
+  const [similarTickets, setSimilarTickets] = useState<SimilarTicket[]>([]);
+
+  // Look for open tickets about the same problem once the user pauses typing
+  useEffect(() => {
+    if (title.trim().length < 3) {
+      setSimilarTickets([]);
+      return;
+    }
+    const timer = setTimeout(() => {
+      ticketService.getSimilarTickets({ title, description, location, department })
+        .then(setSimilarTickets)
+        .catch(() => setSimilarTickets([]));
+    }, 400);
+    return () => clearTimeout(timer);
+  }, [title, description, location, department]);
 
   const departmentOptions = DEPARTMENTS.map(d => ({ value: d, label: d }));
 
@@ -51,7 +69,7 @@ const TicketForm: React.FC = () => {
         department,
         shimmer: user?.role === 'admin' ? shimmer : false, // Only admins can set shimmer
         file,
-      });
+      }, idempotencyKey);
       addNotification('Ticket created successfully!', 'success');
       navigate('/tickets');
     } catch (err: any) {
@@ -90,6 +108,23 @@ const TicketForm: React.FC = () => {
         error={errors.location}
         required
       />
+      {similarTickets.length > 0 && (
+        <div className="p-3 rounded-md bg-yellow-50 dark:bg-yellow-900/30 border border-yellow-300 dark:border-yellow-700">
+          <p className="text-sm font-medium text-yellow-800 dark:text-yellow-200 mb-1">
+            This may already be reported:
+          </p>
+          <ul className="text-sm space-y-1">
+            {similarTickets.map(t => (
+              <li key={t.id}>
+                <Link to={`/tickets/${t.id}`} className="text-primary dark:text-primary-light hover:underline">
+                  {t.title}
+                </Link>
+                <span className="text-gray-500 dark:text-gray-400"> - {t.location} ({t.department})</span>
+              </li>
+            ))}
+          </ul>
+        </div>
+      )}
       <Select
         label="Department"
         id="department"
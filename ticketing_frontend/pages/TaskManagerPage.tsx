@@ -81,6 +81,8 @@ const TaskManagerPage: React.FC = () => {
   const [selectedCategory, setSelectedCategory] = useState<TaskCategory>(TaskCategory.Tech);
   const [tasks, setTasks] = useState<Task[]>([]);
   const [logs, setLogs] = useState<LogEntry[]>([]);
+  const [logsCursor, setLogsCursor] = useState<string | null>(null);
+  const [loadingMoreLogs, setLoadingMoreLogs] = useState(false);
   const [loadingTasks, setLoadingTasks] = useState(false);
   const [loadingLogs, setLoadingLogs] = useState(false);
   
@@ -104,11 +106,23 @@ const TaskManagerPage: React.FC = () => {
     setLoadingLogs(true);
     try {
       const data = await taskManagerService.getLogsByCategory(selectedCategory);
-      setLogs(data);
+      setLogs(data.logs);
+      setLogsCursor(data.next_cursor);
     } catch (e:any) { addNotification(e.message || 'Failed to fetch logs', 'error'); }
     finally { setLoadingLogs(false); }
   }, [selectedCategory, addNotification]);
 
+  const loadMoreLogs = async () => {
+    if (!logsCursor) return;
+    setLoadingMoreLogs(true);
+    try {
+      const data = await taskManagerService.getLogsByCategory(selectedCategory, logsCursor);
+      setLogs(prev => [...prev, ...data.logs]);
+      setLogsCursor(data.next_cursor);
+    } catch (e:any) { addNotification(e.message || 'Failed to fetch logs', 'error'); }
+    finally { setLoadingMoreLogs(false); }
+  };
+
   useEffect(() => {
     fetchTasks();
     fetchLogs();
@@ -132,11 +146,23 @@ const TaskManagerPage: React.FC = () => {
     finally { setIsSubmittingTask(false); }
   };
 
+  const handleResetAll = async () => {
+    if (!window.confirm(`Reset every completed ${selectedCategory} task?`)) return;
+    try {
+      const result = await taskManagerService.resetTasks(selectedCategory);
+      addNotification(`${result.updated} task(s) reset.`, 'success');
+      fetchTasks();
+      fetchLogs();
+    } catch (e:any) {
+      addNotification(e.message || 'Failed to reset tasks.', 'error');
+    }
+  };
+
   const handleClearLogs = async () => {
-    if (window.confirm(`Are you sure you want to clear all logs for the ${selectedCategory} category? A backup will be attempted first.`)) {
+    if (window.confirm(`Are you sure you want to clear all logs for the ${selectedCategory} category? Entries are moved to the log archive.`)) {
         try {
-            await taskManagerService.clearLogsByCategory(selectedCategory);
-            addNotification(`Logs for ${selectedCategory} cleared.`, 'success');
+            const result = await taskManagerService.clearLogsByCategory(selectedCategory);
+            addNotification(`Logs for ${selectedCategory} cleared; ${result.archived} entries archived.`, 'success');
             fetchLogs(); // Refresh logs
         } catch (e:any) {
             addNotification(e.message || 'Failed to clear logs.', 'error');
@@ -171,6 +197,9 @@ const TaskManagerPage: React.FC = () => {
 
       <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
         <Card title={`${selectedCategory.charAt(0).toUpperCase() + selectedCategory.slice(1)} Tasks`}>
+            <div className="flex justify-end space-x-2 mb-3">
+                <Button size="sm" variant="ghost" onClick={handleResetAll} icon={<ArrowPathIcon className="h-4 w-4"/>} disabled={!tasks.some(task => task.completed)}>Reset All</Button>
+            </div>
           {loadingTasks ? <LoadingSpinner/> : (
             <ul className="space-y-3 max-h-96 overflow-y-auto">
               {tasks.length > 0 ? tasks.map(task => <TaskItem key={task.id} task={task} onAction={fetchTasks} category={selectedCategory}/>)
@@ -188,6 +217,11 @@ const TaskManagerPage: React.FC = () => {
             <ul className="space-y-2 max-h-96 overflow-y-auto">
               {logs.length > 0 ? logs.map(log => <LogItemDisplay key={log.id} log={log}/>)
                                 : <p className="text-gray-500 dark:text-gray-400">No logs in this category.</p>}
+              {logsCursor && (
+                <li className="pt-2 text-center">
+                  <Button size="sm" variant="secondary" onClick={loadMoreLogs} isLoading={loadingMoreLogs}>Load more</Button>
+                </li>
+              )}
             </ul>
           )}
         </Card>
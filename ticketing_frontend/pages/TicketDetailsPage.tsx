@@ -30,6 +30,7 @@ const TicketDetailsPage: React.FC = () => {
   const [newComment, setNewComment] = useState('');
   const [commentFile, setCommentFile] = useState<File | null>(null);
   const [isSubmittingComment, setIsSubmittingComment] = useState(false);
+  const [isLoadingOlderComments, setIsLoadingOlderComments] = useState(false);
 
   const [isAssignModalOpen, setIsAssignModalOpen] = useState(false);
   const [adminUsers, setAdminUsers] = useState<AdminUser[]>([]);
@@ -59,6 +60,25 @@ const TicketDetailsPage: React.FC = () => {
     fetchTicketDetails();
   }, [fetchTicketDetails]);
 
+  const handleLoadOlderComments = async () => {
+    if (!ticketId || !ticket?.comments_cursor) return;
+    setIsLoadingOlderComments(true);
+    try {
+      const page = await ticketService.getTicketComments(ticketId, { cursor: ticket.comments_cursor, order: 'desc' });
+      // Pages come newest first; comments are displayed oldest first
+      const olderComments = [...page.comments].reverse();
+      setTicket(prev => prev ? {
+        ...prev,
+        comments: [...olderComments, ...(prev.comments || [])],
+        comments_cursor: page.next_cursor,
+      } : prev);
+    } catch (err: any) {
+      addNotification(err.message || 'Failed to load older comments', 'error');
+    } finally {
+      setIsLoadingOlderComments(false);
+    }
+  };
+
   const fetchAdminUsers = useCallback(async () => {
     if (user?.role !== 'admin') return;
     try {
@@ -208,6 +228,11 @@ const TicketDetailsPage: React.FC = () => {
       {/* Comments Section */}
       <Card title="Comments" className="mb-6">
         <div className="space-y-4">
+          {ticket.comments_cursor && (
+            <Button variant="secondary" onClick={handleLoadOlderComments} isLoading={isLoadingOlderComments}>
+              Load older comments
+            </Button>
+          )}
           {ticket.comments && ticket.comments.length > 0 ? (
             ticket.comments.map(comment => (
               <CommentCard key={comment.id} comment={comment} />
@@ -84,43 +84,10 @@ const TicketListPage: React.FC = () => {
   }, [fetchTickets]);
 
   useEffect(() => {
-    // This effect handles pagination and fetching comment counts for the current page's tickets
-    const updateDisplayedTicketsAndFetchComments = async () => {
-      if (allFetchedTickets.length === 0) {
-        setTickets([]);
-        return;
-      }
-
-      const indexOfLastTicket = currentPage * TICKETS_PER_PAGE;
-      const indexOfFirstTicket = indexOfLastTicket - TICKETS_PER_PAGE;
-      const currentTicketsSlice = allFetchedTickets.slice(
-        indexOfFirstTicket,
-        indexOfLastTicket
-      );
-
-      if (currentTicketsSlice.length > 0) {
-        // Fetch comment counts only for the tickets on the current page
-        const ticketsWithCounts = await Promise.all(
-          currentTicketsSlice.map(async (ticket) => {
-            try {
-              const countData = await ticketService.getCommentsCount(ticket.id);
-              return { ...ticket, total_comments: countData.total_comments };
-            } catch (commentError) {
-              console.warn(
-                `Failed to fetch comment count for ticket ${ticket.id}:`,
-                commentError
-              );
-              return { ...ticket, total_comments: 0 }; // Default to 0 if count fails
-            }
-          })
-        );
-        setTickets(ticketsWithCounts);
-      } else {
-        setTickets([]); // If slice is empty (e.g., page out of bounds)
-      }
-    };
-
-    updateDisplayedTicketsAndFetchComments();
+    // This effect handles pagination; comment counts come with each ticket in the list response
+    const indexOfLastTicket = currentPage * TICKETS_PER_PAGE;
+    const indexOfFirstTicket = indexOfLastTicket - TICKETS_PER_PAGE;
+    setTickets(allFetchedTickets.slice(indexOfFirstTicket, indexOfLastTicket));
   }, [allFetchedTickets, currentPage, TICKETS_PER_PAGE]);
 
   const departmentOptions = [
@@ -134,6 +101,7 @@ const TicketListPage: React.FC = () => {
   ];
   const sortByOptions = [
     { value: "date_desc", label: "Newest First" },
+    { value: "activity_desc", label: "Recently Active" },
     { value: "date_asc", label: "Oldest First" },
   ];
 
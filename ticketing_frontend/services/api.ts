@@ -61,6 +61,34 @@ export async function apiFetch<T,>(endpoint: string, options: RequestInit = {}):
   return data as T;
 }
 
+// Create endpoints accept an Idempotency-Key so a resubmitted form returns the original result
+// instead of creating a duplicate. Reuse the same key for every attempt of one submission.
+// crypto.randomUUID() needs a secure context, and the app is also served over plain http.
+export const newIdempotencyKey = (): string =>
+  Array.from(crypto.getRandomValues(new Uint8Array(16)), b => b.toString(16).padStart(2, '0')).join('');
+
+export const idempotencyHeaders = (idempotencyKey?: string): RequestInit =>
+  idempotencyKey ? { headers: { 'Idempotency-Key': idempotencyKey } } : {};
+
+// Several GET endpoints in one round-trip, e.g. for a page load. Paths are relative to the API root
+// ('/tasks/statistics'). Each sub-request keeps its own status, so check it before using the body.
+export interface BatchResponse<T = any> {
+  id: string | number;
+  status: number;
+  body: T;
+}
+
+export const batchGet = async (
+  requests: { id: string; path: string }[],
+  parallel = false
+): Promise<Record<string, BatchResponse>> => {
+  const data = await apiFetch<{ responses: BatchResponse[] }>('/batch', {
+    method: 'POST',
+    body: JSON.stringify({ requests, parallel }),
+  });
+  return Object.fromEntries(data.responses.map(response => [String(response.id), response]));
+};
+
 // Specific GET, POST, PUT, DELETE helpers
 export const get = <T,>(endpoint: string, options?: RequestInit) => apiFetch<T>(endpoint, { ...options, method: 'GET' });
 export const post = <T,B,>(endpoint: string, body: B, options?: RequestInit) => apiFetch<T>(endpoint, { ...options, method: 'POST', body: JSON.stringify(body) });
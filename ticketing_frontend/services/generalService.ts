@@ -7,3 +7,15 @@ export const reportBug = async (data: { title: string; description: string; loca
     body: JSON.stringify(data),
   });
 };
+
+export type AutocompleteField = 'location' | 'equipment' | 'teacher' | 'user';
+
+export const getAutocompleteSuggestions = async (
+  field: AutocompleteField,
+  prefix: string,
+  limit?: number
+): Promise<{ field: AutocompleteField; suggestions: { value: string; count: number }[] }> => {
+  const queryParams = new URLSearchParams({ q: prefix });
+  if (limit) queryParams.append('limit', limit.toString());
+  return apiFetch(`/autocomplete/${field}?${queryParams.toString()}`, { method: 'GET' });
+};
@@ -1,12 +1,28 @@
 
-import { EquipmentRequest, UserRequest, StudentRequest } from '../types';
-import { apiFetch } from './api';
+import { EquipmentRequest, UserRequest, StudentRequest, RequestInboxItem, RequestInboxType } from '../types';
+import { apiFetch, postFormData, idempotencyHeaders } from './api';
+
+// --- Unified Inbox ---
+export const getRequestInbox = async (params: {
+  types?: RequestInboxType[];
+  status?: string;
+  cursor?: string | null;
+  limit?: number;
+} = {}): Promise<{ items: RequestInboxItem[]; next_cursor: string | null }> => {
+  const queryParams = new URLSearchParams();
+  if (params.types && params.types.length > 0) queryParams.append('types', params.types.join(','));
+  if (params.status) queryParams.append('status', params.status);
+  if (params.cursor) queryParams.append('cursor', params.cursor);
+  if (params.limit) queryParams.append('limit', params.limit.toString());
+  return apiFetch(`/requests/inbox?${queryParams.toString()}`, { method: 'GET' });
+};
 
 // --- Equipment Requests ---
-export const createEquipmentRequest = async (data: Omit<EquipmentRequest, 'id' | 'user_email' | 'timestamp' | 'status' | 'approval_status'>): Promise<EquipmentRequest> => {
+export const createEquipmentRequest = async (data: Omit<EquipmentRequest, 'id' | 'user_email' | 'timestamp' | 'status' | 'approval_status'>, idempotencyKey?: string): Promise<EquipmentRequest> => {
   return apiFetch('/requests/equipment', {
     method: 'POST',
     body: JSON.stringify(data),
+    ...idempotencyHeaders(idempotencyKey),
   });
 };
 
@@ -32,10 +48,11 @@ export const closeEquipmentRequest = async (requestId: string): Promise<{ messag
 };
 
 // --- User Requests (New Employee) ---
-export const createUserRequest = async (data: Omit<UserRequest, 'id' | 'user_email' | 'timestamp' | 'status'>): Promise<UserRequest> => {
+export const createUserRequest = async (data: Omit<UserRequest, 'id' | 'user_email' | 'timestamp' | 'status'>, idempotencyKey?: string): Promise<UserRequest> => {
   return apiFetch('/requests/users', {
     method: 'POST',
     body: JSON.stringify(data),
+    ...idempotencyHeaders(idempotencyKey),
   });
 };
 
@@ -53,13 +70,29 @@ export const closeUserRequest = async (requestId: string): Promise<{ message: st
 };
 
 // --- Student Requests ---
-export const createStudentRequest = async (data: Omit<StudentRequest, 'id' | 'user_email' | 'timestamp' | 'status' | 'email_created' | 'computer_created' | 'bag_created' | 'id_card_created' | 'azure_created'>): Promise<StudentRequest> => {
+export const createStudentRequest = async (data: Omit<StudentRequest, 'id' | 'user_email' | 'timestamp' | 'status' | 'email_created' | 'computer_created' | 'bag_created' | 'id_card_created' | 'azure_created'>, idempotencyKey?: string): Promise<StudentRequest> => {
   return apiFetch('/requests/students', {
     method: 'POST',
     body: JSON.stringify(data),
+    ...idempotencyHeaders(idempotencyKey),
   });
 };
 
+export interface StudentImportReport {
+  message: string;
+  created: number;
+  failed: number;
+  rows: { row: number; status: 'created' | 'error' | 'skipped'; id?: string; errors?: string[] }[];
+}
+
+// Bulk import from a CSV file (columns: fname, lname, grade, teacher, description).
+// With partial=false a single invalid row rejects the whole file.
+export const importStudentRequests = async (file: File, partial = false): Promise<StudentImportReport> => {
+  const formData = new FormData();
+  formData.append('file', file);
+  return postFormData(`/requests/students/import?partial=${partial}`, formData);
+};
+
 export const getStudentRequests = async (searchKeyword?: string): Promise<StudentRequest[]> => {
   const url = searchKeyword ? `/requests/students?search=${encodeURIComponent(searchKeyword)}` : '/requests/students';
   return apiFetch(url, { method: 'GET' });
@@ -79,3 +112,36 @@ export const toggleStudentRequestStatusField = async (
 ): Promise<{ message: string, request: StudentRequest }> => {
   return apiFetch(`/requests/students/${requestId}/toggle/${statusField}`, { method: 'PUT' });
 };
+
+export type StudentChecklistField = 'email_created' | 'computer_created' | 'bag_created' | 'id_card_created' | 'azure_created';
+
+// Set checklist fields on many students at once. Pass each student's current version
+// so the update is rejected (409, with stale_ids) if someone else changed it meanwhile.
+export const updateStudentChecklists = async (
+  students: { id: string; version?: number }[],
+  fields: Partial<Record<StudentChecklistField, boolean>>
+): Promise<{ message: string; requests: StudentRequest[] }> => {
+  return apiFetch('/requests/students/checklist', {
+    method: 'PATCH',
+    body: JSON.stringify({ students, fields }),
+  });
+};
+
+export type StudentChecklistCounts = Record<StudentChecklistField | 'total' | 'fully_complete', number>;
+
+export const getStudentOnboardingProgress = async (status: 'open' | 'closed' | 'all' = 'open'): Promise<{
+  overall: StudentChecklistCounts;
+  by_grade: Record<string, StudentChecklistCounts>;
+}> => {
+  return apiFetch(`/requests/students/progress?status=${status}`, { method: 'GET' });
+};
+
+// --- Calendar feeds ---
+// Secret .ics URLs (paths under the API origin) to subscribe to in a calendar app
+export const getCalendarFeedUrls = async (): Promise<{ user: string; departments: Record<string, string> }> => {
+  return apiFetch('/calendar/feeds', { method: 'GET' });
+};
+
+export const rotateCalendarFeedUrls = async (): Promise<{ user: string; departments: Record<string, string> }> => {
+  return apiFetch('/calendar/feeds/rotate', { method: 'POST' });
+};
@@ -1,5 +1,5 @@
 
-import { Task, LogEntry, TaskCategory, DashboardStatistics } from '../types';
+import { Task, TaskSchedule, LogEntry, LogArchiveSegment, TaskCategory, DashboardStatistics, AnalyticsReport, DepartmentReport, DepartmentReportSnapshot } from '../types';
 import { apiFetch } from './api';
 import { API_BASE_URL } from '../constants';
 
@@ -40,13 +40,104 @@ export const deleteTask = async (taskId: number, category: TaskCategory): Promis
    });
 };
 
-// Get logs by category
-export const getLogsByCategory = async (category: TaskCategory): Promise<LogEntry[]> => {
-  return apiFetch(`/tasks/logs?category=${category}`, { method: 'GET' });
+// Batch operations: one request and one log entry for many tasks.
+// Omitting taskIds completes/resets every task in the category.
+export const completeTasks = async (category: TaskCategory, taskIds?: number[]): Promise<{ updated: number; task_ids: number[] }> => {
+  return apiFetch('/tasks/batch/complete', {
+    method: 'PUT',
+    body: JSON.stringify({ category, task_ids: taskIds }),
+  });
+};
+
+export const resetTasks = async (category: TaskCategory, taskIds?: number[]): Promise<{ updated: number; task_ids: number[] }> => {
+  return apiFetch('/tasks/batch/reset', {
+    method: 'PUT',
+    body: JSON.stringify({ category, task_ids: taskIds }),
+  });
+};
+
+export const deleteTasks = async (category: TaskCategory, taskIds: number[]): Promise<{ deleted: number; task_ids: number[] }> => {
+  return apiFetch('/tasks/batch', {
+    method: 'DELETE',
+    body: JSON.stringify({ category, task_ids: taskIds }),
+  });
+};
+
+// Recurring server-side resets, e.g. every weekday at 06:00
+export const getTaskSchedules = async (category?: TaskCategory): Promise<TaskSchedule[]> => {
+  return apiFetch(category ? `/tasks/schedules?category=${category}` : '/tasks/schedules', { method: 'GET' });
+};
+
+export const createTaskSchedule = async (data: { category: TaskCategory; time_of_day: string; weekdays?: number[] }): Promise<TaskSchedule> => {
+  return apiFetch('/tasks/schedules', {
+    method: 'POST',
+    body: JSON.stringify(data),
+  });
+};
+
+export const updateTaskSchedule = async (
+  scheduleId: number,
+  data: { time_of_day?: string; weekdays?: number[]; enabled?: boolean }
+): Promise<TaskSchedule> => {
+  return apiFetch(`/tasks/schedules/${scheduleId}`, {
+    method: 'PUT',
+    body: JSON.stringify(data),
+  });
+};
+
+export const deleteTaskSchedule = async (scheduleId: number): Promise<{ message: string }> => {
+  return apiFetch(`/tasks/schedules/${scheduleId}`, { method: 'DELETE' });
+};
+
+// Get one newest-first page of a category's logs; pass next_cursor back to get the next page
+export const getLogsByCategory = async (
+  category: TaskCategory,
+  cursor?: string | null
+): Promise<{ logs: LogEntry[]; next_cursor: string | null }> => {
+  const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+  return apiFetch(`/tasks/logs?category=${category}${cursorParam}`, { method: 'GET' });
+};
+
+// Archived log segments (entries moved out by retention or Clear Logs)
+export const getLogArchives = async (category: TaskCategory): Promise<LogArchiveSegment[]> => {
+  return apiFetch(`/tasks/logs/archives?category=${category}`, { method: 'GET' });
+};
+
+export const searchLogArchives = async (
+  category: TaskCategory,
+  filters: { q?: string; since?: string; until?: string; action?: string; actor?: string; limit?: number } = {}
+): Promise<(LogEntry & { segment_id: number })[]> => {
+  const queryParams = new URLSearchParams({ category });
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value !== undefined && value !== '') queryParams.append(key, String(value));
+  });
+  return apiFetch(`/tasks/logs/archives/search?${queryParams.toString()}`, { method: 'GET' });
+};
+
+export const getLogArchiveDownloadUrl = (segmentId: number): string => {
+  return `${API_BASE_URL}/tasks/logs/archives/${segmentId}/download`;
+};
+
+// Search audit events across tasks, tickets and requests (Admin)
+export const getAuditEvents = async (filters: {
+  category?: TaskCategory;
+  actor?: string; // email
+  entity_type?: string;
+  entity_id?: string;
+  action?: string;
+  since?: string; // ISO datetime, UTC
+  until?: string;
+  limit?: number;
+} = {}): Promise<LogEntry[]> => {
+  const queryParams = new URLSearchParams();
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value !== undefined && value !== '') queryParams.append(key, String(value));
+  });
+  return apiFetch(`/audit/?${queryParams.toString()}`, { method: 'GET' });
 };
 
 // Clear logs by category
-export const clearLogsByCategory = async (category: TaskCategory): Promise<{ message: string }> => {
+export const clearLogsByCategory = async (category: TaskCategory): Promise<{ message: string; archived: number; segments: number }> => {
    // Backend expects category in body for DELETE as well.
   return apiFetch('/tasks/logs/clear', { 
     method: 'DELETE',
@@ -54,14 +145,60 @@ export const clearLogsByCategory = async (category: TaskCategory): Promise<{ mes
   });
 };
 
-// Download logs by category - this will return a path or trigger a download
+// Download logs by category - the server streams the file as it reads the log
 // The actual download is handled by navigating or window.open to the URL
-export const getDownloadLogsUrl = (category: TaskCategory): string => {
-    return `${API_BASE_URL}/tasks/logs/download?category=${category}`;
+export const getDownloadLogsUrl = (
+  category: TaskCategory,
+  format: 'txt' | 'csv' | 'ndjson' = 'txt',
+  gzip = false
+): string => {
+    return `${API_BASE_URL}/tasks/logs/download?category=${category}&format=${format}${gzip ? '&gzip=true' : ''}`;
 };
 
 
 // Get dashboard statistics
 export const getDashboardStatistics = async (): Promise<DashboardStatistics> => {
   return apiFetch('/tasks/statistics', { method: 'GET' });
-};
\ No newline at end of file
+};
+
+// Ticket and request trends from the analytics rollups (admin only)
+export const getAnalytics = async (
+  params: { granularity?: 'day' | 'hour'; since?: string; until?: string; department?: string } = {}
+): Promise<AnalyticsReport> => {
+  const queryParams = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value) queryParams.append(key, value);
+  });
+  const query = queryParams.toString();
+  return apiFetch(`/analytics/${query ? `?${query}` : ''}`, { method: 'GET' });
+};
+
+// Weekly/monthly department reports, generated off-peak and served from storage (admin only)
+export const getDepartmentReports = async (filters: { department?: string; period?: 'weekly' | 'monthly' } = {}): Promise<DepartmentReport[]> => {
+  const queryParams = new URLSearchParams();
+  if (filters.department) queryParams.append('department', filters.department);
+  if (filters.period) queryParams.append('period', filters.period);
+  const query = queryParams.toString();
+  return apiFetch(`/reports/${query ? `?${query}` : ''}`, { method: 'GET' });
+};
+
+export const getDepartmentReport = async (reportId: number): Promise<DepartmentReportSnapshot> => {
+  return apiFetch(`/reports/${reportId}`, { method: 'GET' });
+};
+
+export const getDepartmentReportEmailUrl = (reportId: number): string => {
+  return `${API_BASE_URL}/reports/${reportId}/email`;
+};
+
+export const generateDepartmentReport = async (data: {
+  department: string;
+  period: 'weekly' | 'monthly';
+  period_start?: string;
+  regenerate?: boolean;
+  email?: boolean;
+}): Promise<DepartmentReport> => {
+  return apiFetch('/reports/generate', {
+    method: 'POST',
+    body: JSON.stringify(data),
+  });
+};
@@ -1,6 +1,6 @@
 
-import { Ticket, Comment, TicketAttachment, TicketDepartment, AdminUser } from '../types';
-import { apiFetch, postFormData } from './api';
+import { Ticket, Comment, TicketAttachment, TicketDepartment, AdminUser, SimilarTicket, DepartmentWorkload, AssignmentPolicy } from '../types';
+import { apiFetch, postFormData, idempotencyHeaders } from './api';
 import { API_BASE_URL } from '../constants';
 
 // Fetch all tickets (or based on search/filter)
@@ -11,6 +11,7 @@ export const getTickets = async (params: {
   include_shimmer?: boolean;
   status?: string;  // Make sure this is included
   sort_by?: string;
+  include_archived?: boolean; // Also search tickets moved to the cold archive
 }) => {
   // Build query parameters
   const queryParams = new URLSearchParams();
@@ -19,6 +20,7 @@ export const getTickets = async (params: {
   if (params.include_shimmer !== undefined) queryParams.append('include_shimmer', params.include_shimmer.toString());
   if (params.status && params.status !== 'all') queryParams.append('status', params.status);
   if (params.sort_by) queryParams.append('sort_by', params.sort_by);
+  if (params.include_archived) queryParams.append('include_archived', 'true');
 
   return apiFetch(`/tickets?${queryParams.toString()}`);
 };
@@ -36,7 +38,7 @@ export const createTicket = async (data: {
   shimmer: boolean;
   department: TicketDepartment;
   file?: File | null;
-}): Promise<Ticket> => {
+}, idempotencyKey?: string): Promise<Ticket> => {
   const formData = new FormData();
   formData.append('title', data.title);
   formData.append('description', data.description);
@@ -46,7 +48,7 @@ export const createTicket = async (data: {
   if (data.file) {
     formData.append('file', data.file);
   }
-  return postFormData(`/tickets/`, formData);
+  return postFormData(`/tickets/`, formData, idempotencyHeaders(idempotencyKey));
 };
 
 // Add a comment to a ticket
@@ -63,6 +65,41 @@ export const addCommentToTicket = async (
   return postFormData(`/tickets/${ticketId}/comments`, formData);
 };
 
+// Fetch one page of a ticket's comments (cursor comes from the ticket or a previous page)
+export const getTicketComments = async (
+  ticketId: string,
+  params: { cursor?: string | null; order?: 'asc' | 'desc'; limit?: number } = {}
+): Promise<{ comments: Comment[]; next_cursor: string | null }> => {
+  const queryParams = new URLSearchParams();
+  if (params.cursor) queryParams.append('cursor', params.cursor);
+  if (params.order) queryParams.append('order', params.order);
+  if (params.limit) queryParams.append('limit', params.limit.toString());
+  return apiFetch(`/tickets/${ticketId}/comments?${queryParams.toString()}`, { method: 'GET' });
+};
+
+// Likely duplicates of a ticket that is still being written
+export const getSimilarTickets = async (params: {
+  title: string;
+  description?: string;
+  location?: string;
+  department?: string;
+  exclude?: string;
+}): Promise<SimilarTicket[]> => {
+  const queryParams = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value) queryParams.append(key, value);
+  });
+  return apiFetch(`/tickets/similar?${queryParams.toString()}`, { method: 'GET' });
+};
+
+// Merge duplicate tickets (comments and attachments included) into ticketId (Admin)
+export const mergeTickets = async (ticketId: string, duplicateIds: string[]): Promise<{ message: string; ticket: Ticket }> => {
+  return apiFetch(`/tickets/${ticketId}/merge`, {
+    method: 'POST',
+    body: JSON.stringify({ duplicate_ids: duplicateIds }),
+  });
+};
+
 // Get total comments for a ticket
 export const getCommentsCount = async (ticketId: string): Promise<{ ticket_id: string, total_comments: number }> => {
   return apiFetch(`/tickets/${ticketId}/comments/count`, { method: 'GET' });
@@ -96,4 +133,22 @@ export const getAdminUsers = async (): Promise<{admins: string[]}> => {
 // No specific service function needed, just construct the URL.
 export const getAttachmentDownloadUrl = (attachmentId: number): string => {
     return `${API_BASE_URL}/tickets/attachments/${attachmentId}`;
-};
\ No newline at end of file
+};
+
+// Open-ticket load per department admin (Admin)
+export const getWorkloadSummary = async (department?: string): Promise<DepartmentWorkload[]> => {
+  const url = department ? `/assignment/workload?department=${encodeURIComponent(department)}` : '/assignment/workload';
+  return apiFetch(url, { method: 'GET' });
+};
+
+export const getAssignmentPolicies = async (): Promise<AssignmentPolicy[]> => {
+  return apiFetch('/assignment/policies', { method: 'GET' });
+};
+
+// Turn automatic least-loaded assignment on or off for a department (Super Admin)
+export const setAssignmentPolicy = async (department: string, enabled: boolean): Promise<AssignmentPolicy> => {
+  return apiFetch(`/assignment/policies/${encodeURIComponent(department)}`, {
+    method: 'PUT',
+    body: JSON.stringify({ enabled }),
+  });
+};
@@ -49,9 +49,40 @@ export interface Ticket {
   department: TicketDepartment;
   attachments: TicketAttachment[];
   comments?: Comment[];
+  comments_cursor?: string | null; // Cursor for older comments when only the latest page is included
+  comment_count?: number;
+  attachment_count?: number;
+  last_activity_at?: string; // ISO string
+  sla_breached_at?: string | null; // Set once the item has been open past its SLA target
+  merged_into_id?: string | null; // Set when this ticket was merged into another
+  closed_at?: string | null; // ISO string (UTC)
+  archived?: boolean; // Moved to the cold archive; still readable, and commenting restores it
+  possible_duplicates?: SimilarTicket[]; // Only on the create response
   total_comments?: number;
 }
 
+export interface SimilarTicket {
+  id: string;
+  title: string;
+  location: string;
+  department: TicketDepartment | string;
+  timestamp: string | null;
+  score: number; // 0-1 similarity
+}
+
+export interface DepartmentWorkload {
+  department: TicketDepartment | string;
+  auto_assign: boolean;
+  unassigned_open: number;
+  admins: { email: string; open_assigned: number }[];
+}
+
+export interface AssignmentPolicy {
+  department: TicketDepartment | string;
+  enabled: boolean;
+  updated_at: string | null;
+}
+
 export interface EquipmentRequest {
   id: string;
   name: string;
@@ -67,6 +98,7 @@ export interface EquipmentRequest {
   timestamp: string; // ISO string
   status: 'open' | 'closed';
   approval_status: 'pending' | 'approved' | 'denied';
+  sla_breached_at?: string | null; // Set once the item has been open past its SLA target
 }
 
 export interface UserRequest { // New Employee Request
@@ -80,6 +112,7 @@ export interface UserRequest { // New Employee Request
   user_email: string | null;
   timestamp: string; // ISO string
   status: 'open' | 'closed';
+  sla_breached_at?: string | null; // Set once the item has been open past its SLA target
 }
 
 export interface StudentRequest {
@@ -92,11 +125,25 @@ export interface StudentRequest {
   user_email: string | null;
   timestamp: string; // ISO string
   status: 'open' | 'closed';
+  sla_breached_at?: string | null; // Set once the item has been open past its SLA target
   email_created: boolean;
   computer_created: boolean;
   bag_created: boolean;
   id_card_created: boolean;
   azure_created: boolean;
+  version?: number; // Incremented on every checklist change
+}
+
+export type RequestInboxType = 'equipment' | 'user' | 'student';
+
+export interface RequestInboxItem {
+  id: string;
+  type: RequestInboxType;
+  summary: string;
+  user_email: string | null;
+  status: string;
+  timestamp: string; // ISO string
+  detail_url: string; // API path for the full, type-specific request
 }
 
 export enum TaskCategory {
@@ -117,12 +164,38 @@ export interface Task {
   created_by_email: string | null;
 }
 
+export interface TaskSchedule {
+  id: number;
+  category: TaskCategory;
+  action: 'reset';
+  time_of_day: string; // 'HH:MM', local time
+  weekdays: number[]; // Monday = 0
+  enabled: boolean;
+  next_run_at: string | null; // ISO string (UTC)
+  last_run_at: string | null; // ISO string (UTC)
+  created_at: string | null;
+}
+
 export interface LogEntry {
   id: number;
   message: string;
   timestamp: string; // ISO string
   category: TaskCategory;
   user_email: string | null;
+  action: string | null; // e.g. 'task.completed', 'ticket.assigned'; null on older free-text entries
+  entity_type: string | null; // 'task', 'ticket', 'equipment_request', ...
+  entity_id: string | null;
+}
+
+export interface LogArchiveSegment {
+  id: number;
+  category: TaskCategory;
+  start_at: string; // ISO string, oldest entry
+  end_at: string; // ISO string, newest entry
+  row_count: number;
+  size_bytes: number;
+  sha256: string;
+  created_at: string | null;
 }
 
 export interface DashboardStatistics {
@@ -139,6 +212,53 @@ export interface DashboardStatistics {
   tickets_by_department: { [department_value: string]: number };
 }
 
+export interface AnalyticsBucket {
+  bucket: string; // YYYY-MM-DD (local day) or ISO UTC hour
+  tickets_opened: Record<string, number>; // by department
+  tickets_closed: Record<string, number>; // by department
+  requests_created: Record<string, number>; // by request type: equipment, user, student
+}
+
+export interface AnalyticsReport {
+  granularity: 'day' | 'hour';
+  since: string;
+  until: string; // exclusive
+  department: string | null;
+  series: AnalyticsBucket[];
+  totals: Omit<AnalyticsBucket, 'bucket'>;
+  time_to_close: Record<string, { count: number; mean_hours: number | null; median_hours: number | null }>; // by department, plus 'all'
+}
+
+export interface DepartmentReport {
+  id: number;
+  department: TicketDepartment;
+  period: 'weekly' | 'monthly';
+  period_start: string; // YYYY-MM-DD
+  period_end: string; // YYYY-MM-DD, exclusive
+  status: 'generating' | 'ready';
+  size_bytes: number | null;
+  generated_at: string | null;
+  emailed_at: string | null;
+}
+
+export interface DepartmentReportSnapshot {
+  department: TicketDepartment;
+  period: 'weekly' | 'monthly';
+  period_start: string;
+  period_end: string;
+  generated_at: string;
+  tickets: {
+    opened: number;
+    closed: number;
+    time_to_close: { count: number; mean_hours: number | null; median_hours: number | null };
+    open_now: number;
+    overdue_now: number;
+    daily: { date: string; opened: number; closed: number }[];
+  };
+  tasks: { category: TaskCategory; completed_in_period: number; total_now: number; completed_now: number };
+  requests?: { created: Record<string, number>; overdue_now: Record<string, number> }; // IT only
+}
+
 export interface ApiError {
   message: string;
   error?: string; // From backend error structure